@@ -0,0 +1,429 @@
+# chs_bench.py
+# Centauri Health Solutions – headless benchmark of every app page
+#
+# Usage:
+#   python chs_bench.py                                  # 10, 1k, 100k, 1M rows
+#   python chs_bench.py --sizes 10 1000 --save-baseline  # record a baseline
+#   python chs_bench.py --sizes 10 1000 --check          # fail on regressions
+#   python chs_bench.py --sizes 100000 --pages "Roadmap" "Interview Planner"
+#
+# Each size runs in its own Python process (the app's stores and Streamlit's
+# caches are per process). The process writes synthetic segments, interviews,
+# hypotheses, funnel events and competitors at that size, loads them through
+# the app's own import/build controls and reference directory, and then
+# visits every sidebar page with Streamlit's AppTest (no browser). Per page it
+# records the first-visit and median warm rerun latency, the tracemalloc peak
+# of one rerun (Python and NumPy memory; Arrow/protobuf buffers are native and
+# not traced, so the process's peak RSS is recorded per size as well) and the
+# serialized size of the elements sent to the frontend. Hot helpers (priority
+# scores on a segment edit, a backlog append, a backlog search and duplicate
+# check) are timed on their own as well, and the incremental interview rollup
+# is checked against a full recompute (a mismatch fails the run).
+# Results are compared against a JSON baseline; anything slower/larger than
+# tolerance x baseline fails the check. Baselines are machine-specific, so
+# record them on the machine that checks them.
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chs_research_lab.py")
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chs_bench_baseline.json")
+
+SIZES = [10, 1_000, 100_000, 1_000_000]
+
+PAGES = [
+    "Segment Explorer",
+    "Prioritization Canvas",
+    "Scenarios",
+    "Interview Planner",
+    "Hypothesis & Experiment Tracker",
+    "Platform Architecture Map",
+    "Feature Stack by Segment",
+    "Roadmap",
+    "Pricing Strategy",
+    "Developer Adoption Funnel",
+    "Competitor Landscape",
+]
+
+# Timings below this many ms over tolerance x baseline are treated as noise
+SLACK_MS = 50.0
+
+
+# --- Synthetic data ---
+
+
+def synthetic_segments(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "Segment": [f"Segment {i:07d}" for i in range(n)],
+            "Short Name": [f"S{i}" for i in range(n)],
+            "TAM_2024_USD_B": np.round(rng.lognormal(0.0, 1.0, n), 3),
+            "Adoption_Speed_1_5": rng.integers(1, 6, n),
+            "Compliance_Burden_1_5": rng.integers(1, 6, n),
+            "CHS_Fit_1_5": rng.integers(1, 6, n),
+        }
+    )
+
+
+def synthetic_interviews(n, segments, seed=1):
+    from chs_schema import INTERVIEW_STATUSES
+
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame(
+        {
+            "Segment": rng.choice(segments, n),
+            "Persona": rng.choice([f"Persona {i}" for i in range(20)], n),
+            "Company Type": rng.choice([f"Company type {i}" for i in range(10)], n),
+            "Priority_1_5": rng.integers(1, 6, n),
+            "Key_Question": "What stops you from adopting a compliance-first AI platform today?",
+            "Status": rng.choice(INTERVIEW_STATUSES, n),
+        }
+    )
+    return frame.to_dict("records")
+
+
+def synthetic_hypotheses(n, segments, seed=2):
+    from chs_core import compute_ice_scores
+
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame(
+        {
+            "Segment": rng.choice(segments, n),
+            "Hypothesis": [f"Hypothesis {i}" for i in range(n)],
+            "Metric_to_Move": "Teams integrating CHS within 3 months",
+            "Impact_1_5": rng.integers(1, 6, n),
+            "Confidence_1_5": rng.integers(1, 6, n),
+            "Effort_1_5": rng.integers(1, 6, n),
+            "Next_Experiment": "Design-partner calls",
+        }
+    )
+    frame["ICE_Score"] = compute_ice_scores(frame)
+    return frame.to_dict("records")
+
+
+def synthetic_competitors(n, seed=4):
+    rng = np.random.default_rng(seed)
+    vendors = [f"Vendor {i:07d}" for i in range(n - 1)] + ["CentauriHS"]
+    return pd.DataFrame(
+        {
+            "Vendor": vendors,
+            "Type": rng.choice(["Hyperscaler", "Niche", "EHR", "Startup"], n),
+            "Breadth_1_5": rng.integers(1, 6, n),
+            "Compliance_1_5": rng.integers(1, 6, n),
+            "Explainability_1_5": rng.integers(1, 6, n),
+        }
+    )
+
+
+def synthetic_events(n, seed=3):
+    # n events from ~n/4 users; later stages are progressively rarer
+    from chs_funnel import DEFAULT_STAGES
+
+    rng = np.random.default_rng(seed)
+    weights = 0.35 ** np.arange(len(DEFAULT_STAGES))
+    start = np.datetime64("2026-01-01T00:00:00", "s").astype(np.int64)
+    return pd.DataFrame(
+        {
+            "user_id": rng.integers(0, max(n // 4, 1), n),
+            "event": np.array([e for e, _ in DEFAULT_STAGES])[
+                rng.choice(len(DEFAULT_STAGES), n, p=weights / weights.sum())
+            ],
+            "timestamp": start + rng.integers(0, 90 * 86400, n),
+        }
+    )
+
+
+# --- Measurement ---
+
+
+def _elements(node):
+    yield node
+    for child in getattr(node, "children", {}).values():
+        yield from _elements(child)
+
+
+def payload_bytes(at):
+    # Serialized size of every element of the last run, i.e. what the server
+    # sends to the browser for one rerun
+    return sum(
+        node.proto.ByteSize()
+        for node in _elements(at._tree)
+        if hasattr(getattr(node, "proto", None), "ByteSize")
+    )
+
+
+def max_rss_bytes():
+    import resource
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def _check_exceptions(at, label):
+    if at.exception:
+        raise RuntimeError(f"{label}: {at.exception[0].value}")
+
+
+def _widget(elements, label):
+    for element in elements:
+        if element.label == label:
+            return element
+    raise LookupError(f"No widget labelled {label!r}")
+
+
+def measure_page(at, page, repeat):
+    select = _widget(at.sidebar.radio, "Select view")
+    first = _timed(lambda: select.set_value(page).run())
+    _check_exceptions(at, page)
+    warm = [_timed(at.run) for _ in range(repeat)]
+    tracemalloc.start()
+    try:
+        at.run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    _check_exceptions(at, page)
+    return {
+        "first_ms": round(first, 2),
+        "latency_ms": round(float(np.median(warm)), 2),
+        "peak_mb": round(peak / 2**20, 3),
+        "payload_kb": round(payload_bytes(at) / 1024, 2),
+    }
+
+
+def _median_ms(fn, repeat):
+    return round(float(np.median([_timed(fn) for _ in range(repeat)])), 3)
+
+
+def run_size(n, pages=PAGES, repeat=3, workdir=None, timeout=1800):
+    # Runs in a fresh process: the stores pick their paths up from the
+    # environment at import time
+    workdir = workdir or tempfile.mkdtemp(prefix=f"chs_bench_{n}_")
+    os.makedirs(workdir, exist_ok=True)
+    db_path = os.path.join(workdir, "bench.db")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    os.environ["CHS_DB_PATH"] = db_path
+    os.environ["CHS_COHORT_DIR"] = os.path.join(workdir, "cohorts")
+    reference_dir = os.path.join(workdir, "reference")
+    os.makedirs(reference_dir, exist_ok=True)
+    os.environ["CHS_REFERENCE_DIR"] = reference_dir
+
+    from streamlit.testing.v1 import AppTest
+
+    import chs_core
+    from chs_schema import editable_frame
+    from chs_search import INTERVIEW_TEXT_FIELDS, TextIndex
+    from chs_storage import (
+        InterviewRollup,
+        SharedTable,
+        _prepare_segments,
+        open_backlogs,
+        rollup_matches_recompute,
+    )
+
+    results = {}
+    segments = synthetic_segments(n)
+    segments_path = os.path.join(workdir, "segments.csv")
+    segments.to_csv(segments_path, index=False)
+    events_path = os.path.join(workdir, "events.csv")
+    synthetic_events(n).to_csv(events_path, index=False)
+    synthetic_competitors(n).to_csv(os.path.join(reference_dir, "competitors.csv"), index=False)
+    names = segments["Segment"].to_numpy()[:50]
+    interviews, hypotheses = open_backlogs(db_path)
+    interviews.append_many(synthetic_interviews(n, names))
+    hypotheses.append_many(synthetic_hypotheses(n, names))
+
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    at.run()
+    _check_exceptions(at, "startup")
+    _widget(at.sidebar.radio, "Select view").set_value("Segment Explorer").run()
+    _widget(at.text_input, "…or a file path on the server (for very large files)").input(segments_path).run()
+    results[f"action:import segments @ {n}"] = {
+        "latency_ms": round(_timed(lambda: _widget(at.button, "Import segments").click().run()), 2)
+    }
+    _check_exceptions(at, "import segments")
+
+    for page in pages:
+        if page == "Developer Adoption Funnel":
+            _widget(at.sidebar.radio, "Select view").set_value(page).run()
+            _widget(at.text_input, "…or a file path on the server (for very large logs)").input(events_path).run()
+            results[f"action:build funnel @ {n}"] = {
+                "latency_ms": round(_timed(lambda: _widget(at.button, "Build funnel").click().run()), 2)
+            }
+            _check_exceptions(at, "build funnel")
+            _widget(at.sidebar.radio, "Select view").set_value(PAGES[0]).run()
+        results[f"page:{page} @ {n}"] = measure_page(at, page, repeat)
+
+    # Hot helpers on their own: a one-cell segment edit (priority scores are
+    # re-derived on commit) and appending to a backlog of n rows
+    table = SharedTable(segments, derive=_prepare_segments, derived=["Priority_Score"])
+    results[f"fn:compute_priority_scores @ {n}"] = {
+        "latency_ms": _median_ms(lambda: chs_core.compute_priority_scores(segments), repeat)
+    }
+
+    def edit_one_cell():
+        df, version = table.snapshot()
+        edited = df.copy()
+        edited.iloc[0, edited.columns.get_loc("CHS_Fit_1_5")] = 6 - int(df["CHS_Fit_1_5"].iloc[0])
+        table.commit(edited, version)
+
+    results[f"fn:SharedTable.commit @ {n}"] = {"latency_ms": _median_ms(edit_one_cell, repeat)}
+
+    # A rename publishes new categories; a commit from the version before it
+    # must still merge (the editor sends names as text)
+    base, version = table.snapshot()
+    renamed = editable_frame(base, "segments")
+    renamed.iloc[0, renamed.columns.get_loc("Segment")] = "Renamed segment"
+    table.commit(renamed, version)
+    stale = base.copy()
+    column = stale.columns.get_loc("CHS_Fit_1_5")
+    stale.iloc[-1, column] = 6 - int(base["CHS_Fit_1_5"].iloc[-1])
+    table.commit(stale, version)
+    merged = table.snapshot()[0]
+    if merged["Segment"].iloc[0] != "Renamed segment" or merged.iloc[-1, column] == base.iloc[-1, column]:
+        raise RuntimeError("SharedTable lost an edit merging a stale commit after a rename")
+    interviews.frame()
+    row = synthetic_interviews(1, names)[0]
+    results[f"fn:BacklogStore append+frame @ {n}"] = {
+        "latency_ms": _median_ms(lambda: (interviews.append(row), interviews.frame()), repeat)
+    }
+    # The incremental interview rollup must still agree with a full groupby
+    # after appends (including a row without a priority) and a status change
+    rollup = interviews.attach_rollup(InterviewRollup())
+    interviews.append({**row, "Priority_1_5": None})
+    interviews.update(int(interviews.frame().index[0]), Status="Completed")
+    if not rollup_matches_recompute(rollup, interviews.frame()):
+        raise RuntimeError("InterviewRollup no longer matches a full recompute")
+    index = interviews.attach_rollup(TextIndex(INTERVIEW_TEXT_FIELDS, duplicate_field="Key_Question"))
+    results[f"fn:TextIndex.search @ {n}"] = {
+        "latency_ms": _median_ms(lambda: index.search("compliance platform adoption"), repeat)
+    }
+    results[f"fn:TextIndex.near_duplicates @ {n}"] = {
+        "latency_ms": _median_ms(lambda: index.near_duplicates(row["Key_Question"]), repeat)
+    }
+    results[f"process @ {n}"] = {"max_rss_mb": round(max_rss_bytes() / 2**20, 1)}
+    return results
+
+
+def run_all(sizes, pages, repeat, workdir=None, timeout=1800):
+    results = {}
+    for n in sizes:
+        cmd = [sys.executable, os.path.abspath(__file__), "--worker", str(n), "--repeat", str(repeat)]
+        cmd += ["--timeout", str(timeout), "--pages", *pages]
+        if workdir:
+            cmd += ["--workdir", os.path.join(workdir, str(n))]
+        print(f"[bench] {n:,} rows…", file=sys.stderr, flush=True)
+        env = {**os.environ, "STREAMLIT_LOGGER_LEVEL": "error"}
+        proc = subprocess.run(cmd, capture_output=True, text=True, env=env)
+        if proc.returncode != 0:
+            raise RuntimeError(f"Benchmark at {n:,} rows failed:\n{proc.stderr[-4000:]}")
+        results.update(json.loads(proc.stdout.strip().splitlines()[-1]))
+    return results
+
+
+def check(results, baseline, tolerance=1.5):
+    # (key, metric, baseline, value) for every metric over its threshold
+    failures = []
+    for key, metrics in results.items():
+        reference = baseline.get(key, {})
+        for metric, value in metrics.items():
+            ref = reference.get(metric)
+            if ref is None:
+                continue
+            limit = ref * tolerance + (SLACK_MS if metric.endswith("_ms") else 0.0)
+            if value > limit:
+                failures.append((key, metric, ref, value))
+    return failures
+
+
+def results_frame(results, baseline=None):
+    rows = []
+    for key, metrics in results.items():
+        for metric, value in metrics.items():
+            ref = (baseline or {}).get(key, {}).get(metric)
+            rows.append((key, metric, value, ref, value / ref if ref else np.nan))
+    return pd.DataFrame(rows, columns=["Benchmark", "Metric", "Value", "Baseline", "Ratio"])
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="chs_bench", description="Headless benchmark of the app pages")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--pages", nargs="+", default=PAGES, choices=PAGES, metavar="PAGE")
+    parser.add_argument("--repeat", type=int, default=3, help="Warm reruns per page")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Merge these results into the baseline")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if any metric regressed (needs a baseline)")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="Allowed ratio over baseline")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    parser.add_argument("--workdir", help="Keep generated data here instead of a temp dir")
+    parser.add_argument("--timeout", type=float, default=1800, help="Seconds allowed per rerun")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.worker is not None:
+        results = run_size(args.worker, args.pages, args.repeat, args.workdir, args.timeout)
+        print(json.dumps(results))
+        return 0
+
+    if args.check and not os.path.exists(args.baseline):
+        # Checked before the (long) run; with nothing to compare against every
+        # regression would pass
+        parser.error(
+            f"--check needs a baseline, none at {args.baseline} (record one with --save-baseline)"
+        )
+    results = run_all(args.sizes, args.pages, args.repeat, args.workdir, args.timeout)
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+    with pd.option_context("display.max_rows", None, "display.width", 200):
+        print(results_frame(results, baseline).to_string(index=False))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"machine": platform.platform(), "results": results}, f, indent=1)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(
+                {"machine": platform.platform(), "results": {**baseline, **results}}, f, indent=1
+            )
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+    if args.check:
+        failures = check(results, baseline, args.tolerance)
+        for key, metric, ref, value in failures:
+            print(f"REGRESSION {key} {metric}: {value:,.2f} vs baseline {ref:,.2f}", file=sys.stderr)
+        unchecked = [key for key in results if key not in baseline]
+        if unchecked:
+            print(
+                f"WARNING: no baseline for {len(unchecked)} of {len(results)} benchmarks "
+                f"({', '.join(unchecked[:3])}{', …' if len(unchecked) > 3 else ''})",
+                file=sys.stderr,
+            )
+        return 1 if failures or len(unchecked) == len(results) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,470 @@
+# chs_charts.py
+# Centauri Health Solutions – Altair chart builders with a content-hash spec cache
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import altair as alt
+import pandas as pd
+import pyarrow as pa
+
+
+def frame_fingerprint(df):
+    # Content hash of a DataFrame: values, index, column names and dtypes.
+    h = hashlib.sha1()
+    h.update(repr(list(df.columns)).encode())
+    h.update(repr([str(t) for t in df.dtypes]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _arrow_bytes(df):
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed-type object columns (e.g. from st.data_editor) -> strings
+        df = df.copy()
+        for col in df.columns[df.dtypes == object]:
+            df[col] = df[col].astype(str)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _to_arrow_dataset(data, datasets):
+    # Altair data transformer: stores each chart frame as Arrow IPC bytes under
+    # a content-hash name, the same transport st.altair_chart uses, so the
+    # cached spec can be handed to st.vega_lite_chart without re-serializing.
+    payload = _arrow_bytes(data)
+    name = hashlib.sha1(payload).hexdigest()
+    datasets[name] = payload
+    return {"name": name}
+
+
+alt.data_transformers.register("chs_arrow", _to_arrow_dataset)
+_altair_globals_lock = threading.Lock()
+
+
+def chart_to_spec(chart):
+    datasets = {}
+    with _altair_globals_lock:
+        with alt.theme.enable("none"), alt.data_transformers.enable(
+            "chs_arrow", datasets=datasets
+        ):
+            spec = chart.to_dict()
+    spec["datasets"] = {**spec.get("datasets", {}), **datasets}
+    return spec
+
+
+class ChartCache:
+    # LRU of Vega-Lite specs keyed by (builder, data hash, encoding params).
+    # A hit skips both building the Altair chart and serializing its data.
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._specs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, builder, df, **params):
+        key = (
+            builder.__module__,
+            builder.__qualname__,
+            frame_fingerprint(df),
+            tuple(sorted((k, repr(v)) for k, v in params.items())),
+        )
+        with self._lock:
+            spec = self._specs.get(key)
+            if spec is not None:
+                self._specs.move_to_end(key)
+                self.hits += 1
+                return spec
+            self.misses += 1
+
+        spec = chart_to_spec(builder(df, **params))
+        with self._lock:
+            self._specs[key] = spec
+            self._specs.move_to_end(key)
+            while len(self._specs) > self.max_entries:
+                self._specs.popitem(last=False)
+        return spec
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._specs),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._specs.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# --- Architecture diagram ---
+
+ARCH_LAYER_ORDER = ["Infra", "Data", "Platform", "Experience"]
+ARCH_LAYER_LABELS = {
+    "Infra": "Infra",
+    "Data": "Data Layer",
+    "Platform": "Platform Services",
+    "Experience": "Developer Experience",
+}
+# Node styling per component Status
+ARCH_STATUS_STYLES = {
+    "MVP": 'style="rounded,filled", color="#78BE20", fillcolor="#E9F5DB"',
+    "Planned": 'style="rounded,filled,dashed", color="#78BE20", fillcolor="#FFFFFF"',
+    "Future": 'style="rounded,dashed", color="#9E9E9E", fontcolor="#6E6E6E"',
+}
+_DEFAULT_STATUS_STYLE = 'style="rounded", color="#2E2E2E"'
+
+
+def _dot_escape(text):
+    return str(text).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def architecture_dot(arch_df):
+    # One cluster per Layer, nodes styled by Status and chained in stack order
+    # (Infra -> Data -> Platform -> Experience), as in the original hand-drawn map.
+    known = [layer for layer in ARCH_LAYER_ORDER if layer in set(arch_df["Layer"])]
+    extra = [layer for layer in arch_df["Layer"].drop_duplicates() if layer not in ARCH_LAYER_ORDER]
+    lines = [
+        "digraph CHS {",
+        "    rankdir=TB;",
+        '    node [shape=box, style="rounded,filled", color="#78BE20", fillcolor="#E9F5DB"];',
+    ]
+    chain = []
+    for i, layer in enumerate(known + extra):
+        members = arch_df[arch_df["Layer"] == layer]
+        lines.append(f"    subgraph cluster_{i} {{")
+        lines.append(f'        label="{_dot_escape(ARCH_LAYER_LABELS.get(layer, layer))}";')
+        lines.append('        style="rounded";')
+        for idx, row in zip(members.index, members.itertuples(index=False)):
+            node_id = f"n{idx}"
+            style = ARCH_STATUS_STYLES.get(row.Status, _DEFAULT_STATUS_STYLE)
+            lines.append(f'        {node_id} [label="{_dot_escape(row.Component)}", {style}];')
+            chain.append(node_id)
+        lines.append("    }")
+    if len(chain) > 1:
+        lines.append("    " + " -> ".join(chain) + ";")
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def render_dot_svg(dot):
+    # Lays the graph out server-side with the Graphviz binary. Returns None when
+    # the binary is not installed so callers can fall back to client-side layout.
+    import graphviz
+
+    try:
+        return graphviz.Source(dot).pipe(format="svg", encoding="utf-8")
+    except graphviz.ExecutableNotFound:
+        return None
+
+
+# --- Chart builders (pure functions of the input frame and parameters) ---
+
+
+def segment_scatter(seg):
+    chart_df = seg.assign(TAM_scaled=seg["TAM_2024_USD_B"].clip(lower=0.1))
+    return (
+        alt.Chart(chart_df)
+        .mark_circle()
+        .encode(
+            x=alt.X("Adoption_Speed_1_5", title="Adoption Speed (1–5)"),
+            y=alt.Y("Compliance_Burden_1_5", title="Compliance Burden (1–5)"),
+            size=alt.Size("TAM_scaled", title="TAM 2024 ($B)", legend=None),
+            color=alt.Color(
+                "CHS_Fit_1_5",
+                scale=alt.Scale(scheme="greens"),
+                title="CHS Fit (1–5)",
+            ),
+            tooltip=[
+                "Segment",
+                "TAM_2024_USD_B",
+                "Adoption_Speed_1_5",
+                "Compliance_Burden_1_5",
+                "CHS_Fit_1_5",
+            ],
+        )
+        .properties(height=400)
+    )
+
+
+def focus_map(ranked):
+    return (
+        alt.Chart(ranked)
+        .mark_circle()
+        .encode(
+            x=alt.X("Adoption_Speed_1_5", title="Adoption Speed"),
+            y=alt.Y("CHS_Fit_1_5", title="CHS Strategic Fit"),
+            size=alt.Size("TAM_2024_USD_B", title="TAM 2024 ($B)", legend=None),
+            color=alt.Color(
+                "Priority_Score",
+                title="Priority Score",
+                scale=alt.Scale(scheme="viridis"),
+            ),
+            tooltip=["Segment", "Priority_Score"],
+        )
+        .properties(height=400)
+    )
+
+
+def weight_winner_map(sweep_grid):
+    return (
+        alt.Chart(sweep_grid)
+        .mark_square(size=60)
+        .encode(
+            x=alt.X("w_tam:Q", title="Weight: TAM"),
+            y=alt.Y("w_adoption:Q", title="Weight: Adoption Speed"),
+            color=alt.Color("Winner:N", title="#1 Segment", scale=alt.Scale(scheme="set2")),
+            tooltip=["w_tam", "w_adoption", "w_fit", "Winner"],
+        )
+        .properties(height=400)
+    )
+
+
+def score_intervals(score_pct):
+    # P5–P95 bar with a tick at the median, best median on top
+    order = score_pct.sort_values("P50", ascending=False)["Segment"].tolist()
+    base = alt.Chart(score_pct).encode(
+        y=alt.Y("Segment:N", sort=order, title=None),
+        tooltip=["Segment", "P5", "P50", "P95", alt.Tooltip("Mean:Q", format=".2f")],
+    )
+    bars = base.mark_rule(strokeWidth=6, color="#78BE20").encode(
+        x=alt.X("P5:Q", title="Priority Score (P5–P95, tick = median)"),
+        x2="P95:Q",
+    )
+    median = base.mark_tick(color="#2E2E2E", thickness=2, size=18).encode(x="P50:Q")
+    return (bars + median).properties(height=max(150, 30 * len(score_pct)))
+
+
+def layer_mix(layer_counts):
+    return (
+        alt.Chart(layer_counts)
+        .mark_bar()
+        .encode(
+            x=alt.X("Layer", sort=["Infra", "Data", "Platform", "Experience"]),
+            y=alt.Y("Component", title="# Components"),
+            color=alt.Color("Layer", legend=None, scale=alt.Scale(scheme="greens")),
+            tooltip=["Layer", "Component"],
+        )
+        .properties(height=300)
+    )
+
+
+def importance_heatmap(melt_df, features, seg_names):
+    return (
+        alt.Chart(melt_df)
+        .mark_rect()
+        .encode(
+            x=alt.X("Feature:N", sort=list(features)),
+            y=alt.Y("Segment:N", sort=list(seg_names)),
+            color=alt.Color(
+                "Importance:Q",
+                scale=alt.Scale(scheme="greens", domain=[1, 5]),
+                title="Importance",
+            ),
+            tooltip=["Segment", "Feature", "Importance"],
+        )
+        .properties(height=250)
+    )
+
+
+def bundle_heatmap(long_df, features, seg_names):
+    # importance_heatmap with the chosen bundle's columns outlined and the
+    # other features faded
+    return (
+        alt.Chart(long_df)
+        .mark_rect(strokeWidth=1.5)
+        .encode(
+            x=alt.X("Feature:N", sort=list(features)),
+            y=alt.Y("Segment:N", sort=list(seg_names)),
+            color=alt.Color(
+                "Importance:Q",
+                scale=alt.Scale(scheme="greens", domain=[1, 5]),
+                title="Importance",
+            ),
+            opacity=alt.condition("datum.In_Bundle", alt.value(1.0), alt.value(0.3)),
+            stroke=alt.condition("datum.In_Bundle", alt.value("#2E2E2E"), alt.value(None)),
+            tooltip=["Segment", "Feature", "Importance", "In_Bundle"],
+        )
+        .properties(height=max(250, 14 * len(seg_names)))
+    )
+
+
+def roadmap_gantt(schedule_df):
+    # Scheduled spans; the critical chain is outlined and each item's target
+    # quarter end is ticked
+    order = schedule_df.sort_values(["Start_Date", "End_Date"])["Item"].tolist()
+    base = alt.Chart(schedule_df).encode(y=alt.Y("Item:N", sort=order, title="Feature / Initiative"))
+    bars = base.mark_bar(strokeWidth=2).encode(
+        x=alt.X("Start_Date:T", title=None),
+        x2="End_Date:T",
+        color=alt.Color("Team:N", scale=alt.Scale(scheme="set2")),
+        stroke=alt.condition("datum.Critical", alt.value("#2E2E2E"), alt.value(None)),
+        tooltip=[
+            "ID",
+            "Item",
+            "Team",
+            "Phase",
+            alt.Tooltip("Start_Date:T", title="Start"),
+            alt.Tooltip("End_Date:T", title="End"),
+            "Held_By",
+            "Blocker",
+            "Critical",
+        ],
+    )
+    layers = [bars]
+    if "Target_End" in schedule_df.columns:
+        layers.append(
+            base.mark_tick(color="#E4572E", thickness=2).encode(
+                x="Target_End:T", tooltip=["Item", alt.Tooltip("Target_End:T", title="Target")]
+            )
+        )
+    return alt.layer(*layers).properties(height=max(250, 22 * len(schedule_df)))
+
+
+def price_bars(pricing_df):
+    return (
+        alt.Chart(pricing_df)
+        .mark_bar()
+        .encode(
+            x=alt.X("Tier:N"),
+            y=alt.Y("Price_USD_per_month:Q", title="Price ($/month)"),
+            color=alt.Color("Tier:N", legend=None, scale=alt.Scale(scheme="greens")),
+            tooltip=["Tier", "Price_USD_per_month"],
+        )
+        .properties(height=300)
+    )
+
+
+def price_response_line(curve_df, current_price):
+    line = (
+        alt.Chart(curve_df)
+        .mark_line(color="#78BE20")
+        .encode(
+            x=alt.X("Price_USD_per_month:Q", title="Tier price ($/month)"),
+            y=alt.Y("MRR_USD:Q", title="Total MRR ($)"),
+            tooltip=["Price_USD_per_month", "Accounts_on_tier", "MRR_USD"],
+        )
+    )
+    rule = (
+        alt.Chart(pd.DataFrame({"Price_USD_per_month": [current_price]}))
+        .mark_rule(color="#2E2E2E", strokeDash=[4, 4])
+        .encode(x="Price_USD_per_month:Q")
+    )
+    return (line + rule).properties(height=300)
+
+
+def usage_revenue_bars(usage_df):
+    return (
+        alt.Chart(usage_df)
+        .mark_bar(color="#78BE20")
+        .encode(
+            x=alt.X(
+                "Events_per_month:Q",
+                scale=alt.Scale(type="log"),
+                title="Events per month (bucket start)",
+            ),
+            y=alt.Y("MRR_USD:Q", title="MRR ($)"),
+            tooltip=["Events_per_month", "Accounts", "MRR_USD"],
+        )
+        .properties(height=300)
+    )
+
+
+def funnel_bars(funnel_df):
+    return (
+        alt.Chart(funnel_df)
+        .mark_bar()
+        .encode(
+            x=alt.X("Stage:N"),
+            y=alt.Y("Count:Q"),
+            color=alt.Color(
+                "Stage:N",
+                legend=None,
+                scale=alt.Scale(scheme="greens"),
+            ),
+            tooltip=["Stage", "Count"],
+        )
+        .properties(height=300)
+    )
+
+
+def cohort_heatmap(cohort_df, period_label="Week"):
+    # cohort_df: one stage of CohortStore.cohort_table()
+    return (
+        alt.Chart(cohort_df)
+        .mark_rect()
+        .encode(
+            x=alt.X("Period:O", title=f"{period_label}s since signup"),
+            y=alt.Y("Cohort:O", title=f"Signup {period_label.lower()}"),
+            color=alt.Color(
+                "Conversion_%:Q",
+                scale=alt.Scale(scheme="greens", domain=[0, 100]),
+                title="Reached (%)",
+            ),
+            tooltip=["Cohort", "Period", "Users", "Cohort_Size", "Conversion_%"],
+        )
+        .properties(height=300)
+    )
+
+
+def _frontier_encodings(comp_df, tooltip):
+    # Frontier vendors (when dominance columns are present) drawn large,
+    # opaque and outlined; everyone else fades back
+    if "On_Frontier" not in comp_df.columns:
+        return {"tooltip": tooltip}
+    return {
+        "size": alt.Size(
+            "On_Frontier:N",
+            scale=alt.Scale(domain=[True, False], range=[260, 90]),
+            legend=alt.Legend(title="Pareto frontier"),
+        ),
+        "opacity": alt.condition("datum.On_Frontier", alt.value(1.0), alt.value(0.35)),
+        "stroke": alt.condition("datum.On_Frontier", alt.value("#2E2E2E"), alt.value(None)),
+        "tooltip": tooltip + ["Dominates", "Dominated_By", "Frontier_Gap", "Closest_Frontier"],
+    }
+
+
+def competitor_breadth(comp_df):
+    return (
+        alt.Chart(comp_df)
+        .mark_circle(size=200)
+        .encode(
+            x=alt.X("Breadth_1_5:Q", title="Platform Breadth"),
+            y=alt.Y("Explainability_1_5:Q", title="Explainability Depth"),
+            color=alt.Color(
+                "Type:N",
+                scale=alt.Scale(scheme="set2"),
+                title="Vendor Type",
+            ),
+            **_frontier_encodings(
+                comp_df, ["Vendor", "Type", "Breadth_1_5", "Compliance_1_5", "Explainability_1_5"]
+            ),
+        )
+        .properties(height=350)
+    )
+
+
+def competitor_compliance(comp_df):
+    return (
+        alt.Chart(comp_df)
+        .mark_circle(size=200)
+        .encode(
+            x=alt.X("Compliance_1_5:Q", title="Compliance Strength"),
+            y=alt.Y("Explainability_1_5:Q", title="Explainability Depth"),
+            color=alt.Color("Vendor:N", legend=None),
+            **_frontier_encodings(comp_df, ["Vendor", "Compliance_1_5", "Explainability_1_5"]),
+        )
+        .properties(height=350)
+    )
@@ -0,0 +1,322 @@
+# chs_cli.py
+# Centauri Health Solutions – batch runner for the strategy computations
+#
+# Usage:
+#   python chs_cli.py score segments.parquet scored.parquet --w-tam 0.3 --w-adoption 0.3 --w-fit 0.4
+#   python chs_cli.py score segments.csv scored.csv --criterion Compliance_Burden_1_5=-0.1
+#   python chs_cli.py ice hypotheses.csv ranked.csv
+#   python chs_cli.py funnel funnel.csv conversion.csv
+#   python chs_cli.py funnel-events events.parquet conversion.csv --window-days 30
+#   python chs_cli.py cohorts events_today.csv cohorts.csv --period week
+#   python chs_cli.py roadmap roadmap.csv roadmap_idx.csv
+#   python chs_cli.py schedule roadmap.csv schedule.csv --teams teams.csv --start 2026-01-01
+#   python chs_cli.py competitors competitors.csv gaps.csv --reference CentauriHS
+#   python chs_cli.py frontier competitors.csv frontier.csv --dims Breadth_1_5,Compliance_1_5
+#   python chs_cli.py bundle importance.csv bundle.csv --budget 40 --segments scored.csv
+#
+# Inputs/outputs are CSV or Parquet (picked by extension). Row-wise commands
+# stream the input in chunks, so file size is bounded by disk, not memory.
+# Only pandas/NumPy (and pyarrow for Parquet) are imported; no Streamlit.
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+import chs_cohorts
+import chs_core
+import chs_features
+import chs_funnel
+import chs_roadmap
+import chs_skyline
+
+
+def _is_parquet(path):
+    return os.path.splitext(path)[1].lower() in (".parquet", ".pq")
+
+
+def iter_frames(path, chunk_size=500_000):
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+def read_frame(path):
+    return pd.read_parquet(path) if _is_parquet(path) else pd.read_csv(path)
+
+
+class FrameWriter:
+    # Appends DataFrame chunks to a CSV or Parquet file without holding the
+    # full result in memory.
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self._parquet_writer = None
+
+    def write(self, df):
+        if _is_parquet(self.path):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            if self._parquet_writer is None:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            else:
+                table = pa.Table.from_pandas(
+                    df, schema=self._parquet_writer.schema, preserve_index=False
+                )
+            self._parquet_writer.write_table(table)
+        else:
+            df.to_csv(self.path, mode="w" if self.rows == 0 else "a", header=self.rows == 0, index=False)
+        self.rows += len(df)
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _criterion(item):
+    # argparse type for --criterion: "COLUMN=WEIGHT" -> (column, weight)
+    column, _, weight = item.partition("=")
+    try:
+        if not column:
+            raise ValueError
+        return column, float(weight)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected COLUMN=WEIGHT, got {item!r}") from None
+
+
+def _stream(args, transform):
+    with FrameWriter(args.output) as writer:
+        for chunk in iter_frames(args.input, args.chunk_size):
+            writer.write(transform(chunk))
+    return writer.rows
+
+
+def run_score(args):
+    criteria = dict(args.criterion or [])
+
+    def transform(chunk):
+        chunk["Priority_Score"] = chs_core.compute_priority_scores(
+            chunk, args.w_tam, args.w_adoption, args.w_fit, extra_criteria=criteria
+        )
+        return chunk
+
+    return _stream(args, transform)
+
+
+def run_ice(args):
+    def transform(chunk):
+        chunk["ICE_Score"] = chs_core.compute_ice_scores(chunk)
+        return chunk
+
+    return _stream(args, transform)
+
+
+def run_roadmap(args):
+    def transform(chunk):
+        chunk["QuarterIdx"] = chs_core.quarter_index(chunk["Quarter"]).to_numpy()
+        return chunk
+
+    return _stream(args, transform)
+
+
+def run_schedule(args):
+    # Whole roadmap at once: dependencies can point anywhere in the file
+    teams = read_frame(args.teams) if args.teams else None
+    result = chs_roadmap.schedule_roadmap(read_frame(args.input), teams, start=args.start)
+    print(
+        f"schedule: finishes {result['End_Date'].max():%Y-%m-%d}, "
+        f"{int(result['Critical'].sum())} items on the critical chain",
+        file=sys.stderr,
+    )
+    with FrameWriter(args.output) as writer:
+        writer.write(result)
+    return writer.rows
+
+
+def run_funnel(args):
+    # Conversion depends on the previous stage, so the (small) stage table is
+    # processed whole.
+    result = chs_core.funnel_conversion(read_frame(args.input))
+    with FrameWriter(args.output) as writer:
+        writer.write(result)
+    return writer.rows
+
+
+def run_funnel_events(args):
+    # Raw event log -> stage counts -> conversion, streamed with --chunk-size
+    index = chs_funnel.build_funnel_index(args.input, chunk_rows=args.chunk_size)
+    result = chs_core.funnel_conversion(index.funnel_counts(args.window_days))
+    with FrameWriter(args.output) as writer:
+        writer.write(result)
+    return writer.rows
+
+
+def run_cohorts(args):
+    # Appends the input events to the on-disk cohort store (or rebuilds it from
+    # them with --rebuild) and writes the resulting cohort table
+    store = chs_cohorts.CohortStore(args.store)
+    if args.rebuild:
+        store.rebuild(args.input, chunk_rows=args.chunk_size)
+    else:
+        store.add_file(args.input, chunk_rows=args.chunk_size)
+    with FrameWriter(args.output) as writer:
+        writer.write(store.cohort_table(args.period))
+    return writer.rows
+
+
+def run_competitors(args):
+    result = chs_core.competitor_gaps(read_frame(args.input), reference=args.reference)
+    with FrameWriter(args.output) as writer:
+        writer.write(result)
+    return writer.rows
+
+
+def run_frontier(args):
+    # Whole table at once: dominance compares every vendor with every other
+    comp_df = read_frame(args.input)
+    dims = args.dims.split(",") if args.dims else chs_skyline.score_columns(comp_df)
+    result = chs_skyline.dominance_table(comp_df, dims)
+    print(f"frontier: {int(result['On_Frontier'].sum())} of {len(result)} vendors", file=sys.stderr)
+    if (result["Vendor"] == args.reference).any():
+        gap = chs_skyline.reference_gap(result, dims, args.reference)
+        print(gap.to_string(index=False), file=sys.stderr)
+    with FrameWriter(args.output) as writer:
+        writer.write(result)
+    return writer.rows
+
+
+def run_bundle(args):
+    # Wide importance matrix (optional "Effort" row) -> chosen features
+    importance, effort = chs_features.load_matrix(args.input)
+    if effort is None:
+        effort = pd.Series(1.0, index=importance.columns)
+    weights = None
+    if args.segments:
+        segments = read_frame(args.segments)
+        if "Priority_Score" not in segments.columns:
+            segments["Priority_Score"] = chs_core.compute_priority_scores(segments)
+        weights = chs_features.segment_weights(importance.index, segments)
+    result = chs_features.optimize_bundle(
+        importance, effort, weights, args.budget, args.threshold, args.depth
+    )
+    print(
+        f"bundle: {len(result.chosen)} features, {result.effort_used:,.1f} effort, "
+        f"{result.coverage_pct:.1f}% weighted coverage",
+        file=sys.stderr,
+    )
+    with FrameWriter(args.output) as writer:
+        writer.write(result.selected_frame())
+    return writer.rows
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="chs_cli", description="CHS Strategy & Research Lab batch computations"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_io(p):
+        p.add_argument("input", help="Input CSV or Parquet file")
+        p.add_argument("output", help="Output CSV or Parquet file")
+        p.add_argument("--chunk-size", type=int, default=500_000)
+
+    p = sub.add_parser("score", help="Segment priority scores")
+    add_io(p)
+    p.add_argument("--w-tam", type=float, default=0.3)
+    p.add_argument("--w-adoption", type=float, default=0.3)
+    p.add_argument("--w-fit", type=float, default=0.4)
+    p.add_argument(
+        "--criterion",
+        action="append",
+        type=_criterion,
+        metavar="COLUMN=WEIGHT",
+        help="Extra weighted column, e.g. Compliance_Burden_1_5=-0.1 (repeatable)",
+    )
+    p.set_defaults(func=run_score)
+
+    p = sub.add_parser("ice", help="Hypothesis ICE scores")
+    add_io(p)
+    p.set_defaults(func=run_ice)
+
+    p = sub.add_parser("roadmap", help="Quarter -> QuarterIdx mapping")
+    add_io(p)
+    p.set_defaults(func=run_roadmap)
+
+    p = sub.add_parser("schedule", help="Dependency- and capacity-aware roadmap schedule")
+    add_io(p)
+    p.add_argument("--teams", help="Team,Capacity file (default capacity 1 per team)")
+    p.add_argument("--start", help="Plan start date (default: start of this quarter)")
+    p.set_defaults(func=run_schedule)
+
+    p = sub.add_parser("funnel", help="Stage-over-stage funnel conversion")
+    add_io(p)
+    p.set_defaults(func=run_funnel)
+
+    p = sub.add_parser("funnel-events", help="Funnel conversion from a raw event log")
+    add_io(p)
+    p.add_argument(
+        "--window-days",
+        type=float,
+        default=None,
+        help="Only count stages reached within this many days of a user's first event",
+    )
+    p.set_defaults(func=run_funnel_events)
+
+    p = sub.add_parser("cohorts", help="Update the signup cohort store and export its table")
+    add_io(p)
+    p.add_argument("--store", default=chs_cohorts.DEFAULT_COHORT_DIR, help="Cohort store directory")
+    p.add_argument("--period", choices=chs_cohorts.PERIODS, default="week")
+    p.add_argument("--rebuild", action="store_true", help="Rebuild the store from the input log")
+    p.set_defaults(func=run_cohorts)
+
+    p = sub.add_parser("competitors", help="Per-dimension gaps vs a reference vendor")
+    add_io(p)
+    p.add_argument("--reference", default="CentauriHS")
+    p.set_defaults(func=run_competitors)
+
+    p = sub.add_parser("frontier", help="Pareto frontier, dominance counts and gaps to the frontier")
+    add_io(p)
+    p.add_argument("--dims", help="Comma-separated score columns (default: every *_1_5 column)")
+    p.add_argument("--reference", default="CentauriHS")
+    p.set_defaults(func=run_frontier)
+
+    p = sub.add_parser("bundle", help="Feature bundle maximizing segment coverage under a budget")
+    add_io(p)
+    p.add_argument("--budget", type=float, required=True, help="Total effort allowed")
+    p.add_argument("--threshold", type=int, default=4, help="Importance at which a feature covers a segment")
+    p.add_argument("--depth", type=int, default=1, help="Covering features each segment needs")
+    p.add_argument("--segments", help="Segments file to weight rows by Priority_Score")
+    p.set_defaults(func=run_bundle)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    start = time.perf_counter()
+    rows = args.func(args)
+    print(
+        f"{args.command}: wrote {rows:,} rows to {args.output} "
+        f"in {time.perf_counter() - start:.2f}s",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+# chs_cohorts.py
+# Centauri Health Solutions – signup cohort funnel, materialized on disk
+#
+# Users are assigned to the day they first reached the cohort stage (signup or
+# beyond). For every cohort day we keep a small (stages x days-since-signup)
+# array counting users who first reached each later stage on that day; weekly
+# or monthly tables are rolled up from these at query time. New events only
+# touch the users they mention: their old contribution is subtracted, their
+# first-seen times are updated and the new contribution is added, so only the
+# cohort files of those users are rewritten. Because the arrays are integer
+# counts trimmed to their last non-zero column, an incremental update leaves
+# exactly the files a full rebuild would write.
+#
+# Layout of the store directory:
+#   meta.json              stages and cohort stage the store was built with
+#   users_keys.npy         sorted 64-bit user-id hashes (chs_funnel.FunnelIndex)
+#   users_first_seen.npy   first time each user hit each stage (epoch seconds)
+#   cohorts/YYYY-MM-DD.npy per-cohort-day counts
+
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+
+from chs_funnel import _NEVER, DEFAULT_STAGES, FunnelIndex, _sorted_unique, iter_event_chunks
+
+DEFAULT_COHORT_DIR = os.environ.get(
+    "CHS_COHORT_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "chs_cohorts"),
+)
+
+PERIODS = ("week", "month")
+
+# Bit layout of the (cohort day, stage, day offset) key used to aggregate
+_OFFSET_BITS = 20
+_STAGE_BITS = 6
+
+
+def _period_of_day(days, period):
+    # Epoch day -> period number (weeks start on Monday; epoch day 0 is a Thursday)
+    days = np.asarray(days, dtype=np.int64)
+    if period == "week":
+        return (days + 3) // 7
+    if period == "month":
+        return days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    raise ValueError(f"Unknown period {period!r}; expected one of {PERIODS}")
+
+
+def _period_start(periods, period):
+    periods = np.asarray(periods, dtype=np.int64)
+    if period == "week":
+        return (periods * 7 - 3).astype("datetime64[D]")
+    return periods.astype("datetime64[M]").astype("datetime64[D]")
+
+
+def _atomic_save(path, array):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+class CohortStore:
+    def __init__(self, directory=DEFAULT_COHORT_DIR, stages=DEFAULT_STAGES, cohort_stage=1):
+        self.directory = directory
+        self.stages = list(stages)
+        self.cohort_stage = cohort_stage
+        self.index = FunnelIndex(self.stages)
+        self.cohorts = {}  # cohort epoch day -> int64 (stages, offsets) counts
+        self._lock = threading.Lock()
+        self._load()
+
+    @property
+    def _cohort_dir(self):
+        return os.path.join(self.directory, "cohorts")
+
+    def _meta(self):
+        return {"stages": [list(s) for s in self.stages], "cohort_stage": self.cohort_stage}
+
+    def _load(self):
+        meta_path = os.path.join(self.directory, "meta.json")
+        if not os.path.exists(meta_path):
+            return
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta != self._meta():
+            raise ValueError(
+                f"Cohort store at {self.directory} was built with different stages; rebuild it"
+            )
+        self.index.keys = np.load(os.path.join(self.directory, "users_keys.npy"))
+        self.index.first_seen = np.load(os.path.join(self.directory, "users_first_seen.npy"))
+        for name in os.listdir(self._cohort_dir):
+            if name.endswith(".npy"):
+                day = np.datetime64(name[:-4], "D").astype(np.int64)
+                self.cohorts[int(day)] = np.load(os.path.join(self._cohort_dir, name))
+
+    def _save(self, days):
+        os.makedirs(self._cohort_dir, exist_ok=True)
+        for day in days:
+            path = os.path.join(self._cohort_dir, f"{np.datetime64(day, 'D')}.npy")
+            if day in self.cohorts:
+                _atomic_save(path, self.cohorts[day])
+            elif os.path.exists(path):
+                os.remove(path)
+        _atomic_save(os.path.join(self.directory, "users_keys.npy"), self.index.keys)
+        _atomic_save(os.path.join(self.directory, "users_first_seen.npy"), self.index.first_seen)
+        with open(os.path.join(self.directory, "meta.json"), "w") as f:
+            json.dump(self._meta(), f)
+
+    @property
+    def n_users(self):
+        return self.index.n_users
+
+    def _contributions(self, first_seen):
+        # (cohort day, stage, day offset) keys, one per user per stage reached.
+        # A stage counts as reached once the user reached it or any later one.
+        reach = np.minimum.accumulate(first_seen[:, ::-1], axis=1)[:, ::-1]
+        reach = reach[:, self.cohort_stage:]
+        reach = reach[reach[:, 0] != _NEVER]
+        days = reach.astype(np.int64) // 86400
+        offsets = days - days[:, :1]
+        stage = np.broadcast_to(np.arange(reach.shape[1]), reach.shape)
+        hit = reach != _NEVER
+        return (
+            (days[:, :1] << (_STAGE_BITS + _OFFSET_BITS))
+            | (stage << _OFFSET_BITS)
+            | offsets
+        )[hit]
+
+    def _apply(self, removed, added):
+        # Folds signed contribution keys into the per-cohort arrays; returns
+        # the cohort days that changed
+        keys = np.concatenate([removed, added])
+        sign = np.concatenate([-np.ones(len(removed), np.int64), np.ones(len(added), np.int64)])
+        keys, inverse = np.unique(keys, return_inverse=True)
+        delta = np.bincount(inverse, weights=sign, minlength=len(keys)).astype(np.int64)
+        keys, delta = keys[delta != 0], delta[delta != 0]
+        day = keys >> (_STAGE_BITS + _OFFSET_BITS)
+        stage = (keys >> _OFFSET_BITS) & ((1 << _STAGE_BITS) - 1)
+        offset = keys & ((1 << _OFFSET_BITS) - 1)
+
+        changed = _sorted_unique(day)
+        bounds = np.searchsorted(day, changed, side="right")
+        start = 0
+        n_stages = len(self.stages) - self.cohort_stage
+        for d, end in zip(changed.tolist(), bounds.tolist()):
+            counts = self.cohorts.get(d, np.zeros((n_stages, 0), dtype=np.int64))
+            width = max(counts.shape[1], int(offset[start:end].max()) + 1)
+            if width > counts.shape[1]:
+                counts = np.pad(counts, ((0, 0), (0, width - counts.shape[1])))
+            np.add.at(counts, (stage[start:end], offset[start:end]), delta[start:end])
+            used = np.flatnonzero(counts.any(axis=0))
+            if len(used):
+                self.cohorts[d] = np.ascontiguousarray(counts[:, : used[-1] + 1])
+            else:
+                self.cohorts.pop(d, None)
+            start = end
+        return changed.tolist()
+
+    def add_events(self, user_ids, events, timestamps, save=True):
+        # Incremental update from a batch of new (or late) events
+        with self._lock:
+            keys, stage, ts = self.index.reduce_events(user_ids, events, timestamps)
+            touched = _sorted_unique(keys)
+            rows = self.index.rows_for(touched)
+            removed = self._contributions(self.index.first_seen[rows[rows >= 0]])
+            self.index.merge(keys, stage, ts)
+            added = self._contributions(self.index.first_seen[self.index.rows_for(touched)])
+            changed = self._apply(removed, added)
+            if save:
+                self._save(changed)
+            return changed
+
+    def add_file(self, source, name=None, fmt=None, chunk_rows=1_000_000):
+        changed = set()
+        for chunk in iter_event_chunks(source, fmt or _fmt_for(name or source), chunk_rows):
+            changed.update(self.add_events(chunk["user_id"], chunk["event"], chunk["timestamp"], save=False))
+        with self._lock:
+            self._save(sorted(changed))
+        return sorted(changed)
+
+    def clear(self):
+        with self._lock:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.index = FunnelIndex(self.stages)
+            self.cohorts = {}
+
+    def rebuild(self, source, name=None, fmt=None, chunk_rows=1_000_000):
+        # Full rescan of an event log: the first-seen index is built first and
+        # every cohort file is written once from it
+        self.clear()
+        with self._lock:
+            for chunk in iter_event_chunks(source, fmt or _fmt_for(name or source), chunk_rows):
+                self.index.add_events(chunk["user_id"], chunk["event"], chunk["timestamp"])
+            changed = self._apply(np.empty(0, np.int64), self._contributions(self.index.first_seen))
+            self._save(changed)
+            return changed
+
+    def cohort_table(self, period="week"):
+        # Long table: one row per (cohort, stage, periods since signup) with the
+        # cumulative share of the cohort that has reached the stage by then.
+        # Periods run up to the period of the latest first-seen event.
+        columns = ["Cohort", "Stage", "Period", "Users", "Cohort_Size", "Conversion_%"]
+        with self._lock:
+            seen = self.index.first_seen
+            seen = seen[seen != _NEVER]
+            if not self.cohorts or not len(seen):
+                return pd.DataFrame(columns=columns)
+            horizon = _period_of_day(int(seen.max()) // 86400, period)
+            parts = []
+            for day, counts in self.cohorts.items():
+                stage, offset = np.nonzero(counts)
+                parts.append((np.full(len(stage), day), stage, offset, counts[stage, offset]))
+        day, stage, offset, users = (np.concatenate(p) for p in zip(*parts))
+
+        cohort = _period_of_day(day, period)
+        reached = _period_of_day(day + offset, period) - cohort
+        cohorts = np.unique(cohort)
+        row = np.searchsorted(cohorts, cohort)
+        n_stages = len(self.stages) - self.cohort_stage
+        dense = np.zeros((len(cohorts), n_stages, int(horizon - cohorts[0]) + 1), dtype=np.int64)
+        np.add.at(dense, (row, stage, reached), users)
+        dense = np.cumsum(dense, axis=2)
+
+        size = dense[:, 0, -1]
+        c, s, p = np.nonzero(np.ones_like(dense, dtype=bool))
+        keep = p <= horizon - cohorts[c]
+        c, s, p = c[keep], s[keep], p[keep]
+        labels = np.array([label for _, label in self.stages[self.cohort_stage:]], dtype=object)
+        return pd.DataFrame(
+            {
+                "Cohort": _period_start(cohorts[c], period).astype(str),
+                "Stage": labels[s],
+                "Period": p,
+                "Users": dense[c, s, p],
+                "Cohort_Size": size[c],
+                "Conversion_%": np.round(dense[c, s, p] / size[c] * 100, 1),
+            }
+        )
+
+
+def _fmt_for(name):
+    ext = os.path.splitext(str(name))[1].lower()
+    return "parquet" if ext in (".parquet", ".pq") else "csv"
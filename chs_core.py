@@ -0,0 +1,290 @@
+# chs_core.py
+# Centauri Health Solutions – headless strategy computations (pandas/NumPy only)
+#
+# Nothing in here imports Streamlit, Altair or Graphviz, so batch jobs and the
+# CLI (chs_cli.py) can use the same scoring math as the app without paying for
+# the UI stack.
+
+import numpy as np
+import pandas as pd
+
+# --- Core sample data ---
+
+DEFAULT_SEGMENTS = [
+    {
+        "Segment": "Wellness & Fitness App Developers",
+        "Short Name": "Fitness Apps",
+        "TAM_2024_USD_B": 3.8,
+        "Adoption_Speed_1_5": 4,
+        "Compliance_Burden_1_5": 2,
+        "CHS_Fit_1_5": 4,
+    },
+    {
+        "Segment": "AI Health Coaching Startups",
+        "Short Name": "AI Health Coaches",
+        "TAM_2024_USD_B": 11.0,
+        "Adoption_Speed_1_5": 5,
+        "Compliance_Burden_1_5": 3,
+        "CHS_Fit_1_5": 5,
+    },
+    {
+        "Segment": "Chronic Condition Management Apps",
+        "Short Name": "Chronic Apps",
+        "TAM_2024_USD_B": 1.6,
+        "Adoption_Speed_1_5": 3,
+        "Compliance_Burden_1_5": 5,
+        "CHS_Fit_1_5": 5,
+    },
+    {
+        "Segment": "Wearable Data Aggregators & API Platforms",
+        "Short Name": "Aggregators",
+        "TAM_2024_USD_B": 0.212,
+        "Adoption_Speed_1_5": 3,
+        "Compliance_Burden_1_5": 5,
+        "CHS_Fit_1_5": 4,
+    },
+    {
+        "Segment": "Digital Therapeutics & Rx Wellness Startups",
+        "Short Name": "DTx",
+        "TAM_2024_USD_B": 7.8,
+        "Adoption_Speed_1_5": 2,
+        "Compliance_Burden_1_5": 5,
+        "CHS_Fit_1_5": 4,
+    },
+    {
+        "Segment": "Consumer Wearable Hardware Startups",
+        "Short Name": "Hardware",
+        "TAM_2024_USD_B": 22.0,
+        "Adoption_Speed_1_5": 3,
+        "Compliance_Burden_1_5": 3,
+        "CHS_Fit_1_5": 3,
+    },
+]
+
+# Platform architecture sample
+ARCH_COLUMNS = ["Layer", "Component", "Description", "Status"]
+ARCH_DATA = [
+    ["Experience", "Developer Console", "Project config, API keys, dashboards", "Planned"],
+    ["Experience", "Compliance Dashboard", "BAA center, audit logs, cert view", "Planned"],
+    ["Platform", "Explainability Service", "Model cards, decision logs, feature importance", "Planned"],
+    ["Platform", "Model Hosting", "Healthcare-tuned models (stress, risk, etc.)", "Future"],
+    ["Data", "Unified Wearable APIs", "Apple/Google/Fitbit/Oura connectors", "MVP"],
+    ["Data", "Consent & Audit Layer", "PHI tagging, event logs, consent artifacts", "MVP"],
+    ["Infra", "Security & Residency", "KMS, region routing, retention policies", "MVP"],
+]
+
+# Roadmap sample. ID/Depends_On/Effort_Weeks/Team drive the scheduler in
+# chs_roadmap; roadmaps without them still load (one quarter per item, owned
+# by its Area).
+ROADMAP_PLAN_COLUMNS = ["ID", "Depends_On", "Effort_Weeks", "Team"]
+ROADMAP_COLUMNS = ["Phase", "Quarter", "Area", "Item"] + ROADMAP_PLAN_COLUMNS
+ROADMAP_DATA = [
+    ["MVP", "Q1", "Data & Compliance", "Unified wearable APIs + audit logging", "R1", "", 10, "Data"],
+    ["MVP", "Q1", "Experience", "Developer console + basic dashboard", "R2", "R1", 6, "Experience"],
+    ["V1", "Q2", "AI & Explainability", "Stress model + explainability views", "R3", "R1", 10, "ML"],
+    ["V1", "Q2", "Partnerships", "AI health-coach design partners (5–8)", "R4", "R2", 6, "GTM"],
+    ["V2", "Q3", "Enterprise", "SOC 2, SSO/SCIM, DTx pilots", "R5", "R2;R3", 12, "Platform"],
+    ["V2", "Q3", "Ecosystem", "Aggregator integrations (Validic/Terra-style)", "R6", "R1", 8, "Data"],
+]
+
+# Parallel workstreams per team (teams not listed get 1)
+TEAM_COLUMNS = ["Team", "Capacity"]
+TEAM_DATA = [
+    ["Data", 1],
+    ["Experience", 1],
+    ["ML", 1],
+    ["GTM", 1],
+    ["Platform", 1],
+]
+
+# Pricing sample
+PRICING_COLUMNS = ["Tier", "Price_USD_per_month", "Includes"]
+PRICING_DATA = [
+    ["Sandbox", 0, "1 project, 50k events/month, no BAAs, community support"],
+    ["Growth", 499, "Up to 3 projects, 5M events/month, BAAs, email support"],
+    ["Enterprise", 2500, "Unlimited projects, 50M+ events, BAAs, SSO, dedicated CSM"],
+]
+
+# Funnel sample
+FUNNEL_COLUMNS = ["Stage", "Count"]
+FUNNEL_DATA = [
+    ["Site Visitors", 5000],
+    ["Signup (Dev Accounts)", 800],
+    ["Activated (First API Call)", 300],
+    ["Pilots (Design Partners)", 40],
+    ["Paying Customers", 10],
+]
+
+# Competitor sample
+COMPETITOR_COLUMNS = [
+    "Vendor",
+    "Type",
+    "Breadth_1_5",
+    "Compliance_1_5",
+    "Explainability_1_5",
+]
+COMPETITORS_DATA = [
+    ["AWS Health AI", "Hyperscaler", 5, 3, 3],
+    ["Google Healthcare API", "Hyperscaler", 5, 3, 3],
+    ["Azure Health Data Services", "Hyperscaler", 4, 3, 3],
+    ["Niche AI Vendor A", "Niche", 2, 4, 2],
+    ["Niche AI Vendor B", "Niche", 2, 3, 3],
+    ["CentauriHS", "CHS", 3, 5, 5],
+]
+
+
+# --- Segment prioritization ---
+
+
+def compute_priority_score(row, w_tam=0.3, w_adoption=0.3, w_fit=0.4):
+    # Rough TAM -> 1–5 scale
+    tam_norm = min(max(row["TAM_2024_USD_B"] / 5.0, 1.0), 5.0)
+    return round(
+        tam_norm * w_tam
+        + row["Adoption_Speed_1_5"] * w_adoption
+        + row["CHS_Fit_1_5"] * w_fit,
+        2,
+    )
+
+
+def _round_half_even_exact(values, ndigits=2):
+    # np.round scales by 10**ndigits first, so values sitting on a .xx5 boundary
+    # can land on the other side compared to Python's round(). Only those near-ties
+    # are re-rounded in Python; everything else stays vectorized.
+    values = np.asarray(values, dtype=float)
+    rounded = np.round(values, ndigits)
+    scaled = values * 10.0**ndigits
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        idx = np.flatnonzero(near_tie)
+        rounded[idx] = [round(float(v), ndigits) for v in values[idx]]
+    return rounded
+
+
+def compute_priority_scores(
+    df, w_tam=0.3, w_adoption=0.3, w_fit=0.4, extra_criteria=None
+):
+    # Columnar version of compute_priority_score for whole segment tables.
+    # extra_criteria maps additional columns to weights, e.g.
+    # {"Compliance_Burden_1_5": -0.1} to penalize compliance-heavy segments.
+    tam = df["TAM_2024_USD_B"].to_numpy(dtype=float)
+    adoption = df["Adoption_Speed_1_5"].to_numpy(dtype=float)
+    fit = df["CHS_Fit_1_5"].to_numpy(dtype=float)
+
+    # Rough TAM -> 1–5 scale
+    tam_norm = np.clip(tam / 5.0, 1.0, 5.0)
+    score = tam_norm * w_tam + adoption * w_adoption + fit * w_fit
+    for column, weight in (extra_criteria or {}).items():
+        score = score + df[column].to_numpy(dtype=float) * weight
+
+    return pd.Series(_round_half_even_exact(score, 2), index=df.index, name="Priority_Score")
+
+
+def simplex_weight_grid(steps=50):
+    # All (w_tam, w_adoption, w_fit) triples on a regular grid that sum to 1.
+    i, j = np.meshgrid(np.arange(steps + 1), np.arange(steps + 1), indexing="ij")
+    mask = i + j <= steps
+    a, b = i[mask], j[mask]
+    return np.column_stack([a, b, steps - a - b]) / steps
+
+
+def weight_sensitivity_sweep(df, steps=50, top_k=3, chunk_size=2048, max_cells=2**22):
+    # Scores every segment under every weight vector of the simplex grid as one
+    # (segments x weights) matrix product, processed in column chunks so memory
+    # stays bounded for large segment tables.
+    tam_norm = np.clip(df["TAM_2024_USD_B"].to_numpy(dtype=float) / 5.0, 1.0, 5.0)
+    criteria = np.column_stack(
+        [
+            tam_norm,
+            df["Adoption_Speed_1_5"].to_numpy(dtype=float),
+            df["CHS_Fit_1_5"].to_numpy(dtype=float),
+        ]
+    )
+    weights = simplex_weight_grid(steps)
+    n_seg, n_w = len(criteria), len(weights)
+    k = min(max(top_k, 1), n_seg)
+
+    # Cap the (segments x weights) block so huge imported tables stay bounded
+    chunk_size = max(1, min(chunk_size, max_cells // max(n_seg, 1)))
+
+    rank1_hits = np.zeros(n_seg, dtype=np.int64)
+    topk_hits = np.zeros(n_seg, dtype=np.int64)
+    winner = np.zeros(n_w, dtype=np.int64)
+    for start in range(0, n_w, chunk_size):
+        scores = criteria @ weights[start:start + chunk_size].T
+        best = scores.max(axis=0)
+        # Ties at the top count as #1 for every tied segment
+        rank1_hits += (scores >= best - 1e-9).sum(axis=1)
+        winner[start:start + chunk_size] = scores.argmax(axis=0)
+        kth = np.partition(scores, n_seg - k, axis=0)[n_seg - k]
+        topk_hits += (scores >= kth - 1e-9).sum(axis=1)
+
+    labels = df["Short Name"] if "Short Name" in df.columns else df["Segment"]
+    labels = labels.astype(str).to_numpy()
+    summary = pd.DataFrame(
+        {
+            "Segment": labels,
+            "Share_Rank1_%": np.round(rank1_hits / n_w * 100, 1),
+            f"Share_Top{k}_%": np.round(topk_hits / n_w * 100, 1),
+        }
+    )
+    grid = pd.DataFrame(weights, columns=["w_tam", "w_adoption", "w_fit"])
+    grid["Winner"] = labels[winner]
+    return summary, grid
+
+
+# --- Hypotheses (ICE) ---
+
+
+def compute_ice_score(impact, confidence, effort):
+    return round((impact * confidence) / max(effort, 1), 2)
+
+
+def compute_ice_scores(df):
+    # Columnar compute_ice_score over Impact/Confidence/Effort columns
+    impact = df["Impact_1_5"].to_numpy(dtype=float)
+    confidence = df["Confidence_1_5"].to_numpy(dtype=float)
+    effort = np.maximum(df["Effort_1_5"].to_numpy(dtype=float), 1.0)
+    return pd.Series(
+        _round_half_even_exact(impact * confidence / effort, 2),
+        index=df.index,
+        name="ICE_Score",
+    )
+
+
+# --- Developer funnel ---
+
+
+def funnel_conversion(funnel_df):
+    # Stage-over-stage conversion; a zero previous stage gives NaN, not inf
+    ef = funnel_df.copy()
+    ef["PrevCount"] = ef["Count"].shift(1)
+    ef["Conversion_from_prev_%"] = (
+        ef["Count"] / ef["PrevCount"] * 100
+    ).replace([np.inf, -np.inf], np.nan).round(1)
+    return ef
+
+
+# --- Roadmap ---
+
+QUARTER_ORDER = ["Q1", "Q2", "Q3", "Q4"]
+
+
+def quarter_index(quarters, quarter_order=QUARTER_ORDER):
+    # "Q1".."Q4" -> 1..4; anything unrecognized lands in the first quarter
+    lookup = {q: i + 1 for i, q in enumerate(quarter_order)}
+    return pd.Series(quarters).map(lookup).fillna(1).astype(int)
+
+
+# --- Competitors ---
+
+
+def competitor_gaps(comp_df, reference="CentauriHS", dims=None):
+    # Per-dimension lead (+) or gap (-) of the reference vendor vs each vendor
+    dims = dims or [c for c in comp_df.columns if c.endswith("_1_5")]
+    values = comp_df[dims].to_numpy(dtype=float)
+    ref = comp_df.loc[comp_df["Vendor"] == reference, dims].to_numpy(dtype=float)
+    if len(ref) == 0:
+        raise KeyError(f"Reference vendor {reference!r} not in competitor table")
+    gaps = pd.DataFrame(ref[0] - values, columns=[f"{d}_gap" for d in dims], index=comp_df.index)
+    return pd.concat([comp_df[["Vendor", "Type"]], gaps], axis=1)
@@ -0,0 +1,223 @@
+# chs_features.py
+# Centauri Health Solutions – feature-bundle optimizer
+#
+# Chooses which features to build under an effort budget so that as much
+# (Priority_Score-weighted) segment need as possible is covered. A feature
+# covers a segment when the segment rates it at least `threshold` (1–5). A
+# segment counts as covered once `depth` of its covering features are in the
+# bundle, and as k/depth covered before that. That objective is monotone
+# submodular, so cost-benefit greedy, compared against the best single
+# affordable feature, is within a constant factor of the optimum. Every greedy
+# step scores all features at once: the marginal gains are one
+# (segments,) @ (segments x features) product over the segments that still
+# need coverage.
+
+import os
+
+import numpy as np
+import pandas as pd
+
+SAMPLE_FEATURES = [
+    "Unified Wearable APIs",
+    "Consent & Audit Trails",
+    "Explainability Dashboards",
+    "HIPAA/SOC2 Compliance Pack",
+    "Data Residency Controls",
+    "DTx / FDA Support",
+]
+
+# Rows follow DEFAULT_SEGMENTS ("Short Name")
+SAMPLE_IMPORTANCE = [
+    [5, 3, 3, 2, 2, 1],  # Fitness Apps
+    [4, 4, 5, 4, 3, 2],  # AI Health Coaches
+    [4, 5, 4, 5, 4, 3],  # Chronic Apps
+    [3, 5, 4, 4, 4, 2],  # Aggregators
+    [3, 5, 5, 5, 4, 5],  # DTx
+    [5, 3, 2, 2, 2, 1],  # Hardware
+]
+
+# Person-weeks per feature
+SAMPLE_EFFORT = [8, 5, 6, 8, 3, 13]
+
+EFFORT_ROW = "Effort"
+
+
+def sample_matrix(seg_names):
+    matrix = pd.DataFrame(SAMPLE_IMPORTANCE, columns=SAMPLE_FEATURES, index=list(seg_names))
+    matrix.index.name = "Segment"
+    return matrix, pd.Series(SAMPLE_EFFORT, index=SAMPLE_FEATURES, name="Effort", dtype=float)
+
+
+def synthetic_matrix(n_segments=200, n_features=300, seed=0):
+    # Each segment cares strongly about a few feature "themes"; effort is
+    # log-normal around two person-weeks per feature
+    rng = np.random.default_rng(seed)
+    n_themes = max(n_features // 10, 1)
+    theme = rng.integers(0, n_themes, n_features)
+    affinity = rng.random((n_segments, n_themes)) ** 3
+    scores = 1 + 4 * affinity[:, theme] + rng.normal(0, 0.6, (n_segments, n_features))
+    matrix = pd.DataFrame(
+        np.clip(np.rint(scores), 1, 5).astype(np.int8),
+        index=pd.Index([f"Segment {i}" for i in range(n_segments)], name="Segment"),
+        columns=[f"Feature {j:03d}" for j in range(n_features)],
+    )
+    effort = pd.Series(
+        np.round(rng.lognormal(np.log(2.0), 0.7, n_features), 1).clip(0.5),
+        index=matrix.columns,
+        name="Effort",
+    )
+    return matrix, effort
+
+
+def load_matrix(source, name=None):
+    # Wide file: a Segment column plus one 1–5 column per feature. An optional
+    # row whose Segment is "Effort" holds the effort of each feature.
+    ext = os.path.splitext(str(name or source))[1].lower()
+    df = pd.read_parquet(source) if ext in (".parquet", ".pq") else pd.read_csv(source)
+    if "Segment" not in df.columns:
+        raise ValueError("Importance file needs a Segment column")
+    df = df.set_index(df["Segment"].astype(str)).drop(columns=["Segment"])
+    df.index.name = "Segment"
+    df = df.apply(pd.to_numeric, errors="coerce")
+    effort = None
+    if EFFORT_ROW in df.index:
+        effort = df.loc[EFFORT_ROW].astype(float).rename("Effort")
+        df = df.drop(index=EFFORT_ROW)
+    return df.fillna(0).clip(0, 5).astype(np.int8), effort
+
+
+def segment_weights(seg_names, segments_df):
+    # Priority_Score per matrix row, matched on Short Name or Segment. Rows
+    # with no matching segment get the mean weight of the matched ones.
+    scores = pd.concat(
+        [
+            segments_df.set_index(segments_df["Short Name"].astype(str))["Priority_Score"],
+            segments_df.set_index(segments_df["Segment"].astype(str))["Priority_Score"],
+        ]
+    )
+    scores = scores[~scores.index.duplicated()]
+    weights = pd.Series(list(seg_names), dtype=str).map(scores).to_numpy(dtype=float)
+    matched = ~np.isnan(weights)
+    fill = weights[matched].mean() if matched.any() else 1.0
+    return pd.Series(np.where(matched, weights, fill), index=list(seg_names), name="Weight")
+
+
+class BundleResult:
+    def __init__(self, features, effort, weights, chosen, gains, coverage, value, max_value):
+        self.features = features
+        self.effort = effort
+        self.weights = weights
+        self.chosen = chosen  # feature positions in pick order
+        self.gains = gains
+        self.coverage = coverage  # per segment, 0..1
+        self.value = value
+        self.max_value = max_value
+
+    @property
+    def coverage_pct(self):
+        return 100.0 * self.value / self.max_value if self.max_value > 0 else 0.0
+
+    @property
+    def effort_used(self):
+        return float(self.effort[self.chosen].sum())
+
+    def selected(self):
+        return [self.features[j] for j in self.chosen]
+
+    def selected_frame(self):
+        gains = np.asarray(self.gains, dtype=float)
+        scale = 100 / self.max_value if self.max_value > 0 else 0.0
+        return pd.DataFrame(
+            {
+                "Pick": np.arange(1, len(self.chosen) + 1),
+                "Feature": self.selected(),
+                "Effort": self.effort[self.chosen],
+                "Coverage_gain_%": np.round(gains * scale, 2),
+                "Cumulative_coverage_%": np.round(np.cumsum(gains) * scale, 2),
+                "Cumulative_effort": np.cumsum(self.effort[self.chosen]),
+            }
+        )
+
+    def segment_frame(self, seg_names):
+        return pd.DataFrame(
+            {
+                "Segment": list(seg_names),
+                "Weight": np.round(self.weights, 3),
+                "Covered_%": np.round(100 * self.coverage, 1),
+            }
+        )
+
+
+def optimize_bundle(importance, effort, weights=None, budget=np.inf, threshold=4, depth=1):
+    # importance: (segments x features) DataFrame of 1–5 scores; effort: per
+    # feature (aligned by name); weights: per segment, default 1.
+    features = list(importance.columns)
+    covers = importance.to_numpy(dtype=float) >= threshold
+    cost = pd.Series(effort).reindex(features).fillna(0.0).to_numpy(dtype=float)
+    n_segments = covers.shape[0]
+    w = np.ones(n_segments) if weights is None else np.asarray(weights, dtype=float)
+    w = np.nan_to_num(np.maximum(w, 0.0))
+    depth = max(int(depth), 1)
+    cover_matrix = covers.astype(np.float64)
+
+    # Segments that can never reach `depth` still count for what they can get
+    max_value = float(w @ np.minimum(covers.sum(axis=1), depth) / depth)
+    ratio_cost = np.maximum(cost, 1e-9)
+
+    count = np.zeros(n_segments)
+    chosen, gains = [], []
+    picked = np.zeros(len(features), dtype=bool)
+    remaining = float(budget)
+    first_gain = None
+    while True:
+        need = w * (count < depth) / depth
+        gain = need @ cover_matrix
+        if first_gain is None:
+            first_gain = gain
+        ok = ~picked & (cost <= remaining + 1e-9) & (gain > 1e-12)
+        if not ok.any():
+            break
+        j = int(np.argmax(np.where(ok, gain / ratio_cost, -np.inf)))
+        chosen.append(j)
+        gains.append(float(gain[j]))
+        picked[j] = True
+        count += cover_matrix[:, j]
+        remaining -= cost[j]
+
+    # Cost-benefit greedy can be fooled by one expensive, high-value feature;
+    # the better of the two keeps the constant-factor guarantee
+    affordable = (cost <= budget + 1e-9) & (first_gain > 0)
+    if affordable.any():
+        best = int(np.argmax(np.where(affordable, first_gain, -np.inf)))
+        if first_gain[best] > sum(gains) + 1e-12:
+            chosen, gains = [best], [float(first_gain[best])]
+            count = cover_matrix[:, best].copy()
+
+    coverage = np.minimum(count, depth) / depth
+    return BundleResult(
+        features, cost, w, chosen, gains, coverage, float(w @ coverage), max_value
+    )
+
+
+def bundle_heatmap_frame(importance, selected, max_features=60, max_segments=60, weights=None):
+    # Long (Segment, Feature, Importance, In_Bundle) table for the heatmap.
+    # Large matrices are cut to the bundle plus the highest-importance other
+    # features, and to the heaviest segments.
+    features = list(importance.columns)
+    selected = [f for f in selected if f in importance.columns]
+    if len(features) > max_features:
+        rest = importance.drop(columns=selected).mean().sort_values(ascending=False)
+        features = selected + list(rest.index[: max(max_features - len(selected), 0)])
+    rows = importance.index
+    if len(rows) > max_segments:
+        if weights is None:
+            keep = np.arange(max_segments)
+        else:
+            keep = np.sort(np.argsort(-np.asarray(weights, dtype=float))[:max_segments])
+        rows = importance.index[keep]
+    sub = importance.loc[rows, features]
+    long = sub.reset_index(names="Segment").melt(
+        id_vars=["Segment"], var_name="Feature", value_name="Importance"
+    )
+    long["In_Bundle"] = long["Feature"].isin(selected)
+    return long, features, [str(r) for r in rows]
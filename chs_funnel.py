@@ -0,0 +1,172 @@
+# chs_funnel.py
+# Centauri Health Solutions – developer funnel built from raw event logs
+#
+# Event files (user_id, event, timestamp) are streamed in chunks. Per user we
+# keep only the first time each funnel stage was hit, in a (users x stages)
+# uint32 array of epoch seconds addressed through a sorted array of 64-bit
+# user-id hashes. Memory is ~28 bytes per distinct user no matter how many
+# events the log holds, and stages can be re-evaluated for any conversion
+# window without re-reading the file.
+
+import os
+
+import numpy as np
+import pandas as pd
+
+# (event name in the log, stage label in the funnel table), in funnel order
+DEFAULT_STAGES = [
+    ("page_view", "Site Visitors"),
+    ("signup", "Signup (Dev Accounts)"),
+    ("first_api_call", "Activated (First API Call)"),
+    ("pilot_start", "Pilots (Design Partners)"),
+    ("paid", "Paying Customers"),
+]
+
+_NEVER = np.iinfo(np.uint32).max
+
+
+def _hash_ids(values):
+    # 64-bit hashes stand in for user ids (string or numeric) in the index
+    return pd.util.hash_array(np.asarray(values))
+
+
+def _sorted_unique(values):
+    # np.unique for input that is already sorted
+    keep = np.ones(len(values), dtype=bool)
+    keep[1:] = values[1:] != values[:-1]
+    return values[keep]
+
+
+class FunnelIndex:
+    def __init__(self, stages=DEFAULT_STAGES):
+        self.stages = list(stages)
+        self._stage_codes = {event: i for i, (event, _) in enumerate(self.stages)}
+        self.keys = np.empty(0, dtype=np.uint64)
+        self.first_seen = np.empty((0, len(self.stages)), dtype=np.uint32)
+        self.events_read = 0
+        self.events_used = 0
+
+    @property
+    def n_users(self):
+        return len(self.keys)
+
+    def nbytes(self):
+        return self.keys.nbytes + self.first_seen.nbytes
+
+    def add_events(self, user_ids, events, timestamps):
+        # user_ids/events: array-likes; timestamps: datetimes, strings or epoch seconds
+        self.merge(*self.reduce_events(user_ids, events, timestamps))
+
+    def reduce_events(self, user_ids, events, timestamps):
+        # Earliest timestamp per (user, stage) within one chunk, sorted by user
+        # hash: returns (keys, stage codes, epoch seconds)
+        self.events_read += len(user_ids)
+        stage = np.asarray(pd.Series(events).map(self._stage_codes), dtype=float)
+        ts = _to_epoch_seconds(timestamps)
+        ok = ~np.isnan(stage) & (ts >= 0) & (ts < _NEVER)
+        keys = _hash_ids(pd.Series(user_ids).to_numpy()[ok])
+        stage = stage[ok].astype(np.int64)
+        ts = ts[ok].astype(np.uint32)
+        self.events_used += int(ok.sum())
+
+        order = np.lexsort((ts, stage, keys))
+        keys, stage, ts = keys[order], stage[order], ts[order]
+        first = np.ones(len(keys), dtype=bool)
+        first[1:] = (keys[1:] != keys[:-1]) | (stage[1:] != stage[:-1])
+        return keys[first], stage[first], ts[first]
+
+    def merge(self, keys, stage, ts):
+        # Fold reduce_events output into the index
+        self._insert_new_keys(_sorted_unique(keys))
+        flat = np.searchsorted(self.keys, keys) * len(self.stages) + stage
+        table = self.first_seen.reshape(-1)
+        table[flat] = np.minimum(table[flat], ts)
+
+    def rows_for(self, keys):
+        # Index rows of the given (sorted, unique) keys; -1 for unknown users
+        pos = np.searchsorted(self.keys, keys)
+        found = pos < len(self.keys)
+        found[found] = self.keys[pos[found]] == keys[found]
+        return np.where(found, pos, -1)
+
+    def _insert_new_keys(self, chunk_keys):
+        pos = np.searchsorted(self.keys, chunk_keys)
+        known = np.zeros(len(chunk_keys), dtype=bool)
+        if len(self.keys):
+            known = self.keys[np.minimum(pos, len(self.keys) - 1)] == chunk_keys
+        new = chunk_keys[~known]
+        if len(new) == 0:
+            return
+        at = pos[~known]
+        self.keys = np.insert(self.keys, at, new)
+        self.first_seen = np.insert(self.first_seen, at, _NEVER, axis=0)
+
+    def furthest_stage(self, window_days=None):
+        # Per user: highest stage first reached within window_days of the user's
+        # first event of any stage (-1 for users with no qualifying stage).
+        seen = self.first_seen
+        entry = seen.min(axis=1).astype(np.int64)
+        reached = seen != _NEVER
+        if window_days is not None:
+            reached &= seen.astype(np.int64) <= (entry + int(window_days * 86400))[:, None]
+        any_reached = reached.any(axis=1)
+        last = len(self.stages) - 1 - np.argmax(reached[:, ::-1], axis=1)
+        return np.where(any_reached, last, -1)
+
+    def funnel_counts(self, window_days=None):
+        # Users whose furthest stage is at or beyond each stage, in the same
+        # Stage/Count shape as FUNNEL_DATA
+        furthest = self.furthest_stage(window_days)
+        at_stage = np.bincount(furthest[furthest >= 0], minlength=len(self.stages))
+        at_or_beyond = np.cumsum(at_stage[::-1])[::-1]
+        return pd.DataFrame(
+            {"Stage": [label for _, label in self.stages], "Count": at_or_beyond.astype(np.int64)}
+        )
+
+
+def _to_epoch_seconds(timestamps):
+    # Unparseable timestamps come back as -1 and are dropped by add_events
+    ts = pd.Series(timestamps)
+    if pd.api.types.is_numeric_dtype(ts):
+        # Already epoch seconds
+        values = ts.to_numpy(dtype=float, na_value=np.nan)
+        return np.where(np.isnan(values), -1, np.round(values)).astype(np.int64)
+    parsed = pd.to_datetime(ts, utc=True, errors="coerce")
+    seconds = parsed.to_numpy(dtype="datetime64[s]").astype(np.int64)
+    return np.where(parsed.isna().to_numpy(), -1, seconds)
+
+
+def iter_event_chunks(source, fmt="csv", chunk_rows=1_000_000, columns=("user_id", "event", "timestamp")):
+    columns = list(columns)
+    if fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if isinstance(source, (str, os.PathLike)):
+            source = pa.memory_map(str(source), "r")
+        pf = pq.ParquetFile(source, read_dictionary=[columns[1]])
+        for batch in pf.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(
+            source, chunksize=chunk_rows, usecols=columns, dtype={columns[1]: "category"}
+        )
+
+
+def build_funnel_index(
+    source,
+    name=None,
+    fmt=None,
+    stages=DEFAULT_STAGES,
+    chunk_rows=1_000_000,
+    user_col="user_id",
+    event_col="event",
+    time_col="timestamp",
+):
+    if fmt is None:
+        ext = os.path.splitext(str(name or source))[1].lower()
+        fmt = "parquet" if ext in (".parquet", ".pq") else "csv"
+    index = FunnelIndex(stages)
+    for chunk in iter_event_chunks(source, fmt, chunk_rows, (user_col, event_col, time_col)):
+        index.add_events(chunk[user_col], chunk[event_col], chunk[time_col])
+    return index
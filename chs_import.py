@@ -0,0 +1,192 @@
+# chs_import.py
+# Centauri Health Solutions – streaming bulk import of segment market-sizing files
+#
+# Files are read chunk by chunk (CSV via pandas, Parquet via memory-mapped
+# Arrow record batches). Each chunk is validated with vectorized checks, bad
+# rows are counted and sampled rather than aborting the import, and good rows
+# are shrunk to compact dtypes before being kept. Working memory is one raw
+# chunk (sized from the memory budget) plus the compact result, about 20 bytes
+# per valid segment row including Priority_Score.
+
+import os
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+import chs_core
+
+SCORE_COLUMNS = ["Adoption_Speed_1_5", "Compliance_Burden_1_5", "CHS_Fit_1_5"]
+REQUIRED_COLUMNS = ["Segment", "TAM_2024_USD_B"] + SCORE_COLUMNS
+
+# Rough in-memory size of one raw (pre-validation) row, used to size chunks
+_RAW_ROW_BYTES = 400
+
+
+class ImportReport:
+    def __init__(self, max_bad_samples=1000):
+        self.max_bad_samples = max_bad_samples
+        self.rows_read = 0
+        self.rows_valid = 0
+        self.reasons = Counter()
+        self._bad_parts = []
+        self._bad_kept = 0
+
+    @property
+    def rows_bad(self):
+        return self.rows_read - self.rows_valid
+
+    def add_bad(self, bad):
+        self.reasons.update(bad["Reason"].value_counts().to_dict())
+        room = self.max_bad_samples - self._bad_kept
+        if room > 0:
+            self._bad_parts.append(bad.head(room))
+            self._bad_kept += min(room, len(bad))
+
+    def bad_rows(self):
+        if not self._bad_parts:
+            return pd.DataFrame(columns=["Row", "Reason"])
+        return pd.concat(self._bad_parts, ignore_index=True)
+
+    def summary(self):
+        return pd.DataFrame(
+            sorted(self.reasons.items(), key=lambda kv: -kv[1]),
+            columns=["Reason", "Rows"],
+        )
+
+
+def _detect_format(name):
+    ext = os.path.splitext(str(name))[1].lower()
+    return "parquet" if ext in (".parquet", ".pq") else "csv"
+
+
+def iter_raw_chunks(source, fmt="csv", chunk_rows=100_000):
+    # source is a path or a binary file-like object (e.g. st.file_uploader)
+    if fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if isinstance(source, (str, os.PathLike)):
+            source = pa.memory_map(str(source), "r")
+        names = pq.read_schema(source).names
+        if hasattr(source, "seek"):
+            source.seek(0)
+        # Dictionary-decode the name columns so they arrive as categoricals
+        pf = pq.ParquetFile(
+            source,
+            read_dictionary=[c for c in ("Segment", "Short Name") if c in names],
+        )
+        columns = [c for c in names if c in REQUIRED_COLUMNS + ["Short Name"]]
+        for batch in pf.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(
+            source,
+            chunksize=chunk_rows,
+            usecols=lambda c: c in REQUIRED_COLUMNS or c == "Short Name",
+            dtype={"Segment": "category", "Short Name": "category"},
+        )
+
+
+def validate_chunk(chunk, row_offset=0):
+    # Returns (compact valid rows with Priority_Score, bad rows with source row
+    # number and reason)
+    missing = [c for c in REQUIRED_COLUMNS if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+    segment = chunk["Segment"]
+    tam = pd.to_numeric(chunk["TAM_2024_USD_B"], errors="coerce").to_numpy(dtype=float)
+    scores = {c: pd.to_numeric(chunk[c], errors="coerce").to_numpy(dtype=float) for c in SCORE_COLUMNS}
+
+    # First failing check wins as the reported reason (coded as int8, only
+    # turned into text for the bad rows)
+    checks = [(segment.isna().to_numpy(), "Segment missing")]
+    checks.append((np.isnan(tam), "TAM_2024_USD_B not a number"))
+    checks.append((tam < 0, "TAM_2024_USD_B < 0"))
+    for col, values in scores.items():
+        checks.append((np.isnan(values), f"{col} not a number"))
+        out_of_range = (values < 1) | (values > 5) | (values != np.round(values))
+        checks.append((out_of_range, f"{col} outside 1–5"))
+    labels = np.array([""] + [r for _, r in checks], dtype=object)
+    code = np.select(
+        [mask for mask, _ in checks], np.arange(1, len(checks) + 1, dtype=np.int8), 0
+    )
+    ok = code == 0
+
+    bad = pd.DataFrame(
+        {"Row": np.flatnonzero(~ok) + row_offset, "Reason": labels[code[~ok]]}
+    )
+
+    segment = segment[ok].astype("category")
+    if "Short Name" in chunk.columns:
+        short = chunk["Short Name"][ok].astype(object)
+        short = short.where(short.notna(), segment.astype(object)).astype("category")
+    else:
+        short = segment
+    good = pd.DataFrame(
+        {
+            "Segment": segment.array,
+            "Short Name": short.array,
+            "TAM_2024_USD_B": tam[ok].astype(np.float32),
+            **{c: scores[c][ok].astype(np.int8) for c in SCORE_COLUMNS},
+        }
+    )
+    good["Priority_Score"] = chs_core.compute_priority_scores(good).to_numpy()
+    return good, bad
+
+
+COMPACT_COLUMNS = ["Segment", "Short Name", "TAM_2024_USD_B"] + SCORE_COLUMNS + ["Priority_Score"]
+
+
+def _concat_compact(parts):
+    # parts are {column: array} dicts; each column is popped from every part as
+    # soon as it has been concatenated, so peak memory stays near one copy of
+    # the compact result instead of two.
+    if not parts:
+        return pd.DataFrame(
+            {
+                "Segment": pd.Categorical([]),
+                "Short Name": pd.Categorical([]),
+                "TAM_2024_USD_B": np.array([], dtype=np.float32),
+                **{c: np.array([], dtype=np.int8) for c in SCORE_COLUMNS},
+                "Priority_Score": np.array([], dtype=float),
+            }
+        )
+    out = {}
+    for col in COMPACT_COLUMNS:
+        pieces = [p.pop(col) for p in parts]
+        if col in ("Segment", "Short Name"):
+            # union_categoricals keeps the result categorical; pd.concat would
+            # fall back to object strings when chunks have different categories.
+            out[col] = union_categoricals(pieces)
+        else:
+            out[col] = np.concatenate([np.asarray(a) for a in pieces])
+        del pieces
+    return pd.DataFrame(out)
+
+
+def import_segments(
+    source, name=None, fmt=None, memory_budget_mb=256, chunk_rows=None, max_bad_samples=1000
+):
+    # Streams a segment file into a compact DataFrame with Priority_Score.
+    # Scores are computed per chunk so no full-length float64 temporaries exist.
+    # chunk_rows defaults to what fits in about a quarter of the memory budget.
+    fmt = fmt or _detect_format(name or source)
+    if chunk_rows is None:
+        chunk_rows = max(10_000, int(memory_budget_mb * 2**20 / 4 / _RAW_ROW_BYTES))
+
+    report = ImportReport(max_bad_samples=max_bad_samples)
+    parts = []
+    for chunk in iter_raw_chunks(source, fmt=fmt, chunk_rows=chunk_rows):
+        good, bad = validate_chunk(chunk, row_offset=report.rows_read)
+        report.rows_read += len(chunk)
+        report.rows_valid += len(good)
+        if len(bad):
+            report.add_bad(bad)
+        if len(good):
+            parts.append({c: good[c].array for c in COMPACT_COLUMNS})
+        del chunk, good
+
+    return _concat_compact(parts), report
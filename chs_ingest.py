@@ -0,0 +1,616 @@
+# chs_ingest.py
+# Centauri Health Solutions – market-data ingestion (segment TAM, competitor
+# scores, funnel counts)
+#
+# Usage:
+#   python chs_ingest.py stub --port 8765 --delay 0.2      # local stub endpoints
+#   python chs_ingest.py demo --sources 200                # stub + one refresh
+#   python chs_ingest.py fetch sources.json                # one refresh, status
+#
+# A source is a name, the table it feeds and a URL: an http(s) endpoint that
+# returns JSON records, or a local CSV/Parquet/JSON file. Sources are listed
+# in sources.json in the reference directory (CHS_SOURCES_PATH). A refresh
+# fetches every due source at once on an asyncio loop. Requests share a
+# keep-alive connection pool that never holds more than `max_connections`
+# sockets, and failed requests (connection errors, timeouts, 429/5xx) are
+# retried with jittered exponential backoff. N sources therefore take about
+# as long as the slowest one, not the sum. Results land in a TTL cache. Page
+# reruns read the cache and never wait: the loop runs on a background
+# thread, and expired entries are served, flagged stale, until a refresh
+# replaces them. Only the standard library does the I/O.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import ssl
+import sys
+import threading
+import time
+import urllib.parse
+
+import numpy as np
+import pandas as pd
+
+import chs_core
+from chs_reference import DEFAULT_REFERENCE_DIR
+from chs_schema import apply_schema
+
+DEFAULT_SOURCES_PATH = os.environ.get(
+    "CHS_SOURCES_PATH", os.path.join(DEFAULT_REFERENCE_DIR, "sources.json")
+)
+DEFAULT_TTL_S = 15 * 60
+DEFAULT_MAX_CONNECTIONS = 256
+DEFAULT_TIMEOUT_S = 10.0
+DEFAULT_RETRIES = 3
+BACKOFF_S = 0.25
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# table -> (required columns, key column, how rows from several sources combine)
+TABLES = {
+    "segments": (["Segment", "TAM_2024_USD_B"], "Segment", "last"),
+    "competitors": (chs_core.COMPETITOR_COLUMNS, "Vendor", "last"),
+    "funnel": (chs_core.FUNNEL_COLUMNS, "Stage", "sum"),
+}
+
+STATUS_COLUMNS = ["Source", "Table", "Rows", "Age_s", "Fetch_ms", "Stale", "Error"]
+
+
+class FetchError(RuntimeError):
+    pass
+
+
+class Source:
+    def __init__(self, name, table, url, ttl=DEFAULT_TTL_S, records=None):
+        if table not in TABLES:
+            raise ValueError(f"Source {name!r}: unknown table {table!r}")
+        self.name = name
+        self.table = table
+        self.url = url
+        self.ttl = float(ttl)
+        self.records = records  # dotted path to the record list in the JSON
+
+    @property
+    def is_http(self):
+        return self.url.startswith(("http://", "https://"))
+
+
+def load_sources(path=DEFAULT_SOURCES_PATH):
+    # [{"name", "table", "url", "ttl"?, "records"?}, ...]; relative file URLs
+    # are resolved against the config file's directory
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        config = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    sources = []
+    for item in config:
+        item = dict(item)
+        url = item.pop("url")
+        if url.startswith("file://"):
+            url = url[len("file://"):]
+        if not url.startswith(("http://", "https://")) and not os.path.isabs(url):
+            url = os.path.join(base, url)
+        sources.append(Source(item.pop("name"), item.pop("table"), url, **item))
+    return sources
+
+
+# --- HTTP over a bounded keep-alive pool ---
+
+
+class ConnectionPool:
+    # At most max_connections sockets exist at once (in use or idle); idle
+    # ones are reused per (host, port, tls)
+
+    def __init__(self, max_connections=DEFAULT_MAX_CONNECTIONS):
+        self.max_connections = max_connections
+        self._slots = asyncio.Semaphore(max_connections)
+        self._idle = {}
+        self._active = 0
+        self.opened = 0
+        self.reused = 0
+
+    def _take(self, key):
+        idle = self._idle.get(key)
+        while idle:
+            reader, writer = idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer
+            writer.close()
+        return None
+
+    def _n_idle(self):
+        return sum(len(v) for v in self._idle.values())
+
+    async def request(self, url, timeout=DEFAULT_TIMEOUT_S):
+        parts = urllib.parse.urlsplit(url)
+        tls = parts.scheme == "https"
+        host = parts.hostname
+        port = parts.port or (443 if tls else 80)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        key = (host, port, tls)
+        async with self._slots:
+            self._active += 1
+            try:
+                return await self._request(key, host, port, tls, target, timeout)
+            finally:
+                self._active -= 1
+
+    async def _request(self, key, host, port, tls, target, timeout):
+        conn = self._take(key)
+        if conn is not None:
+            self.reused += 1
+            try:
+                return await self._exchange(conn, key, host, port, target, timeout)
+            except (OSError, asyncio.IncompleteReadError):
+                # The server dropped the idle connection; try a fresh one
+                pass
+        # Sockets in use plus idle ones stay within the bound
+        if self._active + self._n_idle() > self.max_connections:
+            for idle in self._idle.values():
+                if idle:
+                    idle.pop()[1].close()
+                    break
+        conn = await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=ssl.create_default_context() if tls else None),
+            timeout,
+        )
+        self.opened += 1
+        return await self._exchange(conn, key, host, port, target, timeout)
+
+    async def _exchange(self, conn, key, host, port, target, timeout):
+        reader, writer = conn
+        try:
+            status, keep_alive, body = await asyncio.wait_for(
+                _http_get(reader, writer, host, port, target), timeout
+            )
+        except BaseException:
+            writer.close()
+            raise
+        if keep_alive:
+            self._idle.setdefault(key, []).append(conn)
+        else:
+            writer.close()
+        return status, body
+
+    def close(self):
+        for idle in self._idle.values():
+            for _, writer in idle:
+                writer.close()
+        self._idle.clear()
+
+
+async def _http_get(reader, writer, host, port, target):
+    writer.write(
+        (
+            f"GET {target} HTTP/1.1\r\nHost: {host}:{port}\r\nAccept: application/json\r\n"
+            "User-Agent: chs-ingest\r\nConnection: keep-alive\r\n\r\n"
+        ).encode("latin-1")
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError("Connection closed before a response")
+    version, status = status_line.decode("latin-1").split(None, 2)[:2]
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readline()
+        body = b"".join(chunks)
+    elif "content-length" in headers:
+        body = await reader.readexactly(int(headers["content-length"]))
+    else:
+        body = await reader.read()
+        keep_alive = False
+    return int(status), keep_alive, body
+
+
+async def fetch(pool, url, retries=DEFAULT_RETRIES, timeout=DEFAULT_TIMEOUT_S):
+    # Response body; retries connection errors, timeouts, 429 and 5xx
+    error = None
+    for attempt in range(retries + 1):
+        try:
+            status, body = await pool.request(url, timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as exc:
+            error = exc
+        else:
+            if status < 400:
+                return body
+            if status not in RETRY_STATUSES:
+                raise FetchError(f"HTTP {status}")
+            error = f"HTTP {status}"
+        if attempt < retries:
+            await asyncio.sleep(BACKOFF_S * 2**attempt * random.uniform(0.5, 1.5))
+    reason = str(error) or type(error).__name__
+    raise FetchError(f"{reason} after {retries + 1} attempts")
+
+
+# --- Sources -> frames ---
+
+
+def _records(payload, path=None):
+    if path:
+        for part in path.split("."):
+            payload = payload[part]
+    elif isinstance(payload, dict):
+        for key in ("records", "data", "items"):
+            if isinstance(payload.get(key), list):
+                return payload[key]
+    if not isinstance(payload, list):
+        raise ValueError("Expected a list of records")
+    return payload
+
+
+def _read_file(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".parquet", ".pq"):
+        return pd.read_parquet(path)
+    if ext == ".json":
+        with open(path) as f:
+            return pd.DataFrame(_records(json.load(f)))
+    return pd.read_csv(path)
+
+
+def to_table(df, table):
+    required = TABLES[table][0]
+    missing = [c for c in required if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns {missing}")
+    return apply_schema(df, table)
+
+
+async def read_source(pool, source, retries=DEFAULT_RETRIES, timeout=DEFAULT_TIMEOUT_S):
+    if source.is_http:
+        body = await fetch(pool, source.url, retries, timeout)
+        df = pd.DataFrame(_records(json.loads(body), source.records))
+    else:
+        df = await asyncio.to_thread(_read_file, source.url)
+    return to_table(df, source.table)
+
+
+# --- TTL cache ---
+
+
+class CacheEntry:
+    def __init__(self, value, ttl, fetch_s):
+        self.value = value
+        self.fetched = time.time()
+        self.expires = time.monotonic() + ttl
+        self.fetch_ms = fetch_s * 1000
+        self.error = None
+
+    @property
+    def stale(self):
+        return time.monotonic() >= self.expires
+
+
+class TTLCache:
+    # name -> CacheEntry. An expired entry is still served (stale) until it
+    # is replaced; a failed refresh keeps the last good value and records
+    # the error.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def put(self, name, value, ttl, fetch_s=0.0):
+        with self._lock:
+            self._entries[name] = CacheEntry(value, ttl, fetch_s)
+
+    def fail(self, name, error, ttl):
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                entry = self._entries[name] = CacheEntry(None, 0, 0.0)
+            # Retry failed sources sooner than healthy ones
+            entry.expires = time.monotonic() + min(ttl, 60.0)
+            entry.error = str(error)
+
+    def get(self, name):
+        with self._lock:
+            return self._entries.get(name)
+
+    def due(self, name):
+        entry = self.get(name)
+        return entry is None or entry.stale
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+async def refresh_sources(pool, sources, cache, retries=DEFAULT_RETRIES, timeout=DEFAULT_TIMEOUT_S):
+    # Fetches all sources concurrently into cache; returns the wall time
+    # A failing source (network error, bad payload, a records path that does
+    # not match it, ...) is recorded against that source only
+    async def one(source):
+        start = time.perf_counter()
+        try:
+            df = await read_source(pool, source, retries, timeout)
+        except Exception as exc:
+            cache.fail(source.name, f"{type(exc).__name__}: {exc}", source.ttl)
+        else:
+            cache.put(source.name, df, source.ttl, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one(s) for s in sources), return_exceptions=True)
+    for source, result in zip(sources, results):
+        if isinstance(result, Exception):
+            cache.fail(source.name, f"{type(result).__name__}: {result}", source.ttl)
+    return time.perf_counter() - start
+
+
+def combine(frames, table):
+    # One table from several sources: later sources win per key, or counts
+    # are summed (funnel), keeping the order keys first appear in
+    _, key, how = TABLES[table]
+    df = pd.concat(frames, ignore_index=True)
+    if how == "sum":
+        return df.groupby(key, sort=False, observed=True).sum(numeric_only=True).reset_index()
+    return df.drop_duplicates(key, keep="last").reset_index(drop=True)
+
+
+class MarketData:
+    # Process-wide: one cache, one background event loop, one pool
+
+    def __init__(self, sources, max_connections=DEFAULT_MAX_CONNECTIONS,
+                 retries=DEFAULT_RETRIES, timeout=DEFAULT_TIMEOUT_S):
+        self.sources = list(sources)
+        self.cache = TTLCache()
+        self.max_connections = max_connections
+        self.retries = retries
+        self.timeout = timeout
+        self.last_refresh_s = None
+        self._lock = threading.Lock()
+        self._loop = None
+        self._pool = None
+        self._pending = None
+
+    def _ensure_loop(self):
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=self._loop.run_forever, name="chs-ingest", daemon=True
+            ).start()
+        return self._loop
+
+    async def _refresh(self, sources):
+        if self._pool is None:
+            self._pool = ConnectionPool(self.max_connections)
+        self.last_refresh_s = await refresh_sources(
+            self._pool, sources, self.cache, self.retries, self.timeout
+        )
+        return self.last_refresh_s
+
+    def refresh(self, force=False):
+        # Starts fetching the due sources (all with force) in the background
+        # and returns a Future of the refresh time, or None if nothing is due.
+        # A refresh already running is returned instead of starting another.
+        with self._lock:
+            if self._pending is not None and not self._pending.done():
+                return self._pending
+            due = [s for s in self.sources if force or self.cache.due(s.name)]
+            if not due:
+                return None
+            self._pending = asyncio.run_coroutine_threadsafe(
+                self._refresh(due), self._ensure_loop()
+            )
+            return self._pending
+
+    @property
+    def refreshing(self):
+        return self._pending is not None and not self._pending.done()
+
+    def tables(self):
+        return sorted({s.table for s in self.sources})
+
+    def table(self, name):
+        # Whatever is cached for `name` right now (None if nothing yet);
+        # kicks off a background refresh of expired sources
+        if self.sources:
+            self.refresh()
+        frames = []
+        for source in self.sources:
+            entry = self.cache.get(source.name)
+            if source.table == name and entry is not None and entry.value is not None:
+                frames.append(entry.value)
+        return combine(frames, name) if frames else None
+
+    def status(self):
+        now = time.time()
+        rows = []
+        for s in self.sources:
+            entry = self.cache.get(s.name)
+            has_value = entry is not None and entry.value is not None
+            rows.append(
+                (
+                    s.name,
+                    s.table,
+                    len(entry.value) if has_value else None,
+                    round(now - entry.fetched, 1) if has_value else None,
+                    round(entry.fetch_ms, 1) if has_value else None,
+                    entry is None or entry.stale,
+                    entry.error if entry is not None else None,
+                )
+            )
+        return pd.DataFrame(rows, columns=STATUS_COLUMNS).astype({"Rows": "Int64"})
+
+    def close(self):
+        if self._loop is not None:
+            if self._pool is not None:
+                self._loop.call_soon_threadsafe(self._pool.close)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+def fetch_once(sources, max_connections=DEFAULT_MAX_CONNECTIONS,
+               retries=DEFAULT_RETRIES, timeout=DEFAULT_TIMEOUT_S):
+    # Blocking one-shot refresh (CLI, scripts): (cache, wall seconds, pool)
+    cache = TTLCache()
+
+    async def run():
+        pool = ConnectionPool(max_connections)
+        try:
+            return await refresh_sources(pool, sources, cache, retries, timeout), pool
+        finally:
+            pool.close()
+
+    elapsed, pool = asyncio.run(run())
+    return cache, elapsed, pool
+
+
+# --- Local stub server ---
+
+
+def _stub_payload(path, query):
+    seed = int(query.get("seed", 0))
+    n = int(query.get("n", 10))
+    rng = np.random.default_rng(seed)
+    if path == "/segments":
+        return [
+            {"Segment": f"Segment {i:07d}", "TAM_2024_USD_B": round(float(t), 3)}
+            for i, t in enumerate(rng.lognormal(0, 1, n))
+        ]
+    if path == "/competitors":
+        scores = rng.integers(1, 6, (n, 3))
+        return {
+            "records": [
+                {"Vendor": f"Feed {seed} Vendor {i}", "Type": "Startup",
+                 "Breadth_1_5": int(b), "Compliance_1_5": int(c), "Explainability_1_5": int(e)}
+                for i, (b, c, e) in enumerate(scores)
+            ]
+        }
+    if path == "/funnel":
+        counts = np.sort(rng.integers(1, 1000, len(chs_core.FUNNEL_DATA)))[::-1]
+        return [{"Stage": stage, "Count": int(c)} for (stage, _), c in zip(chs_core.FUNNEL_DATA, counts)]
+    return None
+
+
+def serve_stub(host="127.0.0.1", port=0, delay=0.0):
+    # Threaded HTTP/1.1 server with keep-alive. GET /segments, /competitors
+    # or /funnel with ?n=&seed=; ?delay=s overrides the response delay and
+    # ?fail=k answers 503 to the first k requests for that URL.
+    # Returns (server, base URL); stop with server.shutdown().
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    failures = {}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            parts = urllib.parse.urlsplit(self.path)
+            query = dict(urllib.parse.parse_qsl(parts.query))
+            time.sleep(float(query.get("delay", delay)))
+            with lock:
+                seen = failures[self.path] = failures.get(self.path, 0) + 1
+            payload = _stub_payload(parts.path, query)
+            if payload is None:
+                status, body = 404, b'{"error": "not found"}'
+            elif seen <= int(query.get("fail", 0)):
+                status, body = 503, b'{"error": "try again"}'
+            else:
+                status, body = 200, json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the client gave up (timeout)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 1024  # the default backlog of 5 stalls bursts
+
+    server = Server((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def stub_sources(base_url, n_sources=200, max_delay=0.5, seed=0):
+    # n sources spread over the three tables with random latencies
+    rng = np.random.default_rng(seed)
+    tables = ["segments", "competitors", "funnel"]
+    sources = []
+    for i in range(n_sources):
+        table = tables[i % 3]
+        delay = round(float(rng.uniform(0.05, max_delay)), 3)
+        sources.append(
+            Source(f"{table}-{i}", table, f"{base_url}/{table}?seed={i}&n=50&delay={delay}")
+        )
+    return sources
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="chs_ingest", description="Market-data ingestion")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("stub", help="Serve the stub endpoints until interrupted")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--delay", type=float, default=0.0, help="Seconds before each response")
+    p = sub.add_parser("demo", help="Refresh many stub sources once and report timings")
+    p.add_argument("--sources", type=int, default=200)
+    p.add_argument("--max-delay", type=float, default=0.5)
+    p.add_argument("--max-connections", type=int, default=DEFAULT_MAX_CONNECTIONS)
+    p = sub.add_parser("fetch", help="Refresh the sources in a config file once")
+    p.add_argument("config", nargs="?", default=DEFAULT_SOURCES_PATH)
+    p.add_argument("--max-connections", type=int, default=DEFAULT_MAX_CONNECTIONS)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "stub":
+        server, url = serve_stub(args.host, args.port, args.delay)
+        print(f"Stub endpoints at {url}/segments, /competitors, /funnel", file=sys.stderr)
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+        return 0
+
+    server = None
+    if args.command == "demo":
+        server, url = serve_stub()
+        sources = stub_sources(url, args.sources, args.max_delay)
+        slowest = max(float(urllib.parse.parse_qs(s.url.split("?")[1])["delay"][0]) for s in sources)
+    else:
+        sources = load_sources(args.config)
+    cache, elapsed, pool = fetch_once(sources, args.max_connections)
+    errors = {s.name: cache.get(s.name).error for s in sources if cache.get(s.name).error}
+    print(
+        f"{len(sources)} sources in {elapsed:.2f}s over {pool.opened} connections "
+        f"({pool.reused} reuses), {len(errors)} failed",
+        file=sys.stderr,
+    )
+    if server is not None:
+        print(f"slowest single response: {slowest:.2f}s", file=sys.stderr)
+        server.shutdown()
+    for name, error in list(errors.items())[:10]:
+        print(f"  {name}: {error}", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+# chs_montecarlo.py
+# Centauri Health Solutions – Monte Carlo uncertainty on segment priority scores
+#
+# Each criterion of each segment gets a distribution instead of a point
+# estimate. Draws are scored with the compute_priority_score formula (TAM
+# normalization, clipping, weights, rounding to 2 decimals) as whole
+# (draws x segments) arrays. Because scores are rounded to 0.01, a per-segment
+# histogram with 0.01-wide bins is an exact summary: chunks (and worker
+# processes) only return histograms and rank counts, which are summed, so
+# memory does not grow with the number of draws.
+
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+
+import numpy as np
+import pandas as pd
+
+CRITERIA = ["TAM_2024_USD_B", "Adoption_Speed_1_5", "CHS_Fit_1_5"]
+
+# Runs smaller than this many (draw x segment) cells stay in-process
+PARALLEL_MIN_CELLS = 20_000_000
+
+
+class Distribution:
+    # Per-segment distribution of one criterion. Parameters are arrays with one
+    # entry per segment (discrete: one row of values/probs per segment).
+    #   Distribution("point", value=x)
+    #   Distribution("triangular", low=a, mode=m, high=b)
+    #   Distribution("normal", mean=mu, std=sigma)
+    #   Distribution("discrete", values=[[...], ...], probs=[[...], ...])
+
+    KINDS = ("point", "triangular", "normal", "discrete")
+
+    def __init__(self, kind, **params):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown distribution {kind!r}; expected one of {self.KINDS}")
+        self.kind = kind
+        self.params = {k: np.asarray(v, dtype=float) for k, v in params.items()}
+        if kind == "discrete":
+            probs = self.params["probs"]
+            self.params["cum"] = np.cumsum(probs / probs.sum(axis=1, keepdims=True), axis=1)
+
+    def sample(self, rng, n_draws):
+        p = self.params
+        if self.kind == "point":
+            return np.broadcast_to(p["value"], (n_draws, len(p["value"])))
+        if self.kind == "normal":
+            return rng.normal(p["mean"], p["std"], size=(n_draws, len(p["mean"])))
+        if self.kind == "triangular":
+            # Inverse CDF, which (unlike rng.triangular) allows low == high
+            low, mode, high = p["low"], p["mode"], p["high"]
+            u = rng.random((n_draws, len(low)))
+            width = high - low
+            split = np.divide(mode - low, width, out=np.zeros_like(width), where=width > 0)
+            left = low + np.sqrt(u * width * (mode - low))
+            right = high - np.sqrt((1 - u) * width * (high - mode))
+            return np.where(u < split, left, right)
+        # discrete
+        cum = p["cum"]
+        u = rng.random((n_draws, cum.shape[0]))
+        idx = (u[:, :, None] > cum[None, :, :]).sum(axis=2)
+        idx = np.minimum(idx, cum.shape[1] - 1)
+        return np.take_along_axis(p["values"][None, :, :], idx[:, :, None], axis=2)[:, :, 0]
+
+
+def default_uncertainty(df, tam_spread=0.3, score_wobble=0.2):
+    # Research ranges where present (<criterion>_Low / _High columns give a
+    # triangular around the point estimate); otherwise TAM is triangular
+    # ±tam_spread and the 1–5 scores move one step up/down with probability
+    # score_wobble each.
+    spec = {}
+    for col in CRITERIA:
+        point = df[col].to_numpy(dtype=float)
+        if f"{col}_Low" in df.columns and f"{col}_High" in df.columns:
+            spec[col] = Distribution(
+                "triangular",
+                low=df[f"{col}_Low"].to_numpy(dtype=float),
+                mode=point,
+                high=df[f"{col}_High"].to_numpy(dtype=float),
+            )
+        elif col == "TAM_2024_USD_B":
+            spec[col] = Distribution(
+                "triangular",
+                low=point * (1 - tam_spread),
+                mode=point,
+                high=point * (1 + tam_spread),
+            )
+        elif score_wobble > 0:
+            values = np.clip(np.stack([point - 1, point, point + 1], axis=1), 1, 5)
+            probs = np.tile([score_wobble, 1 - 2 * score_wobble, score_wobble], (len(point), 1))
+            spec[col] = Distribution("discrete", values=values, probs=probs)
+        else:
+            spec[col] = Distribution("point", value=point)
+    return spec
+
+
+def _n_bins(weights, fixed):
+    # Upper bound of the 0.01 score grid: every criterion at 5, plus the largest
+    # fixed (deterministic) contribution
+    top = 5 * sum(abs(w) for w in weights) + float(np.max(np.abs(fixed), initial=0.0))
+    return int(np.ceil(top * 100)) + 1
+
+
+def _simulate_chunk(spec, weights, fixed, n_draws, seed_seq, n_bins, max_rank):
+    rng = np.random.default_rng(seed_seq)
+    w_tam, w_adoption, w_fit = weights
+    tam = np.maximum(spec["TAM_2024_USD_B"].sample(rng, n_draws), 0.0)
+    adoption = np.clip(spec["Adoption_Speed_1_5"].sample(rng, n_draws), 1.0, 5.0)
+    fit = np.clip(spec["CHS_Fit_1_5"].sample(rng, n_draws), 1.0, 5.0)
+
+    tam_norm = np.clip(tam / 5.0, 1.0, 5.0)
+    score = np.round(tam_norm * w_tam + adoption * w_adoption + fit * w_fit + fixed, 2)
+    n_seg = score.shape[1]
+
+    # Score histogram on the 0.01 grid over [-top, +top]; the negative half is
+    # only used when penalties push scores below zero
+    width = 2 * n_bins + 1
+    bins = np.clip(np.rint(score * 100).astype(np.int64) + n_bins, 0, width - 1)
+    seg_idx = np.broadcast_to(np.arange(n_seg)[None, :], bins.shape)
+    hist = np.bincount((seg_idx * width + bins).ravel(), minlength=n_seg * width)
+
+    # Ordinal ranks per draw (ties broken by table order), counted for the top
+    # max_rank places only
+    order = np.argsort(-score, axis=1, kind="stable")[:, :max_rank]
+    ranks = np.broadcast_to(np.arange(order.shape[1]), order.shape)
+    rank_counts = np.bincount(
+        (order * max_rank + ranks).ravel(), minlength=n_seg * max_rank
+    )
+    return hist.reshape(n_seg, width), rank_counts.reshape(n_seg, max_rank)
+
+
+class MonteCarloResult:
+    def __init__(self, labels, hist, rank_counts, n_draws, offset):
+        self.labels = labels
+        self.hist = hist
+        self.rank_counts = rank_counts
+        self.n_draws = n_draws
+        self._grid = (np.arange(hist.shape[1]) - offset) / 100.0
+
+    def percentiles(self, qs=(5, 50, 95)):
+        cum = np.cumsum(self.hist, axis=1)
+        out = {"Segment": self.labels}
+        for q in qs:
+            target = np.ceil(q / 100 * self.n_draws)
+            idx = (cum < np.maximum(target, 1)[..., None]).sum(axis=1)
+            out[f"P{q}"] = self._grid[np.minimum(idx, len(self._grid) - 1)]
+        out["Mean"] = (self.hist * self._grid).sum(axis=1) / self.n_draws
+        return pd.DataFrame(out)
+
+    def rank_probabilities(self):
+        probs = self.rank_counts / self.n_draws
+        out = pd.DataFrame({"Segment": self.labels})
+        for r in range(probs.shape[1]):
+            out[f"P(rank {r + 1})"] = probs[:, r]
+        return out
+
+
+def run_monte_carlo(
+    df,
+    spec=None,
+    weights=(0.3, 0.3, 0.4),
+    extra_criteria=None,
+    n_draws=1_000_000,
+    seed=0,
+    chunk_draws=None,
+    max_rank=10,
+    workers=None,
+):
+    # Seeds are spawned per chunk from one SeedSequence, so a given seed gives
+    # the same result whether chunks run in-process or on any number of workers.
+    spec = spec or default_uncertainty(df)
+    n_seg = len(df)
+    max_rank = max(1, min(max_rank, n_seg))
+    fixed = np.zeros(n_seg)
+    for column, weight in (extra_criteria or {}).items():
+        fixed = fixed + df[column].to_numpy(dtype=float) * weight
+
+    if chunk_draws is None:
+        # ~1M cells per chunk keeps each chunk's temporaries around 100 MB
+        chunk_draws = max(1_000, 1_000_000 // max(n_seg, 1))
+    sizes = [chunk_draws] * (n_draws // chunk_draws)
+    if n_draws % chunk_draws:
+        sizes.append(n_draws % chunk_draws)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    n_bins = _n_bins(weights, fixed)
+    args = [(spec, tuple(weights), fixed, size, s, n_bins, max_rank) for size, s in zip(sizes, seeds)]
+
+    # Chunk results are added into running totals as they arrive (counts are
+    # integers, so the order of the sums does not matter)
+    hist = rank_counts = 0
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers > 1 and len(sizes) > 1 and n_draws * n_seg >= PARALLEL_MIN_CELLS:
+        workers = min(workers, len(sizes))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # At most two chunks per worker are in flight, so finished
+            # histograms never pile up waiting to be summed
+            pending = set()
+            for a in args:
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        chunk_hist, chunk_ranks = future.result()
+                        hist, rank_counts = hist + chunk_hist, rank_counts + chunk_ranks
+                pending.add(pool.submit(_simulate_chunk, *a))
+            for future in as_completed(pending):
+                chunk_hist, chunk_ranks = future.result()
+                hist, rank_counts = hist + chunk_hist, rank_counts + chunk_ranks
+    else:
+        for a in args:
+            chunk_hist, chunk_ranks = _simulate_chunk(*a)
+            hist, rank_counts = hist + chunk_hist, rank_counts + chunk_ranks
+    labels = df["Short Name"] if "Short Name" in df.columns else df["Segment"]
+    return MonteCarloResult(
+        labels.astype(str).to_numpy(), hist, rank_counts, n_draws, n_bins
+    )
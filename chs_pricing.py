@@ -0,0 +1,192 @@
+# chs_pricing.py
+# Centauri Health Solutions – usage-based pricing simulator
+#
+# A population of accounts (monthly event volume, project count) is priced
+# against the tier table as whole arrays: an (accounts x tiers) cost matrix is
+# built, ineligible cells are set to inf and each account takes the cheapest
+# eligible tier. Quotas come from the tier "Includes" text (e.g. "Up to 3
+# projects, 5M events/month"), so the sample PRICING_DATA can be used as is.
+
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+POPULATION_COLUMNS = ["Events_per_month", "Projects"]
+
+_SUFFIX = {"": 1, "k": 1e3, "m": 1e6, "b": 1e9}
+
+
+def _parse_events(text):
+    # "50k events" -> 50_000; "50M+ events" -> inf (no upper bound)
+    m = re.search(r"([\d.]+)\s*([kmb]?)(\+?)\s*events", text, flags=re.I)
+    if not m or m.group(3):
+        return np.inf
+    return float(m.group(1)) * _SUFFIX[m.group(2).lower()]
+
+
+def _parse_projects(text):
+    # "1 project" / "Up to 3 projects" -> 1 / 3; "Unlimited projects" -> inf
+    m = re.search(r"(unlimited|\d+)\s+projects?", text, flags=re.I)
+    if not m or m.group(1).lower() == "unlimited":
+        return np.inf
+    return float(m.group(1))
+
+
+def tier_quotas(pricing_df):
+    # Adds Event_Quota / Project_Limit (inf = unlimited) parsed from Includes,
+    # keeping any quota columns that are already present (e.g. edited ones)
+    tiers = pricing_df.copy()
+    tiers["Price_USD_per_month"] = tiers["Price_USD_per_month"].astype(float)
+    if "Event_Quota" not in tiers.columns:
+        tiers["Event_Quota"] = [_parse_events(t) for t in tiers["Includes"].astype(str)]
+    if "Project_Limit" not in tiers.columns:
+        tiers["Project_Limit"] = [_parse_projects(t) for t in tiers["Includes"].astype(str)]
+    if "Overage_USD_per_1k" not in tiers.columns:
+        tiers["Overage_USD_per_1k"] = np.nan
+    return tiers
+
+
+def synthetic_population(
+    n_accounts=1_000_000, median_events=20_000, events_sigma=2.0, mean_projects=2.0, seed=0
+):
+    # Log-normal monthly event volume; projects are 1 + geometric, so the
+    # mean is mean_projects
+    rng = np.random.default_rng(seed)
+    events = rng.lognormal(np.log(median_events), events_sigma, n_accounts)
+    if mean_projects > 1:
+        projects = rng.geometric(1 / mean_projects, n_accounts)
+    else:
+        projects = np.ones(n_accounts, dtype=np.int64)
+    return pd.DataFrame(
+        {
+            "Events_per_month": np.round(events).astype(np.int64),
+            "Projects": np.minimum(projects, np.iinfo(np.int16).max).astype(np.int16),
+        }
+    )
+
+
+def load_population(source, name=None):
+    ext = os.path.splitext(str(name or source))[1].lower()
+    if ext in (".parquet", ".pq"):
+        df = pd.read_parquet(source, columns=POPULATION_COLUMNS)
+    else:
+        df = pd.read_csv(source, usecols=POPULATION_COLUMNS)
+    df = df.dropna()
+    return pd.DataFrame(
+        {
+            "Events_per_month": df["Events_per_month"].to_numpy(dtype=np.int64),
+            "Projects": df["Projects"].to_numpy(dtype=np.int16),
+        }
+    )
+
+
+def _cost_matrix(events, projects, tiers):
+    # (accounts x tiers) monthly cost, inf where the tier cannot take the
+    # account, plus the overage part of it
+    price = tiers["Price_USD_per_month"].to_numpy(dtype=float)
+    quota = tiers["Event_Quota"].to_numpy(dtype=float)
+    limit = tiers["Project_Limit"].to_numpy(dtype=float)
+    overage = tiers["Overage_USD_per_1k"].to_numpy(dtype=float)
+
+    excess = np.maximum(events[:, None] - quota[None, :], 0.0)
+    over_cost = excess * (np.nan_to_num(overage, nan=0.0) / 1000.0)
+    # Without an overage price the event quota is a hard cap
+    blocked = (excess > 0) & np.isnan(overage)[None, :]
+    blocked |= projects[:, None] > limit[None, :]
+    cost = np.where(blocked, np.inf, over_cost + price[None, :])
+    return cost, over_cost
+
+
+class PricingResult:
+    def __init__(self, tiers, cost, over_cost, events):
+        self.tiers = tiers
+        self.cost = cost
+        self.events = events
+        rows = np.arange(len(events))
+        tier_idx = np.argmin(cost, axis=1)
+        revenue = cost[rows, tier_idx]
+        unserved = np.isinf(revenue)
+        self.tier_idx = np.where(unserved, -1, tier_idx).astype(np.int8)  # -1 = no eligible tier
+        self.revenue = np.where(unserved, 0.0, revenue)
+        self.overage = np.where(unserved, 0.0, over_cost[rows, tier_idx])
+
+    @property
+    def mrr(self):
+        return float(self.revenue.sum())
+
+    @property
+    def unserved(self):
+        return int((self.tier_idx < 0).sum())
+
+    def tier_mix(self):
+        n_tiers = len(self.tiers)
+        served = self.tier_idx >= 0
+        idx = self.tier_idx[served]
+        accounts = np.bincount(idx, minlength=n_tiers)
+        mrr = np.bincount(idx, weights=self.revenue[served], minlength=n_tiers)
+        overage = np.bincount(idx, weights=self.overage[served], minlength=n_tiers)
+        return pd.DataFrame(
+            {
+                "Tier": self.tiers["Tier"].to_numpy(),
+                "Accounts": accounts,
+                "Share_%": np.round(accounts / max(len(self.tier_idx), 1) * 100, 1),
+                "MRR_USD": np.round(mrr, 2),
+                "Overage_MRR_USD": np.round(overage, 2),
+            }
+        )
+
+    def revenue_by_usage(self, n_bins=30):
+        # MRR and accounts per log-spaced event-volume bucket
+        events = np.maximum(self.events, 1)
+        edges = np.logspace(0, np.log10(events.max()) + 1e-9, n_bins + 1)
+        bucket = np.clip(np.searchsorted(edges, events, side="right") - 1, 0, n_bins - 1)
+        return pd.DataFrame(
+            {
+                "Events_per_month": edges[:-1],
+                "Accounts": np.bincount(bucket, minlength=n_bins),
+                "MRR_USD": np.bincount(bucket, weights=self.revenue, minlength=n_bins),
+            }
+        )
+
+    def price_response(self, tier, prices):
+        # Total MRR as one tier's list price moves over `prices`, other tiers
+        # fixed. An account stays on the tier while price + its overage there
+        # is below its best alternative, so one sort of those break-even prices
+        # gives the whole curve without re-simulating per price point.
+        t = int(np.flatnonzero(self.tiers["Tier"].to_numpy() == tier)[0])
+        prices = np.asarray(prices, dtype=float)
+        own = self.cost[:, t] - self.tiers["Price_USD_per_month"].iloc[t]  # inf when ineligible
+        other = np.delete(self.cost, t, axis=1).min(axis=1, initial=np.inf)
+        other_rev = np.where(np.isinf(other), 0.0, other)
+        eligible = ~np.isinf(own)
+
+        breakeven = (other - own)[eligible]
+        order = np.argsort(breakeven)
+        thresholds = breakeven[order]
+        own_sorted = own[eligible][order]
+        other_sorted = other_rev[eligible][order]
+        # Accounts with breakeven <= price have left the tier
+        left = np.searchsorted(thresholds, prices, side="right")
+        stay_own = np.concatenate([[0.0], np.cumsum(own_sorted[::-1])])[::-1]
+        left_other = np.concatenate([[0.0], np.cumsum(other_sorted)])
+        stay_count = len(thresholds) - left
+
+        mrr = (
+            other_rev[~eligible].sum()
+            + left_other[left]
+            + stay_own[left]
+            + prices * stay_count
+        )
+        return pd.DataFrame(
+            {"Price_USD_per_month": prices, "Accounts_on_tier": stay_count, "MRR_USD": mrr}
+        )
+
+
+def simulate_pricing(population, pricing_df):
+    tiers = tier_quotas(pricing_df).reset_index(drop=True)
+    events = population["Events_per_month"].to_numpy(dtype=float)
+    projects = population["Projects"].to_numpy(dtype=float)
+    cost, over_cost = _cost_matrix(events, projects, tiers)
+    return PricingResult(tiers, cost, over_cost, events)
@@ -0,0 +1,245 @@
+# chs_profiling.py
+# Centauri Health Solutions – per-rerun timing of the app's stages
+#
+# Each script run opens a Rerun for the current page. Stages are either
+# checkpoints (rerun.mark("charts") closes the previous checkpoint and starts
+# the next) or nested spans (with rerun.stage("chart:focus_map")). Wall time
+# comes from perf_counter; allocations are only measured while tracemalloc is
+# tracing, since tracing slows every allocation in the process. tracemalloc is
+# process-wide too, so spans that end while another session's rerun is in
+# flight get no allocation figure rather than one that includes the other
+# run's memory. Finished runs (and runs whose page was cut short by
+# st.stop()/st.rerun()) go into a rolling history per page that one Profiler
+# keeps for the whole server process, so percentiles reflect every session's
+# real usage.
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+SPAN_COLUMNS = ["Stage", "Depth", "Start_ms", "Duration_ms", "Alloc_KB"]
+
+
+class Rerun:
+    def __init__(self, profiler, page):
+        self.profiler = profiler
+        self.page = page
+        self.started = time.time()
+        self.thread = threading.get_ident()
+        self.spans = []  # (name, depth, start s, duration s, peak bytes or None)
+        self._t0 = time.perf_counter()
+        self._stack = []  # open spans: [name, start, traced bytes at start, peak seen]
+        self._mark = None  # depth of the open checkpoint, if any
+        self._finished = False
+        self.total = None
+        self.interrupted = False  # ended by st.stop()/st.rerun() or an error
+        self.overlapped = False  # another rerun ran at the same time
+
+    def _enter(self, name):
+        current = None
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                # Keep the enclosing span's peak so far before resetting it
+                self._stack[-1][3] = max(self._stack[-1][3], peak)
+            tracemalloc.reset_peak()
+        self._stack.append([name, time.perf_counter(), current, 0])
+
+    def _exit(self):
+        end = time.perf_counter()
+        name, start, current, peak_seen = self._stack.pop()
+        alloc = None
+        if current is not None and tracemalloc.is_tracing() and not self.overlapped:
+            # The peak since the last reset covers the tail of this span; the
+            # peaks of nested spans (which reset it) were folded into peak_seen
+            peak = max(peak_seen, tracemalloc.get_traced_memory()[1])
+            alloc = max(peak - current, 0)
+            if self._stack:
+                self._stack[-1][3] = max(self._stack[-1][3], peak)
+        self.spans.append((name, len(self._stack), start - self._t0, end - start, alloc))
+
+    @contextmanager
+    def stage(self, name):
+        self._enter(name)
+        try:
+            yield
+        finally:
+            self._exit()
+
+    def mark(self, name):
+        # Checkpoint: everything from here to the next mark (or finish) is `name`
+        if self._mark is not None:
+            while len(self._stack) > self._mark:
+                self._exit()
+        self._mark = len(self._stack)
+        self._enter(name)
+
+    def finish(self):
+        if self._finished:
+            return
+        while self._stack:
+            self._exit()
+        self._finished = True
+        self.total = time.perf_counter() - self._t0
+        self.profiler._record(self)
+
+    def to_frame(self):
+        # Spans in start order
+        spans = sorted(self.spans, key=lambda s: (s[2], s[1]))
+        return pd.DataFrame(
+            [
+                (
+                    "  " * depth + name,
+                    depth,
+                    round(start * 1000, 2),
+                    round(duration * 1000, 2),
+                    None if alloc is None else round(alloc / 1024, 1),
+                )
+                for name, depth, start, duration, alloc in spans
+            ],
+            columns=SPAN_COLUMNS,
+        )
+
+
+class Profiler:
+    def __init__(self, history=200):
+        self.history = history
+        self._runs = {}  # page -> deque of finished Reruns
+        self._active = set()  # started, not yet finished
+        self._lock = threading.Lock()
+
+    def start_run(self, page):
+        rerun = Rerun(self, page)
+        with self._lock:
+            # A run cut short before its page body never finishes; one left on
+            # this thread (a thread runs one script at a time) or on a thread
+            # that has exited is not running any more
+            alive = {t.ident for t in threading.enumerate()}
+            self._active = {
+                r for r in self._active if r.thread != rerun.thread and r.thread in alive
+            }
+            if self._active:
+                # Their traced peaks now include each other's allocations
+                rerun.overlapped = True
+                for other in self._active:
+                    other.overlapped = True
+            self._active.add(rerun)
+        return rerun
+
+    def _record(self, rerun):
+        with self._lock:
+            self._active.discard(rerun)
+            self._runs.setdefault(rerun.page, deque(maxlen=self.history)).append(rerun)
+
+    def runs(self, page=None):
+        with self._lock:
+            if page is not None:
+                return list(self._runs.get(page, ()))
+            return [r for runs in self._runs.values() for r in runs]
+
+    def pages(self):
+        with self._lock:
+            return sorted(self._runs)
+
+    def clear(self):
+        with self._lock:
+            self._runs.clear()
+
+    @property
+    def tracking_allocations(self):
+        return tracemalloc.is_tracing()
+
+    def track_allocations(self, enabled):
+        # Process-wide: affects every session until switched off again
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not enabled and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def stats(self, page):
+        # p50/p95 per stage over the page's history, with the whole rerun first
+        columns = ["Stage", "Runs", "p50_ms", "p95_ms", "Max_ms", "Alloc_p50_KB", "Alloc_p95_KB"]
+        runs = self.runs(page)
+        if not runs:
+            return pd.DataFrame(columns=columns)
+        rows = {"(rerun)": ([r.total for r in runs], [])}
+        for r in runs:
+            # A stage entered several times in one run (e.g. one chart per
+            # segment) counts as the sum for that run
+            per_run = {}
+            for name, _, _, duration, alloc in sorted(r.spans, key=lambda s: (s[2], s[1])):
+                d, a = per_run.get(name, (0.0, None))
+                if alloc is not None:
+                    a = max(a or 0, alloc)
+                per_run[name] = (d + duration, a)
+            for name, (d, a) in per_run.items():
+                durations, allocs = rows.setdefault(name, ([], []))
+                durations.append(d)
+                if a is not None:
+                    allocs.append(a)
+        out = []
+        for name, (durations, allocs) in rows.items():
+            ms = np.asarray(durations) * 1000
+            kb = np.asarray(allocs, dtype=float) / 1024
+            out.append(
+                (
+                    name,
+                    len(ms),
+                    np.percentile(ms, 50),
+                    np.percentile(ms, 95),
+                    ms.max(),
+                    np.percentile(kb, 50) if len(kb) else np.nan,
+                    np.percentile(kb, 95) if len(kb) else np.nan,
+                )
+            )
+        return pd.DataFrame(out, columns=columns).round(2)
+
+    def to_json(self, page=None):
+        runs = [
+            {
+                "page": r.page,
+                "started": r.started,
+                "total_ms": r.total * 1000,
+                "interrupted": r.interrupted,
+                "spans": [
+                    {
+                        "stage": name,
+                        "depth": depth,
+                        "start_ms": start * 1000,
+                        "duration_ms": duration * 1000,
+                        "alloc_bytes": alloc,
+                    }
+                    for name, depth, start, duration, alloc in r.spans
+                ],
+            }
+            for r in self.runs(page)
+        ]
+        return json.dumps({"runs": runs}, indent=1)
+
+    def to_chrome_trace(self, page=None):
+        # Trace Event Format ("X" complete events, microseconds); open in
+        # chrome://tracing or ui.perfetto.dev. Each server thread is a track.
+        events = []
+        for r in self.runs(page):
+            base = r.started * 1e6
+            args = {"page": r.page, "interrupted": r.interrupted}
+            events.append(
+                {"name": f"rerun: {r.page}", "cat": "rerun", "ph": "X", "ts": base,
+                 "dur": r.total * 1e6, "pid": os.getpid(), "tid": r.thread, "args": args}
+            )
+            for name, _, start, duration, alloc in r.spans:
+                span_args = {"page": r.page}
+                if alloc is not None:
+                    span_args["alloc_bytes"] = alloc
+                events.append(
+                    {"name": name, "cat": r.page, "ph": "X", "ts": base + start * 1e6,
+                     "dur": duration * 1e6, "pid": os.getpid(), "tid": r.thread, "args": span_args}
+                )
+        return json.dumps({"traceEvents": events, "displayTimeUnit": "ms"})
@@ -0,0 +1,125 @@
+# chs_reference.py
+# Centauri Health Solutions – reference tables, loaded once per process
+#
+# The architecture, roadmap, team, pricing, funnel and competitor tables
+# default to the samples in chs_core. Dropping <name>.parquet or <name>.csv
+# into the reference directory (CHS_REFERENCE_DIR) replaces a table without a
+# deploy: each lookup stats the file and reloads it only when its mtime or
+# size has changed. Tables are built once with compact dtypes and derived columns
+# (roadmap QuarterIdx) and handed out as shallow copy-on-write copies, so a
+# caller assigning a column never changes what other sessions see.
+
+import os
+import threading
+
+import pandas as pd
+
+import chs_core
+from chs_schema import apply_schema
+
+DEFAULT_REFERENCE_DIR = os.environ.get(
+    "CHS_REFERENCE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "reference"),
+)
+
+# name -> (built-in rows, columns)
+BUILTIN_TABLES = {
+    "architecture": (chs_core.ARCH_DATA, chs_core.ARCH_COLUMNS),
+    "roadmap": (chs_core.ROADMAP_DATA, chs_core.ROADMAP_COLUMNS),
+    "pricing": (chs_core.PRICING_DATA, chs_core.PRICING_COLUMNS),
+    "funnel": (chs_core.FUNNEL_DATA, chs_core.FUNNEL_COLUMNS),
+    "competitors": (chs_core.COMPETITORS_DATA, chs_core.COMPETITOR_COLUMNS),
+    "teams": (chs_core.TEAM_DATA, chs_core.TEAM_COLUMNS),
+}
+
+# Columns an override file may leave out
+OPTIONAL_COLUMNS = {"roadmap": chs_core.ROADMAP_PLAN_COLUMNS}
+
+_EXTENSIONS = (".parquet", ".csv")
+
+
+def _derive(name, df):
+    # Columns computed at load time rather than on every rerun
+    if name == "roadmap":
+        df = df.assign(QuarterIdx=chs_core.quarter_index(df["Quarter"]).to_numpy(dtype="int8"))
+    return df
+
+
+def _read(path):
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+class ReferenceTables:
+    def __init__(self, directory=DEFAULT_REFERENCE_DIR):
+        self.directory = directory
+        self.loads = 0
+        self.errors = {}  # name -> message from the last failed reload
+        self._tables = {}  # name -> (source signature, frame)
+        self._lock = threading.Lock()
+
+    def source(self, name):
+        # The override file for `name`, or None to use the built-in sample
+        for ext in _EXTENSIONS:
+            path = os.path.join(self.directory, name + ext)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _signature(self, name):
+        path = self.source(name)
+        if path is None:
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (path, st.st_mtime_ns, st.st_size)
+
+    def _load(self, name, signature):
+        data, columns = BUILTIN_TABLES[name]
+        if signature is None:
+            df = pd.DataFrame(data, columns=columns)
+        else:
+            df = _read(signature[0])
+            optional = OPTIONAL_COLUMNS.get(name, [])
+            missing = [c for c in columns if c not in df.columns and c not in optional]
+            if missing:
+                raise ValueError(f"{signature[0]} is missing columns {missing}")
+        self.loads += 1
+        return _derive(name, apply_schema(df, name))
+
+    def get(self, name):
+        if name not in BUILTIN_TABLES:
+            raise KeyError(f"Unknown reference table {name!r}")
+        signature = self._signature(name)
+        with self._lock:
+            cached = self._tables.get(name)
+            if cached is None or cached[0] != signature:
+                try:
+                    self._tables[name] = (signature, self._load(name, signature))
+                    self.errors.pop(name, None)
+                except (ValueError, KeyError, OSError) as exc:
+                    # Keep serving the last good table (or the sample) until
+                    # the file is fixed
+                    self.errors[name] = str(exc)
+                    if cached is None:
+                        cached = (None, self._load(name, None))
+                    self._tables[name] = (signature, cached[1])
+            return self._tables[name][1].copy(deep=False)
+
+    def names(self):
+        return list(BUILTIN_TABLES)
+
+    def write_builtin(self, name, fmt="csv"):
+        # Writes the built-in sample as a starting point for an override file
+        data, columns = BUILTIN_TABLES[name]
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{name}.{fmt}")
+        df = pd.DataFrame(data, columns=columns)
+        if fmt == "parquet":
+            df.to_parquet(path, index=False)
+        else:
+            df.to_csv(path, index=False)
+        return path
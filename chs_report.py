@@ -0,0 +1,462 @@
+# chs_report.py
+# Centauri Health Solutions – static strategy report of every page
+#
+# Usage:
+#   python chs_report.py report.html
+#   python chs_report.py report.html --segments segments.parquet --workers 8
+#   python chs_report.py report.html --charts png --also pdf png
+#
+# Builds each page's headline tables and charts from the same stores and
+# reference tables the app reads, with the pages' default settings. The
+# output is one HTML file with inline CSS and inline SVG (or PNG) charts.
+# Charts are rendered by vl-convert and the architecture diagram by
+# Graphviz. Without vl-convert the report embeds the Vega-Lite specs instead,
+# which need vega-embed from a CDN to display. Rendering is spread over a
+# process pool, and each rendered chart is cached on disk under a hash of its
+# builder, data, parameters and format, so a re-export only renders the
+# charts whose data changed.
+
+import argparse
+import base64
+import hashlib
+import html
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import altair as alt
+import pandas as pd
+
+import chs_charts
+import chs_core
+from chs_cohorts import DEFAULT_COHORT_DIR, CohortStore
+from chs_features import bundle_heatmap_frame, optimize_bundle, sample_matrix, segment_weights
+from chs_funnel import DEFAULT_STAGES
+from chs_reference import DEFAULT_REFERENCE_DIR, ReferenceTables
+from chs_roadmap import schedule_roadmap, schedule_summary
+from chs_schema import apply_schema
+from chs_skyline import dominance_table, reference_gap
+from chs_storage import DEFAULT_DB_PATH, InterviewRollup, open_backlogs
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "CHS_REPORT_CACHE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".chs_report_cache"),
+)
+
+# Same caps as the app: tables and charts never carry the whole dataset
+REPORT_MAX_ROWS = 100
+CHART_MAX_POINTS = 5_000
+ROADMAP_CHART_ITEMS = 300
+
+FORMATS = ("svg", "png", "pdf")
+
+PRIMARY_GREEN = "#78BE20"
+DARK_GREY = "#2E2E2E"
+LIGHT_GREY = "#F7F8F9"
+
+
+def _vl_convert():
+    try:
+        import vl_convert
+    except ImportError:
+        return None
+    return vl_convert
+
+
+class ChartJob:
+    # One chart: a chs_charts builder by name, its frame and parameters
+    def __init__(self, builder, df, **params):
+        self.builder = builder
+        self.df = df
+        self.params = params
+
+    def key(self, fmt):
+        h = hashlib.sha1()
+        renderer = getattr(_vl_convert(), "__version__", "none")
+        h.update(repr((self.builder, sorted(self.params.items()), fmt, alt.__version__, renderer)).encode())
+        h.update(chs_charts.frame_fingerprint(self.df).encode())
+        return h.hexdigest()
+
+
+def _chart_spec(job):
+    chart = getattr(chs_charts, job.builder)(job.df, **job.params)
+    # Inline JSON values (the app's Arrow datasets are a Streamlit transport)
+    with alt.theme.enable("none"), alt.data_transformers.enable("default", max_rows=None):
+        return chart.to_dict()
+
+
+def render_chart(job, fmt):
+    # Runs in a worker process: svg -> str, png/pdf -> bytes, vega -> spec JSON
+    spec = _chart_spec(job)
+    if fmt == "vega":
+        return json.dumps(spec)
+    vlc = _vl_convert()
+    if fmt == "svg":
+        return vlc.vegalite_to_svg(spec)
+    if fmt == "png":
+        return vlc.vegalite_to_png(spec, scale=2)
+    return vlc.vegalite_to_pdf(spec)
+
+
+class RenderCache:
+    def __init__(self, directory=DEFAULT_CACHE_DIR):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key, fmt):
+        return os.path.join(self.directory, key[:2], f"{key}.{fmt}")
+
+    def get(self, key, fmt):
+        path = self._path(key, fmt)
+        if not os.path.exists(path):
+            return None
+        mode = "r" if fmt in ("svg", "vega") else "rb"
+        with open(path, mode, **({"encoding": "utf-8"} if mode == "r" else {})) as f:
+            return f.read()
+
+    def put(self, key, fmt, output):
+        path = self._path(key, fmt)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        if isinstance(output, str):
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(output)
+        else:
+            with open(tmp, "wb") as f:
+                f.write(output)
+        os.replace(tmp, path)
+
+
+def render_all(jobs, fmt, cache, workers=None):
+    # {job index: output}; cached charts are read back, the rest are rendered
+    # across `workers` processes (1 = in this process)
+    out, pending = {}, []
+    for i, job in enumerate(jobs):
+        key = job.key(fmt)
+        cached = cache.get(key, fmt)
+        if cached is None:
+            pending.append((i, key))
+        else:
+            cache.hits += 1
+            out[i] = cached
+    cache.misses += len(pending)
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(min(workers, len(pending))) as pool:
+            futures = [(i, key, pool.submit(render_chart, jobs[i], fmt)) for i, key in pending]
+            rendered = [(i, key, f.result()) for i, key, f in futures]
+    else:
+        rendered = [(i, key, render_chart(jobs[i], fmt)) for i, key in pending]
+    for i, key, output in rendered:
+        cache.put(key, fmt, output)
+        out[i] = output
+    return out
+
+
+# --- Report content ---
+
+
+class Section:
+    def __init__(self, title, caption=""):
+        self.title = title
+        self.caption = caption
+        self.items = []  # ("table", df, heading) / ("chart", ChartJob, heading) / ("html", str, heading)
+
+    def table(self, df, heading=""):
+        self.items.append(("table", df, heading))
+
+    def chart(self, builder, df, heading="", **params):
+        self.items.append(("chart", ChartJob(builder, df, **params), heading))
+
+    def html(self, markup, heading=""):
+        self.items.append(("html", markup, heading))
+
+
+def _sample(df, n=CHART_MAX_POINTS):
+    return df.sample(n, random_state=0) if len(df) > n else df
+
+
+def load_report_segments(path=None):
+    if path is None:
+        df = pd.DataFrame(chs_core.DEFAULT_SEGMENTS)
+    else:
+        from chs_import import import_segments
+
+        df, _ = import_segments(path)
+    df = apply_schema(df, "segments")
+    return df.assign(Priority_Score=chs_core.compute_priority_scores(df))
+
+
+def build_sections(segments_df, db_path=DEFAULT_DB_PATH, reference_dir=DEFAULT_REFERENCE_DIR,
+                   cohort_dir=DEFAULT_COHORT_DIR):
+    tables = ReferenceTables(reference_dir)
+    sections = []
+
+    s = Section("Segment Explorer", "Segment assumptions and priority scores.")
+    s.table(
+        segments_df[
+            ["Segment", "TAM_2024_USD_B", "Adoption_Speed_1_5", "Compliance_Burden_1_5",
+             "CHS_Fit_1_5", "Priority_Score"]
+        ],
+        "Priority Scores",
+    )
+    s.chart("segment_scatter", _sample(segments_df), "Adoption vs Compliance (size = TAM, color = CHS Fit)")
+    sections.append(s)
+
+    s = Section("Prioritization Canvas", "Default weights: TAM 0.3, Adoption 0.3, CHS Fit 0.4.")
+    ranked = segments_df.sort_values("Priority_Score", ascending=False)
+    s.table(
+        ranked[["Segment", "Short Name", "TAM_2024_USD_B", "Adoption_Speed_1_5",
+                "CHS_Fit_1_5", "Priority_Score"]],
+        "Ranked Segments",
+    )
+    s.chart("focus_map", ranked.head(CHART_MAX_POINTS), "Focus Map (Adoption vs CHS Fit)")
+    sections.append(s)
+
+    interviews, hypotheses = open_backlogs(db_path)
+    rollup = interviews.attach_rollup(InterviewRollup())
+    s = Section("Interview Planner", f"{len(interviews):,} planned interviews.")
+    s.table(rollup.segment_status_summary(), "Summary by Segment & Status")
+    s.table(rollup.segment_summary(), "By Segment (mean priority, completion rate)")
+    s.table(rollup.persona_summary(), "By Persona")
+    sections.append(s)
+
+    s = Section("Hypothesis & Experiment Tracker", f"{len(hypotheses):,} hypotheses, by ICE score.")
+    hyp_df = hypotheses.frame()
+    if len(hyp_df):
+        hyp_df = hyp_df.sort_values("ICE_Score", ascending=False)
+    s.table(hyp_df, "Top Hypotheses")
+    sections.append(s)
+
+    arch_df = tables.get("architecture")
+    s = Section("Platform Architecture Map", "Solid = MVP, dashed outline = Planned, grey dashed = Future.")
+    s.table(arch_df, "Architecture Components")
+    s.chart("layer_mix", arch_df.groupby("Layer")["Component"].count().reset_index(), "Layer Mix")
+    dot = chs_charts.architecture_dot(arch_df)
+    svg = chs_charts.render_dot_svg(dot)
+    if svg is None:
+        svg = (
+            "<p class='note'>Graphviz is not installed; diagram source:</p>"
+            f"<pre>{html.escape(dot)}</pre>"
+        )
+    s.html(svg, "Architecture Diagram")
+    sections.append(s)
+
+    seg_names = [seg["Short Name"] for seg in chs_core.DEFAULT_SEGMENTS]
+    importance, effort = sample_matrix(seg_names)
+    weights = segment_weights(importance.index, segments_df)
+    budget = round(0.4 * float(effort.sum()), 1)
+    result = optimize_bundle(importance, effort, weights, budget, threshold=4, depth=2)
+    s = Section(
+        "Feature Stack by Segment",
+        f"Sample matrix, {budget:g} person-week budget: {result.coverage_pct:.1f}% weighted "
+        f"coverage for {result.effort_used:g} person-weeks.",
+    )
+    long_df, features, shown = bundle_heatmap_frame(importance, result.selected(), weights=weights.to_numpy())
+    s.chart("bundle_heatmap", long_df, "Importance Heatmap (bundle outlined)",
+            features=tuple(features), seg_names=tuple(shown))
+    s.table(result.selected_frame(), "Bundle (in pick order)")
+    sections.append(s)
+
+    schedule = schedule_roadmap(tables.get("roadmap"), tables.get("teams"))
+    s = Section(
+        "Roadmap",
+        f"Scheduled finish {schedule['End_Date'].max():%Y-%m-%d}; "
+        f"{int(schedule['Critical'].sum())} items on the critical chain.",
+    )
+    gantt_df = schedule.sort_values(["Critical", "Start_Week"], ascending=[False, True])
+    s.chart("roadmap_gantt", gantt_df.head(ROADMAP_CHART_ITEMS).drop(columns=["QuarterIdx"], errors="ignore"),
+            "Schedule (critical chain outlined)")
+    s.table(schedule.drop(columns=["QuarterIdx", "Start_Week", "End_Week"], errors="ignore")
+            .sort_values("Start_Date"), "Roadmap Items")
+    s.table(schedule_summary(schedule), "Team Load")
+    sections.append(s)
+
+    pricing_df = tables.get("pricing")
+    s = Section("Pricing Strategy")
+    s.table(pricing_df, "Price Comparison")
+    s.chart("price_bars", pricing_df)
+    sections.append(s)
+
+    funnel_df = tables.get("funnel")
+    s = Section("Developer Adoption Funnel")
+    s.table(chs_core.funnel_conversion(funnel_df)[["Stage", "Count", "Conversion_from_prev_%"]],
+            "Conversion Rates")
+    s.chart("funnel_bars", funnel_df, "Funnel")
+    store = CohortStore(cohort_dir)
+    cohort_df = store.cohort_table("week")
+    if not cohort_df.empty:
+        stage = DEFAULT_STAGES[store.cohort_stage + 1][1]
+        s.chart("cohort_heatmap", cohort_df[cohort_df["Stage"] == stage],
+                f"Weekly Cohorts: {stage}", period_label="Week")
+    sections.append(s)
+
+    comp_df = tables.get("competitors")
+    dominance = dominance_table(comp_df)
+    dims = [c for c in comp_df.columns if c.endswith("_1_5")]
+    s = Section(
+        "Competitor Landscape",
+        f"{int(dominance['On_Frontier'].sum())} of {len(dominance):,} vendors on the Pareto frontier.",
+    )
+    if (dominance["Vendor"] == "CentauriHS").any():
+        s.table(reference_gap(dominance, dims), "CentauriHS gap to the frontier")
+    s.table(dominance.sort_values(["On_Frontier", "Dominates"], ascending=False), "Competitive Metrics")
+    keep = dominance["On_Frontier"] | (dominance["Vendor"] == "CentauriHS")
+    chart_df = pd.concat([dominance[keep], _sample(dominance[~keep], max(CHART_MAX_POINTS - int(keep.sum()), 0))])
+    s.chart("competitor_breadth", chart_df, "Breadth vs Explainability")
+    s.chart("competitor_compliance", chart_df, "Compliance vs Explainability")
+    sections.append(s)
+    return sections
+
+
+# --- HTML ---
+
+CSS = f"""
+body {{ font-family: -apple-system, Segoe UI, Helvetica, Arial, sans-serif; color: {DARK_GREY};
+       background: {LIGHT_GREY}; margin: 0; }}
+header {{ background: {DARK_GREY}; color: white; padding: 24px 40px; }}
+header h1 {{ margin: 0; font-size: 26px; }} header p {{ margin: 4px 0 0; color: #ccc; }}
+nav {{ padding: 12px 40px; background: white; border-bottom: 1px solid #ddd; }}
+nav a {{ color: {DARK_GREY}; margin-right: 16px; font-size: 14px; }}
+section {{ background: white; margin: 24px 40px; padding: 20px 28px; border-radius: 10px;
+          border-top: 4px solid {PRIMARY_GREEN}; }}
+h2 {{ margin-top: 0; }} h4 {{ margin-bottom: 6px; }}
+.caption, .note {{ color: #666; font-size: 13px; }}
+table.tbl {{ border-collapse: collapse; font-size: 13px; margin-bottom: 8px; }}
+table.tbl th, table.tbl td {{ padding: 4px 10px; border-bottom: 1px solid #eee; text-align: left; }}
+table.tbl th {{ background: {LIGHT_GREY}; }}
+.chart svg, .chart img {{ max-width: 100%; height: auto; }}
+"""
+
+
+def _table_html(df):
+    note = ""
+    if len(df) > REPORT_MAX_ROWS:
+        note = f"<p class='note'>First {REPORT_MAX_ROWS:,} of {len(df):,} rows.</p>"
+        df = df.head(REPORT_MAX_ROWS)
+    return df.to_html(index=False, classes="tbl", border=0, na_rep="", float_format="{:,.3g}".format) + note
+
+
+def _chart_html(output, fmt, element_id):
+    if fmt == "svg":
+        return output[output.find("<svg"):]
+    if fmt == "png":
+        return f"<img src='data:image/png;base64,{base64.b64encode(output).decode()}'>"
+    spec = output.replace("</", "<\\/")
+    return f"<div id='{element_id}'></div><script>vegaEmbed('#{element_id}', {spec});</script>"
+
+
+def report_html(sections, rendered, fmt, title="CHS Strategy Report"):
+    slug = {s.title: "s" + hashlib.sha1(s.title.encode()).hexdigest()[:8] for s in sections}
+    parts = []
+    n = 0
+    for s in sections:
+        body = [f"<h2>{html.escape(s.title)}</h2>"]
+        if s.caption:
+            body.append(f"<p class='caption'>{html.escape(s.caption)}</p>")
+        for kind, item, heading in s.items:
+            if heading:
+                body.append(f"<h4>{html.escape(heading)}</h4>")
+            if kind == "table":
+                body.append(_table_html(item))
+            elif kind == "html":
+                body.append(f"<div class='chart'>{item}</div>")
+            else:
+                body.append(f"<div class='chart'>{_chart_html(rendered[n], fmt, f'chart{n}')}</div>")
+                n += 1
+        parts.append(f"<section id='{slug[s.title]}'>{''.join(body)}</section>")
+    scripts = ""
+    if fmt == "vega":
+        scripts = "".join(
+            f"<script src='https://cdn.jsdelivr.net/npm/{lib}'></script>"
+            for lib in ("vega@5", "vega-lite@5", "vega-embed@6")
+        )
+    nav = "".join(f"<a href='#{slug[s.title]}'>{html.escape(s.title)}</a>" for s in sections)
+    return (
+        f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{html.escape(title)}</title>"
+        f"<style>{CSS}</style>{scripts}</head><body>"
+        f"<header><h1>{html.escape(title)}</h1>"
+        f"<p>Centauri Health Solutions · generated {datetime.now():%Y-%m-%d %H:%M}</p></header>"
+        f"<nav>{nav}</nav>{''.join(parts)}</body></html>"
+    )
+
+
+def export_report(output, segments_path=None, charts="svg", also=(), workers=None,
+                  cache_dir=DEFAULT_CACHE_DIR, db_path=DEFAULT_DB_PATH,
+                  reference_dir=DEFAULT_REFERENCE_DIR, cohort_dir=DEFAULT_COHORT_DIR):
+    # Writes the HTML report (plus per-chart files for each format in `also`)
+    # and returns timing and cache statistics
+    timings = {}
+    start = time.perf_counter()
+    if _vl_convert() is None:
+        if also:
+            raise RuntimeError("Chart files need vl-convert-python (pip install vl-convert-python)")
+        charts = "vega"
+    sections = build_sections(load_report_segments(segments_path), db_path, reference_dir, cohort_dir)
+    jobs = [item for s in sections for kind, item, _ in s.items if kind == "chart"]
+    timings["data_s"] = time.perf_counter() - start
+
+    cache = RenderCache(cache_dir)
+    start = time.perf_counter()
+    rendered = render_all(jobs, charts, cache, workers)
+    with open(output, "w", encoding="utf-8") as f:
+        f.write(report_html(sections, rendered, charts))
+
+    if also:
+        chart_dir = os.path.splitext(output)[0] + "_charts"
+        os.makedirs(chart_dir, exist_ok=True)
+        names = [
+            f"{i + 1:02d}-{item.builder}"
+            for i, item in enumerate(jobs)
+        ]
+        for fmt in also:
+            files = render_all(jobs, fmt, cache, workers)
+            for i, name in enumerate(names):
+                with open(os.path.join(chart_dir, f"{name}.{fmt}"), "wb") as f:
+                    f.write(files[i].encode() if isinstance(files[i], str) else files[i])
+    timings["render_s"] = time.perf_counter() - start
+    return {
+        "charts": len(jobs),
+        "format": charts,
+        "cache_hits": cache.hits,
+        "cache_misses": cache.misses,
+        **timings,
+    }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="chs_report", description="Static HTML strategy report")
+    parser.add_argument("output", help="HTML file to write")
+    parser.add_argument("--segments", help="Segment CSV/Parquet (default: the sample segments)")
+    parser.add_argument("--charts", choices=["svg", "png"], default="svg",
+                        help="How charts are embedded in the HTML")
+    parser.add_argument("--also", nargs="*", choices=FORMATS, default=[],
+                        help="Also write every chart as these file formats")
+    parser.add_argument("--workers", type=int, default=None, help="Render processes (default: CPUs)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Backlog database")
+    parser.add_argument("--reference-dir", default=DEFAULT_REFERENCE_DIR)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    stats = export_report(
+        args.output, args.segments, args.charts, args.also, args.workers,
+        args.cache_dir, args.db, args.reference_dir,
+    )
+    print(
+        f"report: {stats['charts']} charts ({stats['format']}), "
+        f"{stats['cache_hits']} cached / {stats['cache_misses']} rendered, "
+        f"data {stats['data_s']:.2f}s + charts {stats['render_s']:.2f}s -> {args.output}",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
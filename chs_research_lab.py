@@ -2,11 +2,56 @@
 # Centauri Health Solutions – Strategy & Research Lab (visual, with sample data)
 
 import streamlit as st
-import pandas as pd
 import numpy as np
-import altair as alt
+import pandas as pd
+import time
 from datetime import datetime
 
+import chs_charts as charts
+from chs_core import (
+    DEFAULT_SEGMENTS,
+    compute_ice_score,
+    compute_priority_scores,
+    funnel_conversion,
+    weight_sensitivity_sweep,
+)
+from chs_cohorts import CohortStore
+from chs_features import (
+    bundle_heatmap_frame,
+    load_matrix,
+    optimize_bundle,
+    sample_matrix,
+    segment_weights,
+    synthetic_matrix,
+)
+from chs_funnel import DEFAULT_STAGES, build_funnel_index
+from chs_import import import_segments
+from chs_ingest import MarketData, load_sources
+from chs_montecarlo import default_uncertainty, run_monte_carlo
+from chs_pricing import (
+    load_population,
+    simulate_pricing,
+    synthetic_population,
+    tier_quotas,
+)
+from chs_profiling import Profiler
+from chs_reference import ReferenceTables
+from chs_roadmap import (
+    default_plan_start,
+    schedule_roadmap,
+    schedule_summary,
+    synthetic_roadmap,
+    team_table,
+)
+from chs_schema import INTERVIEW_STATUSES, editable_frame, memory_report, object_nbytes
+from chs_skyline import (
+    dominance_table,
+    reference_gap,
+    score_columns,
+    synthetic_competitors,
+)
+from chs_storage import BASELINE_SCENARIO, VersionConflict, Workspace, query_view
+
 # --- Branding & config ---
 PRIMARY_GREEN = "#78BE20"
 DARK_GREY = "#2E2E2E"
@@ -34,159 +79,191 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# --- Core sample data & helpers ---
-
-DEFAULT_SEGMENTS = [
-    {
-        "Segment": "Wellness & Fitness App Developers",
-        "Short Name": "Fitness Apps",
-        "TAM_2024_USD_B": 3.8,
-        "Adoption_Speed_1_5": 4,
-        "Compliance_Burden_1_5": 2,
-        "CHS_Fit_1_5": 4,
-    },
-    {
-        "Segment": "AI Health Coaching Startups",
-        "Short Name": "AI Health Coaches",
-        "TAM_2024_USD_B": 11.0,
-        "Adoption_Speed_1_5": 5,
-        "Compliance_Burden_1_5": 3,
-        "CHS_Fit_1_5": 5,
-    },
-    {
-        "Segment": "Chronic Condition Management Apps",
-        "Short Name": "Chronic Apps",
-        "TAM_2024_USD_B": 1.6,
-        "Adoption_Speed_1_5": 3,
-        "Compliance_Burden_1_5": 5,
-        "CHS_Fit_1_5": 5,
-    },
-    {
-        "Segment": "Wearable Data Aggregators & API Platforms",
-        "Short Name": "Aggregators",
-        "TAM_2024_USD_B": 0.212,
-        "Adoption_Speed_1_5": 3,
-        "Compliance_Burden_1_5": 5,
-        "CHS_Fit_1_5": 4,
-    },
-    {
-        "Segment": "Digital Therapeutics & Rx Wellness Startups",
-        "Short Name": "DTx",
-        "TAM_2024_USD_B": 7.8,
-        "Adoption_Speed_1_5": 2,
-        "Compliance_Burden_1_5": 5,
-        "CHS_Fit_1_5": 4,
-    },
-    {
-        "Segment": "Consumer Wearable Hardware Startups",
-        "Short Name": "Hardware",
-        "TAM_2024_USD_B": 22.0,
-        "Adoption_Speed_1_5": 3,
-        "Compliance_Burden_1_5": 3,
-        "CHS_Fit_1_5": 3,
-    },
-]
-
-# Platform architecture sample
-ARCH_DATA = [
-    ["Experience", "Developer Console", "Project config, API keys, dashboards", "Planned"],
-    ["Experience", "Compliance Dashboard", "BAA center, audit logs, cert view", "Planned"],
-    ["Platform", "Explainability Service", "Model cards, decision logs, feature importance", "Planned"],
-    ["Platform", "Model Hosting", "Healthcare-tuned models (stress, risk, etc.)", "Future"],
-    ["Data", "Unified Wearable APIs", "Apple/Google/Fitbit/Oura connectors", "MVP"],
-    ["Data", "Consent & Audit Layer", "PHI tagging, event logs, consent artifacts", "MVP"],
-    ["Infra", "Security & Residency", "KMS, region routing, retention policies", "MVP"],
-]
-
-# Roadmap sample
-ROADMAP_DATA = [
-    ["MVP", "Q1", "Data & Compliance", "Unified wearable APIs + audit logging"],
-    ["MVP", "Q1", "Experience", "Developer console + basic dashboard"],
-    ["V1", "Q2", "AI & Explainability", "Stress model + explainability views"],
-    ["V1", "Q2", "Partnerships", "AI health-coach design partners (5–8)"],
-    ["V2", "Q3", "Enterprise", "SOC 2, SSO/SCIM, DTx pilots"],
-    ["V2", "Q3", "Ecosystem", "Aggregator integrations (Validic/Terra-style)"],
-]
-
-# Pricing sample
-PRICING_DATA = [
-    ["Sandbox", 0, "1 project, 50k events/month, no BAAs, community support"],
-    ["Growth", 499, "Up to 3 projects, 5M events/month, BAAs, email support"],
-    ["Enterprise", 2500, "Unlimited projects, 50M+ events, BAAs, SSO, dedicated CSM"],
-]
-
-# Funnel sample
-FUNNEL_DATA = [
-    ["Site Visitors", 5000],
-    ["Signup (Dev Accounts)", 800],
-    ["Activated (First API Call)", 300],
-    ["Pilots (Design Partners)", 40],
-    ["Paying Customers", 10],
-]
-
-# Competitor sample
-COMPETITORS_DATA = [
-    ["AWS Health AI", "Hyperscaler", 5, 3, 3],
-    ["Google Healthcare API", "Hyperscaler", 5, 3, 3],
-    ["Azure Health Data Services", "Hyperscaler", 4, 3, 3],
-    ["Niche AI Vendor A", "Niche", 2, 4, 2],
-    ["Niche AI Vendor B", "Niche", 2, 3, 3],
-    ["CentauriHS", "CHS", 3, 5, 5],
-]
-
-
-def compute_priority_score(row, w_tam=0.3, w_adoption=0.3, w_fit=0.4):
-    # Rough TAM -> 1–5 scale
-    tam_norm = min(max(row["TAM_2024_USD_B"] / 5.0, 1.0), 5.0)
-    return round(
-        tam_norm * w_tam
-        + row["Adoption_Speed_1_5"] * w_adoption
-        + row["CHS_Fit_1_5"] * w_fit,
-        2,
+# --- Cached helpers (sample data & computations live in chs_core) ---
+
+
+@st.cache_data(show_spinner=False)
+def cached_weight_sweep(criteria_df, steps, top_k):
+    # st.cache_data hashes the DataFrame contents, so the sweep is only rerun
+    # when the segment assumptions (or grid settings) actually change.
+    return weight_sensitivity_sweep(criteria_df, steps=steps, top_k=top_k)
+
+
+@st.cache_data(max_entries=16, show_spinner="Running Monte Carlo…")
+def cached_monte_carlo(criteria_df, weights, extra_criteria, n_draws, seed, tam_spread, score_wobble):
+    spec = default_uncertainty(criteria_df, tam_spread=tam_spread, score_wobble=score_wobble)
+    result = run_monte_carlo(
+        criteria_df,
+        spec=spec,
+        weights=weights,
+        extra_criteria=extra_criteria,
+        n_draws=n_draws,
+        seed=seed,
     )
+    return result.percentiles(), result.rank_probabilities()
 
 
-def init_state():
-    if "segments_df" not in st.session_state:
-        df = pd.DataFrame(DEFAULT_SEGMENTS)
-        df["Priority_Score"] = df.apply(compute_priority_score, axis=1)
-        st.session_state["segments_df"] = df
+@st.cache_resource
+def get_workspace():
+    # One copy of the segment table and backlogs per server process, shared
+    # by every session; sessions only hold widget state.
+    return Workspace(pd.DataFrame(DEFAULT_SEGMENTS))
 
-    if "interviews_df" not in st.session_state:
-        st.session_state["interviews_df"] = pd.DataFrame(
-            columns=[
-                "Segment",
-                "Persona",
-                "Company Type",
-                "Priority_1_5",
-                "Key_Question",
-                "Status",
-            ]
-        )
 
-    if "hypotheses_df" not in st.session_state:
-        st.session_state["hypotheses_df"] = pd.DataFrame(
-            columns=[
-                "Segment",
-                "Hypothesis",
-                "Metric_to_Move",
-                "Impact_1_5",
-                "Confidence_1_5",
-                "Effort_1_5",
-                "ICE_Score",
-                "Next_Experiment",
-            ]
+@st.cache_resource
+def get_reference_tables():
+    # One loader per process; each lookup only re-reads a table whose file
+    # changed on disk
+    return ReferenceTables()
+
+
+@st.cache_resource
+def get_market_data():
+    # One ingestion loop and TTL cache per process; reruns only read it
+    return MarketData(load_sources())
+
+
+def get_reference_table(name):
+    tables = get_reference_tables()
+    df = tables.get(name)
+    if name in tables.errors:
+        st.warning(f"Reference table '{name}' could not be reloaded: {tables.errors[name]}")
+    return df
+
+
+@st.cache_resource(max_entries=4, show_spinner="Generating accounts…")
+def cached_population(n_accounts, median_events, events_sigma, mean_projects, seed):
+    # Shared read-only across sessions; avoids copying 1M rows on every rerun
+    return synthetic_population(n_accounts, median_events, events_sigma, mean_projects, seed)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def cached_pricing_sim(_population, population_key, tiers_df, curve_tier, curve_max):
+    # The population is identified by population_key instead of being hashed
+    population = _population
+    result = simulate_pricing(population, tiers_df)
+    curve = result.price_response(curve_tier, np.linspace(0, curve_max, 121))
+    return result.mrr, result.unserved, result.tier_mix(), result.revenue_by_usage(), curve
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def cached_feature_matrix(n_segments, n_features, seed):
+    return synthetic_matrix(n_segments, n_features, seed)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def cached_feature_bundle(importance, effort, weights, budget, threshold, depth):
+    result = optimize_bundle(importance, effort, weights, budget, threshold, depth)
+    return (
+        result.selected(),
+        result.selected_frame(),
+        result.segment_frame(importance.index),
+        result.coverage_pct,
+        result.effort_used,
+    )
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def cached_synthetic_roadmap(n_items):
+    return synthetic_roadmap(n_items)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def cached_schedule(roadmap_df, teams_df, plan_start):
+    return schedule_roadmap(roadmap_df, teams_df, start=plan_start)
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def cached_synthetic_competitors(n_vendors):
+    return synthetic_competitors(n_vendors)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def cached_dominance(comp_df, dims):
+    return dominance_table(comp_df, list(dims))
+
+
+@st.cache_resource
+def get_chart_cache():
+    # One spec cache per server process, shared by every session
+    return charts.ChartCache(max_entries=128)
+
+
+@st.cache_resource
+def get_profiler():
+    # Rolling per-page timing history for the whole server process
+    return Profiler(history=200)
+
+
+def show_chart(builder, df, **params):
+    with rerun.stage(f"chart:{builder.__name__}"):
+        spec = get_chart_cache().get(builder, df, **params)
+        st.vega_lite_chart(spec=spec, use_container_width=True)
+
+
+@st.cache_resource
+def get_cohort_store():
+    # Materialized cohort aggregates live on disk and are shared by all sessions
+    return CohortStore()
+
+
+def show_backlog_page(view, key, equals=None, ranges=None, order=None, search=None):
+    # Filters and slices on the server; only the visible page is sent to the
+    # browser. With a TextIndex, a search box narrows the rows to the matches,
+    # best match first.
+    if search is not None:
+        query = st.text_input("Search", key=f"{key}_search", placeholder="Words to look for")
+        if query.strip():
+            with rerun.stage(f"search:{key}"):
+                hits = view.index.get_indexer(search.search(query).index)
+            order = hits[hits >= 0]
+    col1, col2, col3 = st.columns([1, 1, 2])
+    with col1:
+        page_size = st.selectbox("Rows per page", [25, 50, 100, 250], index=1, key=f"{key}_size")
+    with col2:
+        page_no = st.number_input("Page", min_value=1, value=1, step=1, key=f"{key}_page")
+    with rerun.stage(f"query:{key}"):
+        page, n_matches = query_view(
+            view, equals, ranges, order, offset=(page_no - 1) * page_size, limit=page_size
         )
+    n_pages = max(1, -(-n_matches // page_size))
+    if page_no > n_pages:
+        page_no = n_pages
+        page, _ = query_view(
+            view, equals, ranges, order, offset=(page_no - 1) * page_size, limit=page_size
+        )
+    with col3:
+        first = (page_no - 1) * page_size + 1 if n_matches else 0
+        st.caption(
+            f"Rows {first:,}–{first + len(page) - 1 if n_matches else 0:,} of {n_matches:,} "
+            f"matching ({len(view):,} total) · page {page_no} of {n_pages}"
+        )
+    st.dataframe(page, use_container_width=True)
+
 
+def show_duplicates(view, duplicates, columns):
+    # Rows a TextIndex flagged as near-duplicates, most similar first
+    st.dataframe(
+        view.reindex(duplicates.index)[columns].assign(
+            Similarity_pct=(duplicates * 100).round().astype(int).to_numpy()
+        ),
+        use_container_width=True,
+    )
 
-def refresh_priority_scores():
-    df = st.session_state["segments_df"].copy()
-    for idx, row in df.iterrows():
-        df.loc[idx, "Priority_Score"] = compute_priority_score(row)
-    st.session_state["segments_df"] = df
 
+@st.cache_data(max_entries=32, show_spinner=False)
+def render_architecture_svg(dot):
+    # Memoized on the DOT text, so the layout runs once per distinct diagram
+    # rather than in the browser on every visit.
+    return charts.render_dot_svg(dot)
 
-init_state()
+
+profiler = get_profiler()
+rerun = profiler.start_run(None)
+rerun.mark("setup")
+workspace = get_workspace()
+market = get_market_data()
+market.refresh()  # background; no-op while the cache is fresh
 
 # --- Sidebar navigation ---
 st.sidebar.title("Navigation")
@@ -195,6 +272,7 @@ page = st.sidebar.radio(
     [
         "Segment Explorer",
         "Prioritization Canvas",
+        "Scenarios",
         "Interview Planner",
         "Hypothesis & Experiment Tracker",
         "Platform Architecture Map",
@@ -205,42 +283,133 @@ page = st.sidebar.radio(
         "Competitor Landscape",
     ],
 )
+rerun.page = page
 st.sidebar.markdown("---")
 st.sidebar.caption(f"© {datetime.now().year} Centauri Health Solutions")
 
-segments_df = st.session_state["segments_df"]
+segments_df, segments_version = workspace.segments.snapshot()
+
+# Above these sizes the editor/charts would ship the whole table to the browser
+EDITOR_MAX_ROWS = 5_000
+CHART_MAX_POINTS = 5_000
+ROADMAP_CHART_ITEMS = 300
+
 
 # =========================
 # 1. Segment Explorer
 # =========================
-if page == "Segment Explorer":
+def show_segment_explorer():
+    # Its own snapshot: imports and edits below move it to the new version
+    segments_df, segments_version = workspace.segments.snapshot()
     st.subheader("Segment Explorer")
     st.caption("Tweak segment assumptions and see how it affects overall priority.")
 
-    editable_df = st.data_editor(
-        segments_df,
-        column_config={
-            "TAM_2024_USD_B": st.column_config.NumberColumn(
-                "TAM 2024 ($B)", min_value=0.0
-            ),
-            "Adoption_Speed_1_5": st.column_config.NumberColumn(
-                "Adoption Speed (1–5)", min_value=1, max_value=5
-            ),
-            "Compliance_Burden_1_5": st.column_config.NumberColumn(
-                "Compliance Burden (1–5)", min_value=1, max_value=5
-            ),
-            "CHS_Fit_1_5": st.column_config.NumberColumn(
-                "CHS Fit (1–5)", min_value=1, max_value=5
-            ),
-        },
-        hide_index=True,
-        use_container_width=True,
-    )
+    rerun.mark("import")
+    with st.expander("Bulk import segments (CSV / Parquet)"):
+        st.caption(
+            "Required columns: Segment, TAM_2024_USD_B, Adoption_Speed_1_5, "
+            "Compliance_Burden_1_5, CHS_Fit_1_5 (optional: Short Name). "
+            "Rows failing validation are reported and skipped."
+        )
+        uploaded = st.file_uploader("Segment file", type=["csv", "parquet"])
+        server_path = st.text_input("…or a file path on the server (for very large files)")
+        col1, col2 = st.columns(2)
+        with col1:
+            import_mode = st.radio("Mode", ["Replace", "Append"], horizontal=True)
+        with col2:
+            memory_budget_mb = st.number_input("Memory budget (MB)", 32, 4096, 256, 32)
+        if st.button("Import segments", disabled=uploaded is None and not server_path):
+            source = uploaded if uploaded is not None else server_path
+            name = uploaded.name if uploaded is not None else server_path
+            try:
+                imported, report = import_segments(
+                    source, name=name, memory_budget_mb=memory_budget_mb
+                )
+            except (ValueError, OSError) as exc:
+                st.error(f"Import failed: {exc}")
+            else:
+                if import_mode == "Append":
+                    imported = pd.concat([segments_df, imported], ignore_index=True)
+                segments_version = workspace.segments.replace(imported)
+                segments_df, segments_version = workspace.segments.snapshot()
+                st.success(
+                    f"Imported {report.rows_valid:,} of {report.rows_read:,} rows "
+                    f"({report.rows_bad:,} rejected)."
+                )
+                if report.rows_bad:
+                    st.dataframe(report.summary(), use_container_width=True)
+                    st.caption(f"First {len(report.bad_rows()):,} rejected rows:")
+                    st.dataframe(report.bad_rows(), use_container_width=True)
+
+    market_tam = market.table("segments")
+    if market_tam is not None:
+        tam = market_tam.set_index(market_tam["Segment"].astype(str))["TAM_2024_USD_B"]
+        feed_tam = segments_df["Segment"].astype(str).map(tam)
+        n_matched = int(feed_tam.notna().sum())
+        if n_matched and st.button(f"Apply market-feed TAM to {n_matched:,} segments"):
+            updated = segments_df.assign(
+                TAM_2024_USD_B=feed_tam.fillna(segments_df["TAM_2024_USD_B"]).astype(
+                    segments_df["TAM_2024_USD_B"].dtype
+                )
+            )
+            try:
+                workspace.segments.commit(updated, segments_version)
+            except VersionConflict as exc:
+                st.warning(f"TAM was not applied: {exc}.")
+            segments_df, segments_version = workspace.segments.snapshot()
+
+    rerun.mark("editor")
+    if len(segments_df) <= EDITOR_MAX_ROWS:
+        # The editor is bound to the version this session started editing, so
+        # its pending cell edits are committed against that version and merged
+        # with anything other sessions committed since.
+        base_version = st.session_state.get("segments_base_version", segments_version)
+        pending = st.session_state.get(f"segments_editor_{base_version}") or {}
+        if not pending.get("edited_rows"):
+            base_version = segments_version
+        base_df = workspace.segments.at_version(base_version)
+        if base_df is None:
+            base_version, base_df = segments_version, segments_df
+        # Names are edited as text; the commit makes them categorical again
+        base_df = editable_frame(base_df, "segments")
+        editable_df = st.data_editor(
+            base_df,
+            column_config={
+                "TAM_2024_USD_B": st.column_config.NumberColumn(
+                    "TAM 2024 ($B)", min_value=0.0
+                ),
+                "Adoption_Speed_1_5": st.column_config.NumberColumn(
+                    "Adoption Speed (1–5)", min_value=1, max_value=5
+                ),
+                "Compliance_Burden_1_5": st.column_config.NumberColumn(
+                    "Compliance Burden (1–5)", min_value=1, max_value=5
+                ),
+                "CHS_Fit_1_5": st.column_config.NumberColumn(
+                    "CHS Fit (1–5)", min_value=1, max_value=5
+                ),
+                "Priority_Score": st.column_config.NumberColumn(disabled=True),
+            },
+            hide_index=True,
+            use_container_width=True,
+            key=f"segments_editor_{base_version}",
+        )
 
-    st.session_state["segments_df"] = editable_df
-    refresh_priority_scores()
-    seg = st.session_state["segments_df"]
+        if not editable_df.equals(base_df):
+            try:
+                workspace.segments.commit(editable_df, base_version)
+            except VersionConflict as exc:
+                st.warning(f"Your last edit was not saved: {exc}. Showing the latest table.")
+            segments_df, segments_version = workspace.segments.snapshot()
+        # Next rerun starts a fresh editor on the latest version
+        st.session_state["segments_base_version"] = segments_version
+    else:
+        st.info(
+            f"{len(segments_df):,} segments loaded – too many to edit inline. "
+            "Edit the source file and re-import instead."
+        )
+    seg = segments_df
 
+    rerun.mark("scores")
     st.markdown("#### Priority Scores")
     st.dataframe(
         seg[
@@ -251,46 +420,26 @@ if page == "Segment Explorer":
                 "CHS_Fit_1_5",
                 "Priority_Score",
             ]
-        ],
+        ].head(EDITOR_MAX_ROWS),
         use_container_width=True,
     )
 
     st.markdown("#### Visual: Adoption vs Compliance (bubble size = TAM, color = CHS Fit)")
-    chart_df = seg.copy()
-    chart_df["TAM_scaled"] = chart_df["TAM_2024_USD_B"].clip(lower=0.1)
-    scatter = (
-        alt.Chart(chart_df)
-        .mark_circle()
-        .encode(
-            x=alt.X("Adoption_Speed_1_5", title="Adoption Speed (1–5)"),
-            y=alt.Y("Compliance_Burden_1_5", title="Compliance Burden (1–5)"),
-            size=alt.Size("TAM_scaled", title="TAM 2024 ($B)", legend=None),
-            color=alt.Color(
-                "CHS_Fit_1_5",
-                scale=alt.Scale(scheme="greens"),
-                title="CHS Fit (1–5)",
-            ),
-            tooltip=[
-                "Segment",
-                "TAM_2024_USD_B",
-                "Adoption_Speed_1_5",
-                "Compliance_Burden_1_5",
-                "CHS_Fit_1_5",
-            ],
-        )
-        .properties(height=400)
-    )
+    if len(seg) > CHART_MAX_POINTS:
+        st.caption(f"Showing a random sample of {CHART_MAX_POINTS:,} segments.")
+        seg = seg.sample(CHART_MAX_POINTS, random_state=0)
+    show_chart(charts.segment_scatter, seg)
 
-    st.altair_chart(scatter, use_container_width=True)
 
 # =========================
 # 2. Prioritization Canvas
 # =========================
-elif page == "Prioritization Canvas":
+def show_prioritization_canvas():
     st.subheader("Prioritization Canvas")
     st.caption("Visual focus: which segments are best for CHS to tackle first?")
 
-    seg = segments_df.copy()
+    rerun.mark("scoring")
+    seg = segments_df
 
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -300,11 +449,18 @@ elif page == "Prioritization Canvas":
     with col3:
         w_fit = st.slider("Weight: CHS Fit", 0.0, 1.0, 0.4, 0.05)
 
+    w_comp = st.slider("Penalty: Compliance Burden", 0.0, 1.0, 0.0, 0.05)
+
     total = max(w_tam + w_adopt + w_fit, 0.0001)
     w_tam, w_adopt, w_fit = w_tam / total, w_adopt / total, w_fit / total
+    extra_criteria = (
+        {"Compliance_Burden_1_5": -w_comp / total} if w_comp > 0 else None
+    )
 
-    seg["Priority_Score"] = seg.apply(
-        lambda r: compute_priority_score(r, w_tam, w_adopt, w_fit), axis=1
+    seg = seg.assign(
+        Priority_Score=compute_priority_scores(
+            seg, w_tam, w_adopt, w_fit, extra_criteria=extra_criteria
+        )
     )
     ranked = seg.sort_values("Priority_Score", ascending=False)
 
@@ -324,34 +480,191 @@ elif page == "Prioritization Canvas":
     )
 
     st.markdown("#### Focus Map (Adoption vs CHS Fit)")
-    focus_chart = (
-        alt.Chart(ranked)
-        .mark_circle()
-        .encode(
-            x=alt.X("Adoption_Speed_1_5", title="Adoption Speed"),
-            y=alt.Y("CHS_Fit_1_5", title="CHS Strategic Fit"),
-            size=alt.Size("TAM_2024_USD_B", title="TAM 2024 ($B)", legend=None),
-            color=alt.Color(
-                "Priority_Score",
-                title="Priority Score",
-                scale=alt.Scale(scheme="viridis"),
-            ),
-            tooltip=["Segment", "Priority_Score"],
+    show_chart(charts.focus_map, ranked)
+
+    rerun.mark("weight sweep")
+    st.markdown("#### Weight Sensitivity (rank stability across all weight mixes)")
+    col1, col2 = st.columns(2)
+    with col1:
+        grid_steps = st.slider("Grid resolution (steps per weight)", 10, 100, 50, 10)
+    with col2:
+        top_k = st.slider("Top-k", 1, max(len(seg), 1), min(3, max(len(seg), 1)))
+
+    sweep_summary, sweep_grid = cached_weight_sweep(
+        seg[
+            [
+                "Segment",
+                "Short Name",
+                "TAM_2024_USD_B",
+                "Adoption_Speed_1_5",
+                "CHS_Fit_1_5",
+            ]
+        ],
+        grid_steps,
+        top_k,
+    )
+    st.caption(
+        f"{len(sweep_grid):,} weight vectors × {len(seg):,} segments. "
+        "Share of weight space where each segment ranks #1 or lands in the top-k."
+    )
+    st.dataframe(
+        sweep_summary.sort_values("Share_Rank1_%", ascending=False),
+        use_container_width=True,
+    )
+
+    st.caption("Winner map: Weight: CHS Fit = 1 − TAM − Adoption Speed.")
+    show_chart(charts.weight_winner_map, sweep_grid)
+
+    rerun.mark("monte carlo")
+    st.markdown("#### Score Uncertainty (Monte Carlo)")
+    st.caption(
+        "TAM is drawn from a triangular range (or <column>_Low/_High research ranges "
+        "when present); 1–5 scores move one step up or down with the given probability."
+    )
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        n_draws = st.selectbox("Draws", [100_000, 1_000_000, 2_000_000], index=1, format_func="{:,}".format)
+    with col2:
+        tam_spread = st.slider("TAM range (±%)", 0, 100, 30, 5) / 100
+    with col3:
+        score_wobble = st.slider("Score step probability", 0.0, 0.5, 0.2, 0.05)
+    with col4:
+        mc_seed = st.number_input("Seed", 0, 2**31 - 1, 42)
+
+    if st.checkbox("Run simulation", value=len(seg) <= 50):
+        mc_columns = ["Segment", "Short Name", "TAM_2024_USD_B", "Adoption_Speed_1_5", "CHS_Fit_1_5", "Compliance_Burden_1_5"]
+        mc_columns += [c for c in seg.columns if c.endswith(("_Low", "_High"))]
+        score_pct, rank_probs = cached_monte_carlo(
+            seg[mc_columns],
+            (w_tam, w_adopt, w_fit),
+            extra_criteria,
+            n_draws,
+            int(mc_seed),
+            tam_spread,
+            score_wobble,
         )
-        .properties(height=400)
+        if len(score_pct) > 30:
+            st.caption("Interval bars for the 30 segments with the highest median score.")
+        show_chart(charts.score_intervals, score_pct.nlargest(30, "P50"))
+        st.markdown("##### Rank probabilities")
+        st.dataframe(
+            rank_probs.style.format({c: "{:.1%}" for c in rank_probs.columns[1:]}),
+            use_container_width=True,
+        )
+
+
+# =========================
+# 3. Scenarios
+# =========================
+def show_scenarios():
+    st.subheader("Scenarios")
+    st.caption("Save what-if variants of the segment assumptions and compare them.")
+
+    rerun.mark("edit")
+    scenarios = workspace.scenarios
+    scenario_names = scenarios.names()
+    base_name = st.selectbox("Start from", scenario_names, key="scenario_base")
+    scenario_df = scenarios.frame(base_name)
+
+    with st.form("scenario_whatif"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            assumption = st.selectbox(
+                "Assumption",
+                ["TAM_2024_USD_B", "Adoption_Speed_1_5", "Compliance_Burden_1_5", "CHS_Fit_1_5"],
+            )
+        with col2:
+            change_pct = st.number_input("Change (%)", -100.0, 500.0, 20.0, 5.0)
+        with col3:
+            match = st.text_input("Segments containing (blank = all)")
+        new_name = st.text_input("Save as", f"{base_name} what-if")
+        submitted = st.form_submit_button("Save scenario")
+    if submitted:
+        new_name = new_name.strip()
+        if not new_name or new_name == BASELINE_SCENARIO:
+            st.error(f"Pick a scenario name other than {BASELINE_SCENARIO!r}.")
+        else:
+            if match:
+                mask = scenario_df["Segment"].astype(str).str.contains(match, case=False, regex=False)
+            else:
+                mask = pd.Series(True, index=scenario_df.index)
+            values = scenario_df[assumption].astype(float)
+            values = values.where(~mask, values * (1 + change_pct / 100))
+            values = values.round().clip(1, 5) if assumption.endswith("_1_5") else values.clip(lower=0)
+            edited = scenario_df.assign(**{assumption: values.astype(scenario_df[assumption].dtype)})
+            edited = edited.assign(Priority_Score=compute_priority_scores(edited))
+            scenarios.save(new_name, edited, parent=base_name)
+            st.success(f"Saved {new_name!r}: {assumption} changed for {int(mask.sum()):,} segments.")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        live_name = st.text_input("Save the live segment table as", "Live table")
+        if st.button("Save live table", disabled=not live_name.strip()):
+            if live_name.strip() == BASELINE_SCENARIO:
+                st.error(f"{BASELINE_SCENARIO!r} is the table the app started with.")
+            else:
+                scenarios.save(live_name.strip(), segments_df, parent=BASELINE_SCENARIO)
+                st.success(f"Saved {live_name.strip()!r}.")
+    with col2:
+        removable = [n for n in scenarios.names() if n != BASELINE_SCENARIO]
+        doomed = st.selectbox("Delete scenario", removable, index=None)
+        if st.button("Delete", disabled=doomed is None):
+            scenarios.delete(doomed)
+            st.success(f"Deleted {doomed!r}.")
+
+    st.markdown("#### Saved Scenarios")
+    st.dataframe(scenarios.summary(), hide_index=True, use_container_width=True)
+    st.caption(
+        f"Stored: {scenarios.stored_bytes() / 2**10:,.1f} KB for "
+        f"{len(scenarios.names())} scenarios (as full copies: "
+        f"{scenarios.full_copy_bytes() / 2**10:,.1f} KB)."
     )
-    st.altair_chart(focus_chart, use_container_width=True)
+
+    rerun.mark("diff")
+    st.markdown("#### Compare")
+    scenario_names = scenarios.names()
+    col1, col2 = st.columns(2)
+    with col1:
+        name_a = st.selectbox("Scenario A", scenario_names, key="scenario_a")
+    with col2:
+        name_b = st.selectbox(
+            "Scenario B", scenario_names, index=len(scenario_names) - 1, key="scenario_b"
+        )
+    diff = scenarios.diff(name_a, name_b)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Changed cells", f"{len(diff.cells):,}")
+    col2.metric("Changed segments", f"{diff.rows_changed:,}")
+    col3.metric("Rank moves", f"{len(diff.ranks):,}")
+    col4.metric("Segments added / removed", f"{len(diff.added):,} / {len(diff.removed):,}")
+    if diff.columns:
+        st.caption(
+            "Changed columns: " + ", ".join(f"{c} ({n:,})" for c, n in diff.columns.items())
+        )
+    if len(diff.ranks):
+        st.markdown("##### Rank changes (largest moves first)")
+        st.dataframe(diff.ranks.head(EDITOR_MAX_ROWS), hide_index=True, use_container_width=True)
+    if len(diff.cells):
+        st.markdown("##### Changed cells")
+        st.dataframe(
+            diff.cells.head(EDITOR_MAX_ROWS).astype({"Before": str, "After": str}),
+            hide_index=True,
+            use_container_width=True,
+        )
+
 
 # =========================
-# 3. Interview Planner
+# 4. Interview Planner
 # =========================
-elif page == "Interview Planner":
+def show_interview_planner():
     st.subheader("Interview Planner")
     st.caption("Plan and track discovery interviews across segments & personas.")
 
     seg_names = segments_df["Segment"].tolist()
-    interviews_df = st.session_state["interviews_df"]
+    interview_store = workspace.interviews
+    interview_rollup = workspace.interview_rollup
+    statuses = INTERVIEW_STATUSES
 
+    rerun.mark("form")
     st.markdown("#### Add Interview Plan")
     with st.form("add_interview"):
         col1, col2 = st.columns(2)
@@ -361,16 +674,26 @@ elif page == "Interview Planner":
             company_type = st.text_input("Company Type (e.g., Seed AI health coach)")
         with col2:
             priority = st.slider("Priority (1–5)", 1, 5, 3)
-            status = st.selectbox(
-                "Status", ["Planned", "Invited", "Scheduled", "Completed"]
-            )
+            status = st.selectbox("Status", statuses)
         key_question = st.text_area(
             "Key Question / Learning Goal",
             "What stops you from adopting a compliance-first AI platform today?",
         )
 
+        allow_duplicate = st.checkbox(
+            "Add even if a similar interview is already planned", key="interview_allow_duplicate"
+        )
         submit = st.form_submit_button("Add Interview")
-        if submit:
+        duplicates = workspace.interview_search.near_duplicates(key_question) if submit else None
+        if submit and len(duplicates) and not allow_duplicate:
+            st.warning(
+                f"{len(duplicates)} planned interview(s) ask nearly the same question. "
+                "Tick the box above to add it anyway."
+            )
+            show_duplicates(
+                interview_store.frame(), duplicates, ["Segment", "Persona", "Key_Question", "Status"]
+            )
+        elif submit:
             new_row = {
                 "Segment": segment,
                 "Persona": persona,
@@ -379,37 +702,81 @@ elif page == "Interview Planner":
                 "Key_Question": key_question,
                 "Status": status,
             }
-            st.session_state["interviews_df"] = pd.concat(
-                [interviews_df, pd.DataFrame([new_row])], ignore_index=True
-            )
+            interview_store.append(new_row)
             st.success("Interview added.")
 
+    rerun.mark("backlog")
     st.markdown("#### Interview Backlog")
-    interviews_df = st.session_state["interviews_df"]
+    interviews_df = interview_store.frame()
     if interviews_df.empty:
         st.info("No interviews yet. Use the form above to add some.")
     else:
-        st.dataframe(interviews_df, use_container_width=True)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            seg_filter = st.multiselect(
+                "Filter segment",
+                interview_rollup.segments(),
+                key="interviews_segment_filter",
+            )
+        with col2:
+            status_filter = st.multiselect(
+                "Filter status", statuses, key="interviews_status_filter"
+            )
+        with col3:
+            priority_range = st.slider("Priority range", 1, 5, (1, 5))
+        show_backlog_page(
+            interviews_df,
+            "interviews",
+            equals={"Segment": seg_filter, "Status": status_filter},
+            ranges={"Priority_1_5": priority_range} if priority_range != (1, 5) else None,
+            search=workspace.interview_search,
+        )
 
+        with st.form("update_interview_status"):
+            col1, col2 = st.columns(2)
+            with col1:
+                interview_id = st.number_input("Interview ID", min_value=1, step=1)
+            with col2:
+                new_status = st.selectbox("New Status", statuses)
+            if st.form_submit_button("Update Status"):
+                try:
+                    interview_store.update(int(interview_id), Status=new_status)
+                except KeyError:
+                    st.error(f"No interview with ID {interview_id}.")
+                else:
+                    st.success(f"Interview {interview_id} marked {new_status}.")
+                    interviews_df = interview_store.frame()
+
+        rerun.mark("rollups")
         st.markdown("##### Summary by Segment & Status")
-        summary = (
-            interviews_df.groupby(["Segment", "Status"])["Priority_1_5"]
-            .count()
-            .reset_index()
-            .rename(columns={"Priority_1_5": "# Interviews"})
+        st.dataframe(
+            interview_rollup.segment_status_summary(), use_container_width=True
         )
-        st.dataframe(summary, use_container_width=True)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("##### By Segment (mean priority, completion rate)")
+            st.dataframe(
+                interview_rollup.segment_summary().round(2),
+                use_container_width=True,
+            )
+        with col2:
+            st.markdown("##### By Persona")
+            st.dataframe(interview_rollup.persona_summary(), use_container_width=True)
+
 
 # =========================
-# 4. Hypothesis & Experiment Tracker
+# 5. Hypothesis & Experiment Tracker
 # =========================
-elif page == "Hypothesis & Experiment Tracker":
+def show_hypothesis_tracker():
     st.subheader("Hypothesis & Experiment Tracker")
     st.caption("Capture strategy hypotheses and decide what to test next.")
 
     seg_names = segments_df["Segment"].tolist()
-    hypotheses_df = st.session_state["hypotheses_df"]
+    hypothesis_store = workspace.hypotheses
+    hypothesis_rank = workspace.hypothesis_rank
 
+    rerun.mark("form")
     st.markdown("#### Add Hypothesis")
     with st.form("add_hypothesis"):
         col1, col2 = st.columns([1, 2])
@@ -432,9 +799,21 @@ elif page == "Hypothesis & Experiment Tracker":
                 "Run 5 design-partner calls with AI health-coach startups and offer them a pilot sandbox.",
             )
 
+        allow_duplicate = st.checkbox(
+            "Add even if a similar hypothesis exists", key="hypothesis_allow_duplicate"
+        )
         submit = st.form_submit_button("Add Hypothesis")
-        if submit:
-            ice = round((impact * confidence) / max(effort, 1), 2)
+        duplicates = workspace.hypothesis_search.near_duplicates(hypo) if submit else None
+        if submit and len(duplicates) and not allow_duplicate:
+            st.warning(
+                f"{len(duplicates)} hypothesis(es) in the backlog read nearly the same. "
+                "Tick the box above to add it anyway."
+            )
+            show_duplicates(
+                hypothesis_store.frame(), duplicates, ["Segment", "Hypothesis", "ICE_Score"]
+            )
+        elif submit:
+            ice = compute_ice_score(impact, confidence, effort)
             new_row = {
                 "Segment": segment,
                 "Hypothesis": hypo,
@@ -445,192 +824,265 @@ elif page == "Hypothesis & Experiment Tracker":
                 "ICE_Score": ice,
                 "Next_Experiment": experiment,
             }
-            st.session_state["hypotheses_df"] = pd.concat(
-                [hypotheses_df, pd.DataFrame([new_row])], ignore_index=True
-            )
+            hypothesis_store.append(new_row)
             st.success("Hypothesis added.")
 
+    rerun.mark("backlog")
     st.markdown("#### Hypothesis Backlog (ranked by ICE score)")
-    hypotheses_df = st.session_state["hypotheses_df"]
+    hypotheses_df, hypothesis_order = hypothesis_store.ranked(hypothesis_rank)
     if hypotheses_df.empty:
         st.info("No hypotheses yet. Add one with the form above.")
     else:
-        ranked_h = hypotheses_df.sort_values("ICE_Score", ascending=False)
-        st.dataframe(ranked_h, use_container_width=True)
+        # RankIndex keeps the ICE order up to date as rows arrive, so pages
+        # (and the top-k on page 1) are slices rather than a sort per rerun;
+        # a search ranks by relevance instead
+        col1, col2 = st.columns(2)
+        with col1:
+            seg_filter = st.multiselect(
+                "Filter segment",
+                sorted(hypotheses_df["Segment"].dropna().unique()),
+                key="hypotheses_segment_filter",
+            )
+        with col2:
+            ice_range = st.slider("ICE score range", 0.0, 25.0, (0.0, 25.0), 0.5)
+        show_backlog_page(
+            hypotheses_df,
+            "hypotheses",
+            equals={"Segment": seg_filter},
+            ranges={"ICE_Score": ice_range} if ice_range != (0.0, 25.0) else None,
+            order=hypothesis_order,
+            search=workspace.hypothesis_search,
+        )
+
 
 # =========================
-# 5. Platform Architecture Map
+# 6. Platform Architecture Map
 # =========================
-elif page == "Platform Architecture Map":
+def show_architecture_map():
     st.subheader("Platform Architecture Map (V1)")
     st.caption("Visual view of CHS layers: Data → Platform → Experience.")
 
-    arch_df = pd.DataFrame(
-        ARCH_DATA, columns=["Layer", "Component", "Description", "Status"]
-    )
+    rerun.mark("tables")
+    arch_df = get_reference_table("architecture")
     st.markdown("#### Architecture Components")
     st.dataframe(arch_df, use_container_width=True)
 
     st.markdown("#### Layer Mix")
     layer_counts = arch_df.groupby("Layer")["Component"].count().reset_index()
-    layer_chart = (
-        alt.Chart(layer_counts)
-        .mark_bar()
-        .encode(
-            x=alt.X("Layer", sort=["Infra", "Data", "Platform", "Experience"]),
-            y=alt.Y("Component", title="# Components"),
-            color=alt.Color("Layer", legend=None, scale=alt.Scale(scheme="greens")),
-            tooltip=["Layer", "Component"],
-        )
-        .properties(height=300)
-    )
-    st.altair_chart(layer_chart, use_container_width=True)
+    show_chart(charts.layer_mix, layer_counts)
 
+    rerun.mark("diagram")
     st.markdown("#### Simple Architecture Diagram (conceptual)")
-    dot = """
-    digraph CHS {
-        rankdir=TB;
-        node [shape=box, style="rounded,filled", color="#78BE20", fillcolor="#E9F5DB"];
-
-        subgraph cluster_infra {
-            label="Infra";
-            style="rounded";
-            SecurityResidency [label="Security & Residency"];
-        }
-
-        subgraph cluster_data {
-            label="Data Layer";
-            style="rounded";
-            UnifiedAPIs [label="Unified Wearable APIs"];
-            ConsentAudit [label="Consent & Audit Layer"];
-        }
-
-        subgraph cluster_platform {
-            label="Platform Services";
-            style="rounded";
-            Explainability [label="Explainability Service"];
-            ModelHosting [label="Model Hosting"];
-        }
-
-        subgraph cluster_experience {
-            label="Developer Experience";
-            style="rounded";
-            DevConsole [label="Developer Console"];
-            ComplianceDash [label="Compliance Dashboard"];
-        }
-
-        SecurityResidency -> UnifiedAPIs -> ConsentAudit -> Explainability -> ModelHosting -> DevConsole -> ComplianceDash;
-    }
-    """
-    st.graphviz_chart(dot)
+    st.caption("Solid = MVP, dashed outline = Planned, grey dashed = Future.")
+    dot = charts.architecture_dot(arch_df)
+    svg = render_architecture_svg(dot)
+    if svg is None:
+        st.graphviz_chart(dot)
+    else:
+        st.image(svg)
+
 
 # =========================
-# 6. Feature Stack by Segment
+# 7. Feature Stack by Segment
 # =========================
-elif page == "Feature Stack by Segment":
+def show_feature_stack():
     st.subheader("Feature Stack by Segment")
     st.caption("Which features matter most for which developer segment?")
 
-    features = [
-        "Unified Wearable APIs",
-        "Consent & Audit Trails",
-        "Explainability Dashboards",
-        "HIPAA/SOC2 Compliance Pack",
-        "Data Residency Controls",
-        "DTx / FDA Support",
-    ]
+    rerun.mark("matrix")
+    source = st.radio(
+        "Importance matrix", ["Sample", "Synthetic", "Upload"], horizontal=True, key="feature_source"
+    )
     seg_names = [s["Short Name"] for s in DEFAULT_SEGMENTS]
-    # Simple 1–5 importance matrix (sample)
-    importance_matrix = pd.DataFrame(
-        [
-            [5, 3, 3, 2, 2, 1],  # Fitness Apps
-            [4, 4, 5, 4, 3, 2],  # AI Health Coaches
-            [4, 5, 4, 5, 4, 3],  # Chronic Apps
-            [3, 5, 4, 4, 4, 2],  # Aggregators
-            [3, 5, 5, 5, 4, 5],  # DTx
-            [5, 3, 2, 2, 2, 1],  # Hardware
-        ],
-        columns=features,
-        index=seg_names,
-    ).reset_index(names="Segment")
+    importance, effort = sample_matrix(seg_names)
+    if source == "Synthetic":
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            n_feature_segments = st.number_input("Segments", 2, 5_000, 200, 50)
+        with col2:
+            n_features = st.number_input("Features", 2, 2_000, 300, 50)
+        with col3:
+            feature_seed = st.number_input("Seed", 0, 2**31 - 1, 0, key="feature_seed")
+        importance, effort = cached_feature_matrix(
+            int(n_feature_segments), int(n_features), int(feature_seed)
+        )
+    elif source == "Upload":
+        matrix_file = st.file_uploader(
+            "Wide CSV/Parquet: Segment column + one 1–5 column per feature "
+            "(optional 'Effort' row)",
+            type=["csv", "parquet"],
+        )
+        if matrix_file is not None:
+            try:
+                importance, uploaded_effort = load_matrix(matrix_file, name=matrix_file.name)
+            except (ValueError, KeyError, OSError) as exc:
+                st.error(f"Importance file could not be read: {exc}")
+            else:
+                effort = (
+                    uploaded_effort
+                    if uploaded_effort is not None
+                    else pd.Series(1.0, index=importance.columns, name="Effort")
+                )
+
+    if importance.shape[1] <= 20:
+        effort = (
+            st.data_editor(
+                effort.rename_axis("Feature").reset_index(),
+                column_config={
+                    "Effort": st.column_config.NumberColumn("Effort (person-weeks)", min_value=0.0)
+                },
+                disabled=["Feature"],
+                hide_index=True,
+                use_container_width=True,
+                key=f"feature_effort_{source}",
+            )
+            .set_index("Feature")["Effort"]
+            .fillna(0.0)
+        )
+
+    weights = segment_weights(importance.index, segments_df)
+    total_effort = float(effort.sum())
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        budget = st.slider(
+            "Effort budget (person-weeks)",
+            0.0,
+            max(total_effort, 1.0),
+            round(0.4 * total_effort, 1),
+            0.5,
+        )
+    with col2:
+        threshold = st.slider("A feature covers a segment at importance ≥", 1, 5, 4)
+    with col3:
+        depth = st.number_input("Covering features a segment needs", 1, 10, 2)
 
-    st.markdown("#### Importance Heatmap (1–5)")
-    st.dataframe(importance_matrix, use_container_width=True)
+    rerun.mark("optimize")
+    selected, selected_df, segment_df, coverage_pct, effort_used = cached_feature_bundle(
+        importance, effort, weights, budget, threshold, int(depth)
+    )
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Weighted segment coverage", f"{coverage_pct:.1f}%")
+    col2.metric("Effort used", f"{effort_used:,.1f} / {budget:,.1f}")
+    col3.metric("Features in bundle", f"{len(selected):,} of {importance.shape[1]:,}")
+    st.caption(
+        f"{importance.shape[0]:,} segments weighted by Priority_Score "
+        "(segments not in the Segment Explorer get the average weight)."
+    )
 
-    # Melt for heatmap
-    melt_df = importance_matrix.melt(
-        id_vars=["Segment"], var_name="Feature", value_name="Importance"
+    rerun.mark("heatmap")
+    st.markdown("#### Importance Heatmap (1–5, bundle outlined)")
+    long_df, shown_features, shown_segments = bundle_heatmap_frame(
+        importance, selected, weights=weights.to_numpy()
     )
-    heatmap = (
-        alt.Chart(melt_df)
-        .mark_rect()
-        .encode(
-            x=alt.X("Feature:N", sort=features),
-            y=alt.Y("Segment:N", sort=seg_names),
-            color=alt.Color(
-                "Importance:Q",
-                scale=alt.Scale(scheme="greens", domain=[1, 5]),
-                title="Importance",
-            ),
-            tooltip=["Segment", "Feature", "Importance"],
+    if len(shown_features) < importance.shape[1] or len(shown_segments) < importance.shape[0]:
+        st.caption(
+            f"Showing {len(shown_segments):,} highest-weight segments and the bundle plus "
+            f"the most important other features ({len(shown_features):,} columns)."
         )
-        .properties(height=250)
+    show_chart(
+        charts.bundle_heatmap,
+        long_df,
+        features=tuple(shown_features),
+        seg_names=tuple(shown_segments),
     )
-    st.altair_chart(heatmap, use_container_width=True)
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        st.markdown("##### Bundle (in pick order)")
+        st.dataframe(selected_df, hide_index=True, use_container_width=True)
+    with col2:
+        st.markdown("##### Coverage by segment")
+        st.dataframe(
+            segment_df.sort_values("Weight", ascending=False),
+            hide_index=True,
+            use_container_width=True,
+        )
+
 
 # =========================
-# 7. Roadmap
+# 8. Roadmap
 # =========================
-elif page == "Roadmap":
+def show_roadmap():
     st.subheader("Roadmap (MVP → V1 → V2)")
     st.caption("Timeline view of CHS platform evolution.")
 
-    roadmap_df = pd.DataFrame(
-        ROADMAP_DATA, columns=["Phase", "Quarter", "Area", "Item"]
-    )
-    st.markdown("#### Roadmap Items")
-    st.dataframe(roadmap_df, use_container_width=True)
-
-    # Map quarter to numeric for a simple Gantt-ish chart
-    quarter_order = ["Q1", "Q2", "Q3", "Q4"]
-    roadmap_df["QuarterIdx"] = roadmap_df["Quarter"].apply(
-        lambda q: quarter_order.index(q) + 1 if q in quarter_order else 1
+    rerun.mark("inputs")
+    roadmap_source = st.radio(
+        "Roadmap", ["Current", "Synthetic"], horizontal=True, key="roadmap_source"
     )
+    if roadmap_source == "Synthetic":
+        n_items = st.number_input("Items", 10, 20_000, 2_000, 500)
+        roadmap_df, teams_df = cached_synthetic_roadmap(int(n_items))
+    else:
+        roadmap_df = get_reference_table("roadmap")  # QuarterIdx precomputed at load
+        teams_df = get_reference_table("teams")
 
-    gantt = (
-        alt.Chart(roadmap_df)
-        .mark_bar()
-        .encode(
-            x=alt.X("QuarterIdx:Q", title="Quarter", scale=alt.Scale(domain=[1, 4])),
-            y=alt.Y("Item:N", title="Feature / Initiative"),
-            color=alt.Color("Phase:N", scale=alt.Scale(scheme="set2")),
-            tooltip=["Phase", "Quarter", "Area", "Item"],
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        plan_start = st.date_input("Plan start", value=default_plan_start())
+        st.caption("Items without a team run under their Area; unlisted teams get capacity 1.")
+    with col2:
+        teams_df = st.data_editor(
+            team_table(roadmap_df, teams_df),
+            column_config={
+                "Capacity": st.column_config.NumberColumn(
+                    "Parallel workstreams", min_value=1, step=1
+                )
+            },
+            disabled=["Team"],
+            hide_index=True,
+            use_container_width=True,
+            key=f"team_capacity_{roadmap_source}",
         )
-        .properties(height=350)
-    )
 
-    # Custom x-axis labels
-    text_labels = alt.Chart(
-        pd.DataFrame({"QuarterIdx": [1, 2, 3, 4], "QuarterLabel": ["Q1", "Q2", "Q3", "Q4"]})
-    ).mark_text(
-        dy=20  # offset
-    ).encode(
-        x="QuarterIdx:Q",
-        text="QuarterLabel:N"
-    )
+    rerun.mark("schedule")
+    try:
+        schedule_df = cached_schedule(roadmap_df, teams_df, plan_start)
+    except ValueError as exc:
+        st.error(f"Roadmap could not be scheduled: {exc}")
+        schedule_df = None
+
+    if schedule_df is not None:
+        finish = schedule_df["End_Date"].max()
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Scheduled finish", f"{finish:%Y-%m-%d}" if pd.notna(finish) else "–")
+        col2.metric("Critical-chain items", f"{int(schedule_df['Critical'].sum()):,}")
+        if "Late" in schedule_df.columns:
+            col3.metric("Past target quarter", f"{int(schedule_df['Late'].sum()):,}")
+
+        rerun.mark("gantt")
+        st.markdown("#### Schedule (critical chain outlined, target quarter end ticked)")
+        gantt_df = schedule_df
+        if len(gantt_df) > ROADMAP_CHART_ITEMS:
+            st.caption(
+                f"Showing the critical chain and the earliest-starting items "
+                f"({ROADMAP_CHART_ITEMS:,} of {len(schedule_df):,})."
+            )
+            gantt_df = schedule_df.sort_values(
+                ["Critical", "Start_Week"], ascending=[False, True]
+            ).head(ROADMAP_CHART_ITEMS)
+        show_chart(charts.roadmap_gantt, gantt_df.drop(columns=["QuarterIdx"], errors="ignore"))
+
+        st.markdown("#### Roadmap Items")
+        st.dataframe(
+            schedule_df.drop(columns=["QuarterIdx", "Start_Week", "End_Week"], errors="ignore")
+            .sort_values("Start_Date")
+            .head(EDITOR_MAX_ROWS),
+            hide_index=True,
+            use_container_width=True,
+        )
+        st.markdown("#### Team Load")
+        st.dataframe(schedule_summary(schedule_df), hide_index=True, use_container_width=True)
 
-    st.altair_chart(gantt + text_labels, use_container_width=True)
 
 # =========================
-# 8. Pricing Strategy
+# 9. Pricing Strategy
 # =========================
-elif page == "Pricing Strategy":
+def show_pricing_strategy():
     st.subheader("Pricing Strategy")
     st.caption("Sample tiers for Sandbox, Growth, and Enterprise customers.")
 
-    pricing_df = pd.DataFrame(
-        PRICING_DATA, columns=["Tier", "Price_USD_per_month", "Includes"]
-    )
+    rerun.mark("tiers")
+    pricing_df = get_reference_table("pricing")
 
     cols = st.columns(3)
     for col, (_, row) in zip(cols, pricing_df.iterrows()):
@@ -651,28 +1103,135 @@ elif page == "Pricing Strategy":
     st.markdown("#### Price Comparison")
     st.dataframe(pricing_df, use_container_width=True)
 
-    price_chart = (
-        alt.Chart(pricing_df)
-        .mark_bar()
-        .encode(
-            x=alt.X("Tier:N"),
-            y=alt.Y("Price_USD_per_month:Q", title="Price ($/month)"),
-            color=alt.Color("Tier:N", legend=None, scale=alt.Scale(scheme="greens")),
-            tooltip=["Tier", "Price_USD_per_month"],
+    show_chart(charts.price_bars, pricing_df)
+
+    rerun.mark("population")
+    st.markdown("#### Usage-based Simulator")
+    st.caption(
+        "Each account lands on the cheapest tier whose event quota and project limit "
+        "it fits (or that charges overage for the excess). Leave overage empty for a "
+        "hard quota."
+    )
+    pop_source = st.radio("Accounts", ["Synthetic", "Upload"], horizontal=True)
+    population = None
+    if pop_source == "Synthetic":
+        col1, col2, col3, col4, col5 = st.columns(5)
+        with col1:
+            n_accounts = st.number_input("Accounts", 1_000, 5_000_000, 1_000_000, 100_000)
+        with col2:
+            median_events = st.number_input("Median events/mo", 100, 10_000_000, 20_000, 5_000)
+        with col3:
+            events_sigma = st.slider("Event spread (log σ)", 0.5, 3.0, 2.0, 0.1)
+        with col4:
+            mean_projects = st.slider("Mean projects", 1.0, 10.0, 2.0, 0.5)
+        with col5:
+            pop_seed = st.number_input("Seed", 0, 2**31 - 1, 0)
+        population_key = (
+            int(n_accounts), float(median_events), events_sigma, mean_projects, int(pop_seed)
+        )
+        population = cached_population(*population_key)
+    else:
+        pop_file = st.file_uploader(
+            "Accounts file (Events_per_month, Projects)", type=["csv", "parquet"]
         )
-        .properties(height=300)
+        if pop_file is not None:
+            population_key = (pop_file.file_id, pop_file.name, pop_file.size)
+            try:
+                population = load_population(pop_file, name=pop_file.name)
+            except (ValueError, KeyError, OSError) as exc:
+                st.error(f"Accounts file could not be read: {exc}")
+
+    rerun.mark("tier editor")
+    tiers_df = st.data_editor(
+        editable_frame(tier_quotas(pricing_df).drop(columns=["Includes"]), "pricing"),
+        column_config={
+            "Price_USD_per_month": st.column_config.NumberColumn("Price ($/mo)", min_value=0),
+            "Event_Quota": st.column_config.NumberColumn("Events included"),
+            "Project_Limit": st.column_config.NumberColumn("Projects"),
+            "Overage_USD_per_1k": st.column_config.NumberColumn(
+                "Overage ($ / 1k events)", min_value=0.0
+            ),
+        },
+        hide_index=True,
+        use_container_width=True,
+        key="pricing_tiers",
     )
-    st.altair_chart(price_chart, use_container_width=True)
+    tiers_df = tiers_df.fillna({"Event_Quota": np.inf, "Project_Limit": np.inf})
+
+    rerun.mark("simulation")
+    if population is not None and len(population):
+        curve_tier = st.selectbox("Price curve for tier", tiers_df["Tier"].tolist(), index=1)
+        current_price = float(
+            tiers_df.loc[tiers_df["Tier"] == curve_tier, "Price_USD_per_month"].iloc[0]
+        )
+        mrr, unserved, mix, usage, curve = cached_pricing_sim(
+            population, population_key, tiers_df, curve_tier, max(3 * current_price, 100.0)
+        )
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Simulated MRR", f"${mrr:,.0f}")
+        col2.metric("ARPA", f"${mrr / len(population):,.2f}")
+        col3.metric("Accounts with no eligible tier", f"{unserved:,}")
+        st.dataframe(mix, use_container_width=True, hide_index=True)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown(f"**MRR vs {curve_tier} price**")
+            show_chart(charts.price_response_line, curve, current_price=current_price)
+        with col2:
+            st.markdown("**MRR by usage**")
+            show_chart(charts.usage_revenue_bars, usage)
+
 
 # =========================
-# 9. Developer Adoption Funnel
+# 10. Developer Adoption Funnel
 # =========================
-elif page == "Developer Adoption Funnel":
+def show_adoption_funnel():
     st.subheader("Developer Adoption Funnel")
     st.caption("Sample funnel from awareness → signup → activation → pilots → paid.")
 
-    funnel_df = pd.DataFrame(FUNNEL_DATA, columns=["Stage", "Count"])
+    rerun.mark("event log")
+    with st.expander("Build funnel from an event log (CSV / Parquet)"):
+        st.caption(
+            "Columns: user_id, event, timestamp. Events: "
+            + ", ".join(f"{event} → {label}" for event, label in DEFAULT_STAGES)
+            + ". Logs are streamed in chunks; memory grows with distinct users, not events."
+        )
+        uploaded = st.file_uploader("Event log", type=["csv", "parquet"])
+        server_path = st.text_input("…or a file path on the server (for very large logs)")
+        if st.button("Build funnel", disabled=uploaded is None and not server_path):
+            source = uploaded if uploaded is not None else server_path
+            name = uploaded.name if uploaded is not None else server_path
+            try:
+                with st.spinner("Aggregating events…"):
+                    st.session_state["funnel_index"] = build_funnel_index(source, name=name)
+            except (ValueError, KeyError, OSError) as exc:
+                st.error(f"Event log could not be read: {exc}")
+        if "funnel_index" in st.session_state:
+            index = st.session_state["funnel_index"]
+            st.caption(
+                f"{index.events_used:,} of {index.events_read:,} events used · "
+                f"{index.n_users:,} users · index {index.nbytes() / 2**20:.1f} MB"
+            )
+            if st.button("Back to sample counts"):
+                del st.session_state["funnel_index"]
+
+    if "funnel_index" in st.session_state:
+        window_days = st.number_input(
+            "Conversion window (days from a user's first event, 0 = unlimited)",
+            min_value=0,
+            value=0,
+            step=7,
+        )
+        funnel_df = st.session_state["funnel_index"].funnel_counts(window_days or None)
+    else:
+        funnel_df = market.table("funnel")
+        if funnel_df is None:
+            funnel_df = get_reference_table("funnel")
+        else:
+            st.caption("Counts from the market-data feeds.")
 
+    rerun.mark("funnel")
     col1, col2 = st.columns([2, 1])
     with col1:
         st.markdown("#### Funnel Stages (Editable)")
@@ -688,93 +1247,268 @@ elif page == "Developer Adoption Funnel":
     with col2:
         st.markdown("#### Conversion Rates")
         # compute conversion percentages
-        ef = editable_funnel.copy()
-        ef["PrevCount"] = ef["Count"].shift(1)
-        ef["Conversion_from_prev_%"] = (
-            ef["Count"] / ef["PrevCount"] * 100
-        ).replace([np.inf, -np.inf], np.nan).round(1)
+        ef = funnel_conversion(editable_funnel)
         st.dataframe(
             ef[["Stage", "Count", "Conversion_from_prev_%"]],
             use_container_width=True,
         )
 
     st.markdown("#### Funnel Chart")
-    funnel_chart = (
-        alt.Chart(editable_funnel)
-        .mark_bar()
-        .encode(
-            x=alt.X("Stage:N"),
-            y=alt.Y("Count:Q"),
-            color=alt.Color(
-                "Stage:N",
-                legend=None,
-                scale=alt.Scale(scheme="greens"),
-            ),
-            tooltip=["Stage", "Count"],
+    show_chart(charts.funnel_bars, editable_funnel)
+
+    rerun.mark("cohorts")
+    st.markdown("#### Signup Cohorts")
+    cohort_store = get_cohort_store()
+    with st.expander("Update cohorts from events"):
+        st.caption(
+            "Append a new batch (e.g. one day) of events — only the cohorts of the "
+            "users it mentions are recomputed — or rebuild everything from a full log."
+        )
+        cohort_file = st.file_uploader("Events", type=["csv", "parquet"], key="cohort_events")
+        cohort_path = st.text_input("…or a file path on the server", key="cohort_path")
+        cohort_mode = st.radio("Mode", ["Append", "Rebuild"], horizontal=True, key="cohort_mode")
+        if st.button("Update cohorts", disabled=cohort_file is None and not cohort_path):
+            source = cohort_file if cohort_file is not None else cohort_path
+            name = cohort_file.name if cohort_file is not None else cohort_path
+            start = time.perf_counter()
+            try:
+                with st.spinner("Updating cohorts…"):
+                    if cohort_mode == "Rebuild":
+                        changed = cohort_store.rebuild(source, name=name)
+                    else:
+                        changed = cohort_store.add_file(source, name=name)
+            except (ValueError, KeyError, OSError) as exc:
+                st.error(f"Events could not be read: {exc}")
+            else:
+                st.success(
+                    f"Updated {len(changed):,} daily cohorts in "
+                    f"{time.perf_counter() - start:.2f}s."
+                )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        cohort_period = st.radio(
+            "Cohort period", ["Week", "Month"], horizontal=True, key="cohort_period"
+        )
+    cohort_df = cohort_store.cohort_table(cohort_period.lower())
+    with col2:
+        cohort_stage = st.selectbox(
+            "Stage reached", [label for _, label in DEFAULT_STAGES[cohort_store.cohort_stage + 1:]]
+        )
+    if cohort_df.empty:
+        st.info("No cohort data yet — append or rebuild from an event log above.")
+    else:
+        show_chart(
+            charts.cohort_heatmap,
+            cohort_df[cohort_df["Stage"] == cohort_stage],
+            period_label=cohort_period,
+        )
+        latest = cohort_df.groupby(["Cohort", "Stage"], sort=False).last().reset_index()
+        st.dataframe(
+            latest.pivot(index="Cohort", columns="Stage", values="Conversion_%")[
+                [label for _, label in DEFAULT_STAGES[cohort_store.cohort_stage:]]
+            ],
+            use_container_width=True,
         )
-        .properties(height=300)
-    )
-    st.altair_chart(funnel_chart, use_container_width=True)
+
 
 # =========================
-# 10. Competitor Landscape
+# 11. Competitor Landscape
 # =========================
-elif page == "Competitor Landscape":
+def show_competitor_landscape():
     st.subheader("Competitor Landscape")
     st.caption("Position CHS vs hyperscalers and niche AI vendors.")
 
-    comp_df = pd.DataFrame(
-        COMPETITORS_DATA,
-        columns=[
-            "Vendor",
-            "Type",
-            "Breadth_1_5",
-            "Compliance_1_5",
-            "Explainability_1_5",
-        ],
+    rerun.mark("inputs")
+    market_comp = market.table("competitors")
+    comp_source = st.radio(
+        "Vendors",
+        ["Current", "Synthetic"] + (["Market feeds"] if market_comp is not None else []),
+        horizontal=True,
+        key="competitor_source",
     )
+    if comp_source == "Synthetic":
+        n_vendors = st.number_input("Vendors", 10, 200_000, 5_000, 1_000)
+        comp_df = cached_synthetic_competitors(int(n_vendors))
+    elif comp_source == "Market feeds":
+        comp_df = market_comp
+    else:
+        comp_df = get_reference_table("competitors")
 
-    st.markdown("#### Competitive Metrics")
-    st.dataframe(comp_df, use_container_width=True)
-
-    st.markdown("#### Visual: Breadth vs Explainability")
-    comp_chart = (
-        alt.Chart(comp_df)
-        .mark_circle(size=200)
-        .encode(
-            x=alt.X("Breadth_1_5:Q", title="Platform Breadth"),
-            y=alt.Y("Explainability_1_5:Q", title="Explainability Depth"),
-            color=alt.Color(
-                "Type:N",
-                scale=alt.Scale(scheme="set2"),
-                title="Vendor Type",
-            ),
-            tooltip=["Vendor", "Type", "Breadth_1_5", "Compliance_1_5", "Explainability_1_5"],
+    all_dims = score_columns(comp_df)
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        dims = st.multiselect(
+            "Dimensions (higher is better)", all_dims, default=all_dims,
+            key=f"competitor_dims_{comp_source}",
         )
-        .properties(height=350)
+    with col2:
+        reference = st.text_input("Reference vendor", "CentauriHS", key="competitor_reference")
+    if not (comp_df["Vendor"] == reference).any():
+        st.warning(f"{reference!r} is not in the vendor table; using {comp_df['Vendor'].iloc[0]!r}.")
+        reference = comp_df["Vendor"].iloc[0]
+
+    rerun.mark("dominance")
+    if not dims:
+        st.info("Pick at least one dimension to compute the frontier.")
+    else:
+        table = cached_dominance(comp_df, tuple(dims))
+        gap = reference_gap(table, dims, reference)
+        ref_row = table.loc[table["Vendor"] == reference].iloc[0]
+        col0, col1, col2, col3 = st.columns(4)
+        col0.metric("Vendors on the frontier", f"{int(table['On_Frontier'].sum()):,} of {len(table):,}")
+        col1.metric(f"{reference} on frontier", "Yes" if ref_row["On_Frontier"] else "No")
+        col2.metric(f"Vendors dominating {reference}", f"{int(ref_row['Dominated_By']):,}")
+        col3.metric("Score points to the frontier", f"{ref_row['Frontier_Gap']:g}")
+        if not ref_row["On_Frontier"]:
+            st.markdown(f"#### Gap to close: {reference} vs {ref_row['Closest_Frontier']}")
+            st.dataframe(gap, hide_index=True, use_container_width=True)
+
+        st.markdown("#### Competitive Metrics")
+        st.dataframe(
+            table.sort_values(
+                ["On_Frontier", "Dominates"], ascending=[False, False]
+            ).head(EDITOR_MAX_ROWS),
+            hide_index=True,
+            use_container_width=True,
+        )
+
+        rerun.mark("charts")
+        chart_df = table
+        if len(chart_df) > CHART_MAX_POINTS:
+            st.caption(
+                f"Charts show every frontier vendor and {reference} plus a random sample "
+                f"({CHART_MAX_POINTS:,} of {len(table):,} vendors)."
+            )
+            keep = chart_df["On_Frontier"] | (chart_df["Vendor"] == reference)
+            rest = chart_df[~keep]
+            chart_df = pd.concat(
+                [
+                    chart_df[keep],
+                    rest.sample(max(CHART_MAX_POINTS - int(keep.sum()), 0), random_state=0),
+                ]
+            )
+        st.markdown("#### Visual: Breadth vs Explainability")
+        show_chart(charts.competitor_breadth, chart_df)
+
+        st.markdown("#### Visual: Compliance vs Explainability (where CHS should win)")
+        show_chart(charts.competitor_compliance, chart_df)
+
+
+PAGE_VIEWS = {
+    "Segment Explorer": show_segment_explorer,
+    "Prioritization Canvas": show_prioritization_canvas,
+    "Scenarios": show_scenarios,
+    "Interview Planner": show_interview_planner,
+    "Hypothesis & Experiment Tracker": show_hypothesis_tracker,
+    "Platform Architecture Map": show_architecture_map,
+    "Feature Stack by Segment": show_feature_stack,
+    "Roadmap": show_roadmap,
+    "Pricing Strategy": show_pricing_strategy,
+    "Developer Adoption Funnel": show_adoption_funnel,
+    "Competitor Landscape": show_competitor_landscape,
+}
+
+try:
+    PAGE_VIEWS[page]()
+except BaseException:
+    # st.stop()/st.rerun() raise out of the page; the run is still recorded
+    rerun.interrupted = True
+    rerun.finish()
+    raise
+
+rerun.mark("sidebar")
+if st.sidebar.checkbox("Memory diagnostics"):
+    # Shared tables exist once per process; session state is what each extra
+    # browser session adds on top.
+    shared = {
+        "segments": workspace.segments.snapshot()[0],
+        "interviews": workspace.interviews.frame(),
+        "hypotheses": workspace.hypotheses.frame(),
+        **{name: get_reference_tables().get(name) for name in get_reference_tables().names()},
+    }
+    report = memory_report(shared)
+    st.sidebar.dataframe(
+        report.round({"MB": 4, "MB_default_dtypes": 4}), hide_index=True, use_container_width=True
+    )
+    session_bytes = {key: object_nbytes(value) for key, value in st.session_state.items()}
+    st.sidebar.caption(
+        f"Shared tables: {report['MB'].sum() * 1024:,.1f} KB "
+        f"(default dtypes: {report['MB_default_dtypes'].sum() * 1024:,.1f} KB). "
+        f"This session: {sum(session_bytes.values()) / 2**10:,.1f} KB "
+        f"in {len(session_bytes)} session-state entries."
+    )
+    largest = sorted(session_bytes.items(), key=lambda kv: -kv[1])[:5]
+    if largest:
+        st.sidebar.caption(
+            "Largest: " + ", ".join(f"{k} ({v / 2**10:,.1f} KB)" for k, v in largest)
+        )
+
+if market.sources:
+    with st.sidebar.expander("Market data"):
+        if st.button("Refresh now", disabled=market.refreshing):
+            market.refresh(force=True)
+        if market.refreshing:
+            st.caption("Refreshing in the background…")
+        elif market.last_refresh_s is not None:
+            st.caption(f"Last refresh: {market.last_refresh_s:.2f}s for the due sources.")
+        st.dataframe(market.status(), hide_index=True, use_container_width=True)
+
+chart_stats = get_chart_cache().stats()
+st.sidebar.caption(
+    f"Chart cache: {chart_stats['hits']} hits / {chart_stats['misses']} misses "
+    f"({chart_stats['entries']} specs)"
+)
+
+# Everything above is timed; the panel below reports on it
+rerun.finish()
+if st.sidebar.checkbox("Profiling"):
+    track = st.sidebar.checkbox(
+        "Track allocations (slows every session while on)",
+        value=profiler.tracking_allocations,
+    )
+    if track != profiler.tracking_allocations:
+        profiler.track_allocations(track)
+    page_runs = profiler.runs(page)
+    n_interrupted = sum(r.interrupted for r in page_runs)
+    st.sidebar.caption(
+        f"This rerun: {rerun.total * 1000:,.0f} ms · {len(page_runs)} runs of "
+        f"this page in history (all sessions, {n_interrupted} cut short by st.stop/st.rerun)"
+    )
+    if profiler.tracking_allocations:
+        st.sidebar.caption(
+            "Alloc columns are process-wide tracemalloc peaks; they are left blank "
+            "for reruns that overlapped another session's rerun."
+        )
+    st.sidebar.dataframe(profiler.stats(page), hide_index=True, use_container_width=True)
+    with st.sidebar.expander("This rerun's stages"):
+        st.dataframe(rerun.to_frame(), hide_index=True, use_container_width=True)
+    export_scope = st.sidebar.radio(
+        "Export", ["This page", "All pages"], horizontal=True, key="profile_export_scope"
+    )
+    export_page = page if export_scope == "This page" else None
+    col1, col2 = st.sidebar.columns(2)
+    col1.download_button(
+        "JSON",
+        profiler.to_json(export_page),
+        file_name="chs_profile.json",
+        mime="application/json",
     )
-    st.altair_chart(comp_chart, use_container_width=True)
-
-    st.markdown("#### Visual: Compliance vs Explainability (where CHS should win)")
-    comp_chart2 = (
-        alt.Chart(comp_df)
-        .mark_circle(size=200)
-        .encode(
-            x=alt.X("Compliance_1_5:Q", title="Compliance Strength"),
-            y=alt.Y("Explainability_1_5:Q", title="Explainability Depth"),
-            color=alt.Color("Vendor:N", legend=None),
-            tooltip=["Vendor", "Compliance_1_5", "Explainability_1_5"],
-        )
-        .properties(height=350)
+    col2.download_button(
+        "Chrome trace",
+        profiler.to_chrome_trace(export_page),
+        file_name="chs_trace.json",
+        mime="application/json",
     )
-    st.altair_chart(comp_chart2, use_container_width=True)
+    if st.sidebar.button("Clear history"):
+        profiler.clear()
 
 # --- Footer ---
 st.markdown(
     f"""
     <hr/>
     <div style="color:{DARK_GREY}; font-size:11px; margin-top:4px;">
-        Prototype only – data not persisted between runs. Use as an internal tool for CHS strategy & validation.
+        Prototype only – interview and hypothesis backlogs are saved to a local SQLite file; segment edits are not persisted between runs. Use as an internal tool for CHS strategy & validation.
     </div>
     """,
     unsafe_allow_html=True,
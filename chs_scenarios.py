@@ -0,0 +1,298 @@
+# chs_scenarios.py
+# Centauri Health Solutions – named what-if scenarios of the segment table
+#
+# A scenario is a manifest: an index block plus, per column, the key of a
+# stored block. Keys are content hashes (dtype and values), so a column that
+# is the same in several scenarios is stored once. A column that differs from
+# the scenario it was derived from in only a few rows is stored as a patch:
+# its parent's full block plus the changed positions and their new values.
+# Storage therefore grows with the edits, not with the number of scenarios.
+# Frames are assembled from the blocks without copying the unchanged columns
+# and kept in a small LRU, and diffs skip every column whose keys match.
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from chs_schema import changed_cells
+
+# A changed column is patched while at most this share of its rows differ
+PATCH_MAX_FRACTION = 0.25
+
+SCENARIO_COLUMNS = ["Scenario", "Parent", "Rows", "Changed_Columns", "Own_KB", "Saved"]
+
+
+def _series_key(s):
+    h = hashlib.sha1(str(s.dtype).encode())
+    h.update(pd.util.hash_pandas_object(s, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _index_key(index):
+    h = hashlib.sha1(b"index:" + str(index.dtype).encode())
+    h.update(pd.util.hash_pandas_object(index).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+class _Patch:
+    __slots__ = ("base", "positions", "values")
+
+    def __init__(self, base, positions, values):
+        self.base = base  # key of a full block
+        self.positions = positions
+        self.values = values
+
+
+def _block_nbytes(block):
+    if isinstance(block, _Patch):
+        return block.positions.nbytes + int(block.values.memory_usage(deep=True, index=False))
+    return int(block.memory_usage(deep=True, index=False))
+
+
+class Scenario:
+    def __init__(self, name, parent, index_key, columns, saved):
+        self.name = name
+        self.parent = parent
+        self.index_key = index_key
+        self.columns = columns  # ((column, block key), ...)
+        self.saved = saved
+
+    @property
+    def manifest(self):
+        return (self.index_key, self.columns)
+
+
+class ScenarioDiff:
+    def __init__(self, cells, ranks, columns, added, removed):
+        self.cells = cells  # one row per changed cell
+        self.ranks = ranks  # rows whose rank moved
+        self.columns = columns  # changed column -> changed cell count
+        self.added = added  # index labels only in the second scenario
+        self.removed = removed
+
+    @property
+    def rows_changed(self):
+        return int(self.cells["Row"].nunique()) if len(self.cells) else 0
+
+
+class ScenarioStore:
+    def __init__(self, max_frames=8):
+        self._lock = threading.Lock()
+        self._blocks = {}  # key -> Series (RangeIndex) or _Patch
+        self._indexes = {}  # key -> Index
+        self._scenarios = OrderedDict()  # name -> Scenario
+        self._frames = OrderedDict()  # manifest -> assembled DataFrame
+        self._max_frames = max_frames
+
+    def names(self):
+        with self._lock:
+            return list(self._scenarios)
+
+    def __contains__(self, name):
+        return name in self._scenarios
+
+    def get(self, name):
+        return self._scenarios[name]
+
+    # --- Writing ---
+
+    def save(self, name, df, parent=None):
+        # Stores df as scenario `name` (replacing any scenario of that name);
+        # columns that changed sparsely relative to `parent` become patches
+        with self._lock:
+            base = self._scenarios.get(parent)
+            index_key = _index_key(df.index)
+            self._indexes.setdefault(index_key, df.index)
+            base_columns = dict(base.columns) if base and base.index_key == index_key else {}
+            columns = []
+            for column in df.columns:
+                s = df[column].reset_index(drop=True).rename(None)
+                key = _series_key(s)
+                if key not in self._blocks:
+                    patch = None
+                    if column in base_columns:
+                        patch = self._make_patch(base_columns[column], s)
+                    self._blocks[key] = s if patch is None else patch
+                columns.append((column, key))
+            self._scenarios[name] = Scenario(name, parent, index_key, tuple(columns), time.time())
+            self._collect()
+            return self._scenarios[name]
+
+    def delete(self, name):
+        with self._lock:
+            self._scenarios.pop(name, None)
+            # Children keep their content; they just lose the parent link
+            for scenario in self._scenarios.values():
+                if scenario.parent == name:
+                    scenario.parent = None
+            self._collect()
+
+    def _root(self, key):
+        block = self._blocks[key]
+        return block.base if isinstance(block, _Patch) else key
+
+    def _make_patch(self, base_key, s):
+        base_key = self._root(base_key)
+        base = self._blocks[base_key]
+        if len(base) != len(s) or base.dtype != s.dtype:
+            return None
+        positions = np.flatnonzero(changed_cells(base, s).to_numpy())
+        if len(positions) > PATCH_MAX_FRACTION * len(s):
+            return None
+        patch = _Patch(base_key, positions, s.iloc[positions].reset_index(drop=True))
+        try:
+            self._apply(patch)
+        except (TypeError, ValueError):
+            # e.g. a value outside a categorical's categories
+            return None
+        return patch
+
+    def _apply(self, patch):
+        column = self._blocks[patch.base].copy()
+        column.iloc[patch.positions] = patch.values.to_numpy()
+        return column
+
+    def _collect(self):
+        # Drops blocks, indexes and cached frames no scenario refers to
+        live = {key for s in self._scenarios.values() for _, key in s.columns}
+        live |= {self._blocks[key].base for key in live if isinstance(self._blocks[key], _Patch)}
+        for key in [k for k in self._blocks if k not in live]:
+            del self._blocks[key]
+        indexes = {s.index_key for s in self._scenarios.values()}
+        for key in [k for k in self._indexes if k not in indexes]:
+            del self._indexes[key]
+        manifests = {s.manifest for s in self._scenarios.values()}
+        for manifest in [m for m in self._frames if m not in manifests]:
+            del self._frames[manifest]
+
+    # --- Reading ---
+
+    def _column(self, key):
+        block = self._blocks[key]
+        return self._apply(block) if isinstance(block, _Patch) else block
+
+    def frame(self, name):
+        # Shallow copy of the assembled scenario; unchanged columns share
+        # memory with the stored blocks and with every other scenario
+        with self._lock:
+            scenario = self._scenarios[name]
+            df = self._frames.get(scenario.manifest)
+            if df is None:
+                df = pd.DataFrame(
+                    {column: self._column(key) for column, key in scenario.columns}, copy=False
+                )
+                df.index = self._indexes[scenario.index_key]
+                self._frames[scenario.manifest] = df
+                while len(self._frames) > self._max_frames:
+                    self._frames.popitem(last=False)
+            else:
+                self._frames.move_to_end(scenario.manifest)
+            return df.copy(deep=False)
+
+    def stored_bytes(self):
+        with self._lock:
+            return sum(_block_nbytes(b) for b in self._blocks.values())
+
+    def full_copy_bytes(self):
+        # What the scenarios would take as independent full tables
+        with self._lock:
+            return sum(
+                int(self._blocks[self._root(key)].memory_usage(deep=True, index=False))
+                for s in self._scenarios.values()
+                for _, key in s.columns
+            )
+
+    def summary(self):
+        with self._lock:
+            refs = {}
+            for s in self._scenarios.values():
+                for _, key in s.columns:
+                    refs[key] = refs.get(key, 0) + 1
+            rows = []
+            for s in self._scenarios.values():
+                parent = self._scenarios.get(s.parent)
+                changed = (
+                    sum(1 for pair in s.columns if pair not in parent.columns) if parent else None
+                )
+                own = sum(_block_nbytes(self._blocks[k]) for _, k in s.columns if refs[k] == 1)
+                rows.append(
+                    (s.name, s.parent, len(self._indexes[s.index_key]), changed,
+                     round(own / 1024, 1), pd.Timestamp(s.saved, unit="s").floor("s"))
+                )
+        return pd.DataFrame(rows, columns=SCENARIO_COLUMNS).astype({"Changed_Columns": "Int64"})
+
+    # --- Diffing ---
+
+    def _candidates(self, key_a, key_b):
+        # Positions that can differ between two blocks over the same root,
+        # or None when they have to be compared in full
+        a, b = self._blocks[key_a], self._blocks[key_b]
+        if self._root(key_a) != self._root(key_b):
+            return None
+        positions = [p.positions for p in (a, b) if isinstance(p, _Patch)]
+        return np.union1d(*positions) if len(positions) == 2 else positions[0]
+
+    def diff(self, name_a, name_b, label_column="Segment", rank_column="Priority_Score"):
+        a, b = self._scenarios[name_a], self._scenarios[name_b]
+        fa, fb = self.frame(name_a), self.frame(name_b)
+        same_index = a.index_key == b.index_key
+        common = fa.index if same_index else fa.index.intersection(fb.index)
+        keys_b = dict(b.columns)
+        parts, counts = [], {}
+        for column, key_a in a.columns:
+            key_b = keys_b.get(column)
+            if key_b is None or (key_a == key_b and same_index):
+                continue
+            candidates = self._candidates(key_a, key_b) if same_index else None
+            if candidates is None:
+                before, after = fa[column].reindex(common), fb[column].reindex(common)
+            else:
+                before, after = fa[column].iloc[candidates], fb[column].iloc[candidates]
+            changed = changed_cells(before, after).to_numpy()
+            if not changed.any():
+                continue
+            counts[column] = int(changed.sum())
+            rows = before.index[changed]
+            parts.append(
+                pd.DataFrame(
+                    {
+                        "Row": rows,
+                        "Column": column,
+                        "Before": before[changed].astype(object).to_numpy(),
+                        "After": after[changed].astype(object).to_numpy(),
+                    }
+                )
+            )
+        cells = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(
+            columns=["Row", "Column", "Before", "After"]
+        )
+        if label_column in fb.columns and len(cells):
+            cells.insert(1, label_column, fb[label_column].reindex(cells["Row"]).to_numpy())
+
+        ranks = pd.DataFrame()
+        if rank_column in fa.columns and rank_column in fb.columns:
+            rank_a = fa[rank_column].rank(ascending=False, method="min").reindex(common)
+            rank_b = fb[rank_column].rank(ascending=False, method="min").reindex(common)
+            moved = (rank_a.notna() & rank_b.notna() & (rank_a != rank_b)).to_numpy()
+            ranks = pd.DataFrame(
+                {
+                    "Row": common[moved],
+                    f"Rank_{name_a}": rank_a[moved].astype(int).to_numpy(),
+                    f"Rank_{name_b}": rank_b[moved].astype(int).to_numpy(),
+                    "Moved_Up": (rank_a - rank_b)[moved].astype(int).to_numpy(),
+                }
+            )
+            if label_column in fb.columns:
+                ranks.insert(1, label_column, fb[label_column].reindex(ranks["Row"]).to_numpy())
+            ranks = ranks.sort_values("Moved_Up", key=np.abs, ascending=False, kind="stable")
+        return ScenarioDiff(
+            cells,
+            ranks.reset_index(drop=True),
+            counts,
+            fb.index.difference(fa.index),
+            fa.index.difference(fb.index),
+        )
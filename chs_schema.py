@@ -0,0 +1,180 @@
+# chs_schema.py
+# Centauri Health Solutions – compact dtypes for the app's tables
+#
+# Names, statuses, layers and phases repeat a handful of strings, so they are
+# stored as categoricals (names go to the editors as plain text, see
+# editable_frame); 1–5 scores fit in int8 (nullable Int8 for backlog rows read
+# back from SQLite). TAM stays float64 so Priority_Score is computed from
+# exactly the same values as before.
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+INTERVIEW_STATUSES = ["Planned", "Invited", "Scheduled", "Completed"]
+
+TABLE_SCHEMAS = {
+    "segments": {
+        "Segment": "category",
+        "Short Name": "category",
+        "Adoption_Speed_1_5": "int8",
+        "Compliance_Burden_1_5": "int8",
+        "CHS_Fit_1_5": "int8",
+    },
+    "interviews": {
+        "Segment": "category",
+        "Persona": "category",
+        "Company Type": "category",
+        "Priority_1_5": "Int8",
+        "Status": pd.CategoricalDtype(INTERVIEW_STATUSES),
+    },
+    "hypotheses": {
+        "Segment": "category",
+        "Impact_1_5": "Int8",
+        "Confidence_1_5": "Int8",
+        "Effort_1_5": "Int8",
+    },
+    "architecture": {"Layer": "category", "Status": "category"},
+    "roadmap": {
+        "Phase": "category",
+        "Quarter": "category",
+        "Area": "category",
+        "Team": "category",
+        "Effort_Weeks": "float32",
+    },
+    "pricing": {"Tier": "category", "Price_USD_per_month": "int32"},
+    "competitors": {
+        "Type": "category",
+        "Breadth_1_5": "int8",
+        "Compliance_1_5": "int8",
+        "Explainability_1_5": "int8",
+    },
+}
+
+
+# Categorical columns people type into (names rather than picked values);
+# st.data_editor shows a categorical as a fixed-choice selectbox
+FREE_TEXT_COLUMNS = {
+    "segments": ["Segment", "Short Name"],
+    "pricing": ["Tier"],
+}
+
+
+def editable_frame(df, table):
+    # df with its free-text categoricals as strings, for st.data_editor;
+    # apply_schema turns them back into categoricals
+    columns = [
+        c for c in FREE_TEXT_COLUMNS.get(table, [])
+        if c in df.columns and isinstance(df[c].dtype, pd.CategoricalDtype)
+    ]
+    if not columns:
+        return df
+    return df.astype({c: df[c].cat.categories.dtype for c in columns})
+
+
+def apply_schema(df, table):
+    # Casts the columns listed for `table` that are present; other columns
+    # are left alone
+    dtypes = {
+        c: t for c, t in TABLE_SCHEMAS.get(table, {}).items()
+        if c in df.columns and str(df[c].dtype) != str(t)
+    }
+    if not dtypes:
+        return df
+    out = df.copy(deep=False)
+    for column, dtype in dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            # Values outside a fixed category list would silently become NaN
+            extra = set(out[column].dropna().unique()) - set(dtype.categories)
+            if extra:
+                dtype = pd.CategoricalDtype(list(dtype.categories) + sorted(map(str, extra)))
+        out[column] = out[column].astype(dtype)
+    return out
+
+
+def _by_value(values):
+    # Categoricals only compare against identical categories; as plain values
+    # they compare with anything
+    if isinstance(values, pd.DataFrame):
+        columns = [c for c in values.columns if isinstance(values[c].dtype, pd.CategoricalDtype)]
+        return values.astype({c: object for c in columns}) if columns else values
+    return values.astype(object) if isinstance(values.dtype, pd.CategoricalDtype) else values
+
+
+def changed_cells(before, after):
+    # Mask of the cells of two identically labelled Series/DataFrames that
+    # differ; missing on both sides counts as unchanged, on one side as changed
+    before, after = _by_value(before), _by_value(after)
+    same = (before == after).fillna(False) | (before.isna() & after.isna())
+    return ~same.astype(bool)
+
+
+def concat_compact(frames):
+    # pd.concat that keeps categorical columns categorical: categories are
+    # unioned first, since concat falls back to object/str when they differ
+    frames = [f for f in frames if len(f)]
+    if len(frames) < 2:
+        return frames[0] if frames else pd.DataFrame()
+    frames = [f.copy(deep=False) for f in frames]
+    for column in frames[0].columns:
+        if not isinstance(frames[0][column].dtype, pd.CategoricalDtype):
+            continue
+        if not all(isinstance(f[column].dtype, pd.CategoricalDtype) for f in frames):
+            continue
+        categories = frames[0][column].cat.categories
+        for f in frames[1:]:
+            categories = categories.append(f[column].cat.categories.difference(categories))
+        ordered = frames[0][column].cat.ordered
+        for f in frames:
+            if not f[column].cat.categories.equals(categories):
+                f[column] = f[column].cat.set_categories(categories, ordered=ordered)
+    return pd.concat(frames)
+
+
+def default_dtypes(df):
+    # The same table with the dtypes pandas infers by default, for comparison
+    out = {}
+    for column in df.columns:
+        values = df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype(values.cat.categories.dtype)
+        elif pd.api.types.is_integer_dtype(values.dtype):
+            values = values.astype("float64" if values.isna().any() else "int64")
+        elif pd.api.types.is_float_dtype(values.dtype):
+            values = values.astype("float64")
+        out[column] = values
+    return pd.DataFrame(out, index=df.index)
+
+
+def object_nbytes(value):
+    # Best-effort deep size of a value held in session state
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if hasattr(value, "nbytes"):
+        nbytes = value.nbytes
+        return int(nbytes() if callable(nbytes) else nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(object_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(object_nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def memory_report(tables):
+    # tables: {name: DataFrame}; deep memory as stored vs with default dtypes
+    rows = []
+    for name, df in tables.items():
+        compact = int(df.memory_usage(deep=True).sum())
+        default = int(default_dtypes(df).memory_usage(deep=True).sum())
+        rows.append((name, len(df), compact / 2**20, default / 2**20))
+    report = pd.DataFrame(rows, columns=["Table", "Rows", "MB", "MB_default_dtypes"])
+    report["Saved_%"] = (
+        (1 - report["MB"] / report["MB_default_dtypes"].where(report["MB_default_dtypes"] > 0))
+        * 100
+    ).round(1)
+    return report
@@ -0,0 +1,337 @@
+# chs_search.py
+# Centauri Health Solutions – full-text search and near-duplicate detection
+# over the backlogs
+#
+# TextIndex is a backlog rollup (see BacklogStore.attach_rollup): it is seeded
+# with the whole view once and then fed only appended and edited rows. Rows
+# are only queued when they arrive and indexed on the next search or
+# duplicate check (or by warm(), e.g. from a background thread), so opening
+# a large backlog does not wait for its index.
+#
+# Search is an inverted index over the text fields: token -> (row slot, term
+# count) postings, ranked with BM25. Tokens are lower-case words with English
+# stopwords dropped and a plural "s" stripped. A query only touches the
+# postings of its own tokens.
+#
+# Near-duplicates use MinHash signatures of the words and word pairs of one
+# field, split into LSH bands. Rows sharing a whole band with the new text
+# are the candidates, and their similarity is the share of signature values
+# they agree on (an estimate of Jaccard similarity). Band matching is one
+# vectorized comparison over the band keys, which stays in the milliseconds
+# at 100k rows.
+#
+# An edit that changes a row's text retires the row's slot and indexes the
+# new text in a fresh one, so updates never rewrite postings.
+
+import re
+import threading
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+INTERVIEW_TEXT_FIELDS = ["Key_Question", "Persona", "Company Type"]
+HYPOTHESIS_TEXT_FIELDS = ["Hypothesis", "Metric_to_Move", "Next_Experiment"]
+
+NUM_PERM = 64
+LSH_BANDS = 32  # of NUM_PERM // LSH_BANDS values each
+DUPLICATE_THRESHOLD = 0.6
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+STOPWORDS = frozenset(
+    """a about above after again against all am an and any are as at be because been
+    before being below between both but by can could did do does doing down during each
+    few for from further had has have having he her here hers him his how i if in into is
+    it its itself just me more most my no nor not now of off on once only or other our
+    ours out over own same she should so some such than that the their theirs them then
+    there these they this those through to too under until up very was we were what when
+    where which while who whom why will with would you your yours""".split()
+)
+
+_EMPTY = np.iinfo(np.uint32).max
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+class _Column:
+    # Append-only NumPy array with amortized O(1) growth. Growing swaps in a
+    # new array, so views handed out earlier stay valid.
+    __slots__ = ("data", "size")
+
+    def __init__(self, dtype, width=None):
+        self.data = np.empty((0,) if width is None else (0, width), dtype=dtype)
+        self.size = 0
+
+    def extend(self, values):
+        need = self.size + len(values)
+        if need > len(self.data):
+            grown = np.empty((max(need, 2 * len(self.data), 8),) + self.data.shape[1:], self.data.dtype)
+            grown[: self.size] = self.data[: self.size]
+            self.data = grown
+        self.data[self.size : need] = values
+        self.size = need
+
+    def view(self):
+        return self.data[: self.size]
+
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _stem(word):
+    return word[:-1] if len(word) > 4 and word.endswith("s") and not word.endswith("ss") else word
+
+
+def terms(text):
+    # One text -> its index terms in reading order
+    return [_stem(w) for w in _WORD.findall(str(text).lower()) if w not in STOPWORDS]
+
+
+def tokenize(texts):
+    # Sequence of texts -> Series of terms indexed by the text's position, in
+    # reading order. Repeated texts are only analyzed once.
+    codes, uniques = pd.factorize(pd.Series(texts, dtype=object).fillna("").astype(str))
+    words = [_WORD.findall(t.lower()) for t in uniques]
+    word_codes, distinct = pd.factorize(np.array(list(chain.from_iterable(words)), dtype=object))
+    stems = np.array([None if w in STOPWORDS else _stem(w) for w in distinct], dtype=object)
+    flat = stems[word_codes]
+    keep = pd.notna(flat)
+    text_of = np.repeat(np.arange(len(uniques)), [len(w) for w in words])[keep]
+    flat = flat[keep]
+    n_terms = np.bincount(text_of, minlength=len(uniques))
+    per_row = n_terms[codes]
+    starts = np.cumsum(n_terms) - n_terms
+    row_starts = np.cumsum(per_row) - per_row
+    take = np.repeat(starts[codes] - row_starts, per_row) + np.arange(per_row.sum())
+    return pd.Series(flat[take], index=np.repeat(np.arange(len(codes)), per_row), dtype=object)
+
+
+def _shingles(doc, tid):
+    # Words and adjacent word pairs as uint64 values: (doc positions, values)
+    tid = tid.astype(np.uint64)
+    pair = doc[1:] == doc[:-1]
+    pairs = ((tid[:-1][pair] * _GOLDEN) ^ tid[1:][pair]) * np.uint64(2) + np.uint64(1)
+    doc = np.concatenate([doc, doc[1:][pair]])
+    values = np.concatenate([tid * np.uint64(2), pairs])
+    order = np.argsort(doc, kind="stable")
+    return doc[order], values[order]
+
+
+class TextIndex:
+    def __init__(self, fields, duplicate_field=None, num_perm=NUM_PERM, bands=LSH_BANDS, seed=0):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.fields = list(fields)
+        self.duplicate_field = duplicate_field
+        self.bands = bands
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hash family: h(x) = (a x + b) >> 32 with odd a
+        self._hash_a = rng.integers(0, 2**63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._hash_b = rng.integers(0, 2**63, num_perm, dtype=np.uint64)
+        self._lock = threading.Lock()  # held while indexing or querying
+        self._pending_lock = threading.Lock()  # only guards the queue
+        self._pending = []
+        self.reset()
+
+    def reset(self):
+        with self._pending_lock:
+            self._pending = []
+        self._vocab = {}  # token -> id
+        self._postings = []  # id -> _Column of (slot, term count)
+        self._slot_rowid = _Column(np.int64)
+        self._slot_len = _Column(np.float32)
+        self._alive = _Column(bool)
+        self._slots = {}  # rowid -> live slot
+        self._n_alive = 0
+        self._total_len = 0.0
+        self._signatures = _Column(np.uint32, len(self._hash_a))
+        self._band_keys = [_Column(np.uint64) for _ in range(self.bands)]  # per band, for contiguous scans
+        self._has_text = _Column(bool)
+
+    def __len__(self):
+        with self._lock:
+            self._catch_up()
+            return self._n_alive
+
+    # --- Indexing ---
+
+    def _token_ids(self, tokens, add):
+        # Vocabulary ids of the tokens; unknown tokens are added (add=True) or
+        # dropped
+        codes, uniques = pd.factorize(tokens)
+        ids = np.array([self._vocab.get(t, -1) for t in uniques], dtype=np.int64)
+        if add:
+            for k in np.flatnonzero(ids < 0):
+                ids[k] = self._vocab[uniques[k]] = len(self._postings)
+                self._postings.append(_Column(np.int32, 2))
+        ids = pd.Series(ids[codes], index=tokens.index)
+        return ids if add else ids[ids >= 0]
+
+    def _signature(self, doc, tid, n_docs):
+        # MinHash of each document's shingles; rows without any stay _EMPTY
+        sig = np.full((n_docs, len(self._hash_a)), _EMPTY, dtype=np.uint32)
+        if len(doc):
+            doc, values = _shingles(doc, tid)
+            starts = np.flatnonzero(np.r_[True, doc[1:] != doc[:-1]])
+            h = np.empty_like(values)
+            for k, (a, b) in enumerate(zip(self._hash_a, self._hash_b)):
+                np.multiply(values, a, out=h)
+                h += b
+                h >>= np.uint64(32)
+                sig[doc[starts], k] = np.minimum.reduceat(h, starts)
+        return sig
+
+    def _band_key(self, sig):
+        rows = sig.reshape(len(sig), self.bands, -1).astype(np.uint64)
+        key = rows[:, :, 0]
+        for r in range(1, rows.shape[2]):
+            key = key * _GOLDEN ^ rows[:, :, r]
+        return key
+
+    def add_frame(self, df):
+        if df.empty:
+            return
+        with self._pending_lock:
+            self._pending.append(df)
+
+    def warm(self):
+        # Indexes everything queued so far
+        with self._lock:
+            self._catch_up()
+
+    def _catch_up(self):
+        # Caller holds self._lock; rows queued meanwhile are picked up too
+        while True:
+            with self._pending_lock:
+                pending, self._pending = self._pending, []
+            if not pending:
+                return
+            for df in pending:
+                self._add(df.index.to_numpy(dtype=np.int64), df)
+
+    def _add(self, rowids, df):
+        n = len(rowids)
+        start = self._slot_rowid.size
+        doc_parts, tid_parts, by_field = [], [], {}
+        for field in self.fields:
+            if field in df.columns:
+                tid = by_field[field] = self._token_ids(tokenize(df[field]), add=True)
+                doc_parts.append(tid.index.to_numpy(dtype=np.int64))
+                tid_parts.append(tid.to_numpy())
+        doc = np.concatenate(doc_parts) if doc_parts else np.empty(0, np.int64)
+        tid = np.concatenate(tid_parts) if tid_parts else np.empty(0, np.int64)
+
+        # Postings: one (slot, count) entry per distinct token of each row
+        lengths = np.bincount(doc, minlength=n).astype(np.float32)
+        pairs, counts = np.unique(tid * max(n, 1) + doc, return_counts=True)
+        tids, slots = np.divmod(pairs, max(n, 1))
+        slots += start
+        bounds = np.flatnonzero(np.r_[True, tids[1:] != tids[:-1], True]) if len(tids) else []
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            self._postings[tids[lo]].extend(np.column_stack([slots[lo:hi], counts[lo:hi]]))
+
+        for rowid in [r for r in rowids.tolist() if r in self._slots]:
+            self._retire(rowid)
+        self._slot_rowid.extend(rowids)
+        self._slot_len.extend(lengths)
+        self._alive.extend(np.ones(n, dtype=bool))
+        self._slots.update(zip(rowids.tolist(), range(start, start + n)))
+        self._n_alive += n
+        self._total_len += float(lengths.sum())
+
+        if self.duplicate_field is not None:
+            if self.duplicate_field in df.columns:
+                tid = by_field.get(self.duplicate_field)
+                if tid is None:
+                    tid = self._token_ids(tokenize(df[self.duplicate_field]), add=True)
+                sig = self._signature(tid.index.to_numpy(dtype=np.int64), tid.to_numpy(), n)
+            else:
+                sig = np.full((n, len(self._hash_a)), _EMPTY, dtype=np.uint32)
+            self._signatures.extend(sig)
+            for column, keys in zip(self._band_keys, self._band_key(sig).T):
+                column.extend(keys)
+            self._has_text.extend(sig[:, 0] != _EMPTY)
+
+    def _retire(self, rowid):
+        slot = self._slots.pop(rowid)
+        self._alive.data[slot] = False
+        self._n_alive -= 1
+        self._total_len -= float(self._slot_len.data[slot])
+
+    def update_row(self, old_row, new_row, rowid=None):
+        fields = self.fields + ([self.duplicate_field] if self.duplicate_field else [])
+        if all(old_row.get(f) == new_row.get(f) for f in fields):
+            return
+        with self._pending_lock:
+            self._pending.append(pd.DataFrame([new_row], index=pd.Index([rowid], name="ID")))
+
+    # --- Querying ---
+
+    def search(self, query, limit=None):
+        # BM25 score per matching row (Series indexed by ID, best first)
+        with self._lock:
+            self._catch_up()
+            tids = np.unique([self._vocab[t] for t in terms(query) if t in self._vocab])
+            if not len(tids) or not self._n_alive:
+                return pd.Series(dtype=float, index=pd.Index([], dtype=np.int64, name="ID"), name="Score")
+            alive = self._alive.view()
+            lengths = self._slot_len.view()
+            rowids = self._slot_rowid.view()
+            avg_len = max(self._total_len / self._n_alive, 1.0)
+            slot_parts, score_parts = [], []
+            for t in tids:
+                postings = self._postings[t].view()
+                postings = postings[alive[postings[:, 0]]]
+                if not len(postings):
+                    continue
+                slots, tf = postings[:, 0], postings[:, 1].astype(float)
+                idf = np.log1p((self._n_alive - len(slots) + 0.5) / (len(slots) + 0.5))
+                norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * lengths[slots] / avg_len)
+                slot_parts.append(slots)
+                score_parts.append(idf * tf * (BM25_K1 + 1) / norm)
+        if not slot_parts:
+            return pd.Series(dtype=float, index=pd.Index([], dtype=np.int64, name="ID"), name="Score")
+        slots = np.concatenate(slot_parts)
+        scores = np.concatenate(score_parts)
+        if len(slot_parts) > 1:
+            slots, inverse = np.unique(slots, return_inverse=True)
+            scores = np.bincount(inverse, weights=scores)
+        order = np.argsort(-scores, kind="stable")
+        if limit is not None:
+            order = order[:limit]
+        return pd.Series(
+            scores[order], index=pd.Index(rowids[slots[order]], name="ID"), name="Score"
+        )
+
+    def near_duplicates(self, text, threshold=DUPLICATE_THRESHOLD, limit=5):
+        # Estimated similarity (0–1) of the rows most like `text` (Series
+        # indexed by ID, most similar first)
+        empty = pd.Series(dtype=float, index=pd.Index([], dtype=np.int64, name="ID"), name="Similarity")
+        if self.duplicate_field is None:
+            return empty
+        words = terms(text)
+        if not words:
+            return empty
+        with self._lock:
+            self._catch_up()
+            # Words the index has never seen get ids of their own: they match
+            # nothing but still count against the similarity
+            unseen = {}
+            tid = [
+                self._vocab[w] if w in self._vocab else unseen.setdefault(w, len(self._postings) + len(unseen))
+                for w in words
+            ]
+            sig = self._signature(np.zeros(len(tid), dtype=np.int64), np.array(tid, dtype=np.int64), 1)
+            query = self._band_key(sig)[0]
+            match = self._band_keys[0].view() == query[0]
+            for column, key in zip(self._band_keys[1:], query[1:]):
+                match |= column.view() == key
+            candidates = np.flatnonzero(match & self._alive.view() & self._has_text.view())
+            similarity = (self._signatures.view()[candidates] == sig).mean(axis=1)
+            rowids = self._slot_rowid.view()[candidates]
+        keep = similarity >= threshold
+        order = np.argsort(-similarity[keep], kind="stable")[:limit]
+        return pd.Series(
+            similarity[keep][order], index=pd.Index(rowids[keep][order], name="ID"), name="Similarity"
+        )
@@ -0,0 +1,163 @@
+# chs_skyline.py
+# Centauri Health Solutions – Pareto frontier (skyline) of the competitor set
+#
+# Higher is better on every score dimension. A vendor dominates another when
+# it is at least as good everywhere and strictly better somewhere; the
+# frontier is the set of vendors nobody dominates. Dominance counts come from
+# a cumulative histogram over the rank grid of the scores (1–5 scores make
+# that grid tiny), falling back to blocked pairwise comparison when the grid
+# would be too large; the frontier is then the vendors with a zero
+# dominated-by count, so no separate skyline pass is needed.
+
+import numpy as np
+import pandas as pd
+
+import chs_core
+
+BLOCK_CELLS = 4_000_000  # booleans per broadcast comparison
+GRID_MAX_CELLS = 2_000_000
+
+DOMINANCE_COLUMNS = [
+    "On_Frontier",
+    "Dominates",
+    "Dominated_By",
+    "Frontier_Gap",
+    "Closest_Frontier",
+]
+
+
+def score_columns(comp_df):
+    return [c for c in comp_df.columns if c.endswith("_1_5")]
+
+
+def score_matrix(comp_df, dims):
+    # Missing scores count as below the scale
+    return comp_df[dims].apply(pd.to_numeric, errors="coerce").fillna(0).to_numpy(dtype=float)
+
+
+def _ranks(values):
+    # Dense ranks per dimension: same comparisons, compact integers
+    codes, sizes = [], []
+    for k in range(values.shape[1]):
+        uniq, inverse = np.unique(values[:, k], return_inverse=True)
+        codes.append(inverse.astype(np.int32))
+        sizes.append(len(uniq))
+    return np.column_stack(codes) if codes else np.empty((len(values), 0), np.int32), sizes
+
+
+def dominance_counts(values):
+    # (rows each row dominates, rows that dominate it)
+    values = np.asarray(values, dtype=float)
+    n, d = values.shape
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    ranks, sizes = _ranks(values)
+    if np.prod(sizes, dtype=float) <= GRID_MAX_CELLS:
+        hist = np.zeros(sizes, dtype=np.int64)
+        at = tuple(ranks.T)
+        np.add.at(hist, at, 1)
+        below, above = hist, hist
+        for axis in range(d):
+            below = below.cumsum(axis=axis)
+            above = np.flip(np.flip(above, axis=axis).cumsum(axis=axis), axis=axis)
+        return below[at] - hist[at], above[at] - hist[at]
+
+    dominates = np.empty(n, dtype=np.int64)
+    dominated_by = np.empty(n, dtype=np.int64)
+    step = max(1, BLOCK_CELLS // (n * d))
+    for i in range(0, n, step):
+        b = ranks[i : i + step, None, :]
+        ge = (ranks[None, :, :] >= b).all(axis=2)
+        le = (ranks[None, :, :] <= b).all(axis=2)
+        eq = ge & le
+        dominated_by[i : i + step] = (ge & ~eq).sum(axis=1)
+        dominates[i : i + step] = (le & ~eq).sum(axis=1)
+    return dominates, dominated_by
+
+
+def frontier_gaps(values, frontier):
+    # Least total score increase that puts each row on the frontier, and the
+    # frontier row it would then match. Raising a row to max(row, f) for a
+    # frontier row f is enough: anything dominating the raised row would also
+    # dominate f.
+    values = np.asarray(values, dtype=np.float32)
+    n, d = values.shape
+    front_idx = np.flatnonzero(frontier)
+    gap = np.zeros(n)
+    target = np.arange(n)
+    if len(front_idx) == 0:
+        return gap, target
+    # Distinct rows against distinct frontier rows, mapped back afterwards
+    front, first = np.unique(values[front_idx], axis=0, return_index=True)
+    front_idx = front_idx[first]
+    distinct, inverse = np.unique(values, axis=0, return_inverse=True)
+    d_gap = np.empty(len(distinct))
+    d_target = np.empty(len(distinct), dtype=np.int64)
+    step = max(1, BLOCK_CELLS // (len(front) * d))
+    for i in range(0, len(distinct), step):
+        rows = distinct[i : i + step, None, :]
+        shortfall = np.maximum(front[None, :, :] - rows, 0).sum(axis=2)
+        j = shortfall.argmin(axis=1)
+        d_gap[i : i + step] = shortfall[np.arange(len(j)), j]
+        d_target[i : i + step] = front_idx[j]
+    inverse = inverse.ravel()
+    gap, target = d_gap[inverse], d_target[inverse]
+    gap[frontier] = 0.0
+    target[frontier] = np.flatnonzero(frontier)
+    return gap, target
+
+
+def dominance_table(comp_df, dims=None):
+    # comp_df (reset index) plus DOMINANCE_COLUMNS over the chosen dimensions
+    dims = list(dims or score_columns(comp_df))
+    if not dims:
+        raise ValueError("Pick at least one score dimension")
+    values = score_matrix(comp_df, dims)
+    dominates, dominated_by = dominance_counts(values)
+    frontier = dominated_by == 0
+    gap, target = frontier_gaps(values, frontier)
+    out = comp_df.reset_index(drop=True).copy()
+    out["On_Frontier"] = frontier
+    out["Dominates"] = dominates
+    out["Dominated_By"] = dominated_by
+    out["Frontier_Gap"] = gap
+    out["Closest_Frontier"] = out["Vendor"].to_numpy()[target]
+    return out
+
+
+def reference_gap(table, dims, reference="CentauriHS"):
+    # Per-dimension increase the reference vendor needs to match its closest
+    # frontier vendor (all zero when it is already on the frontier)
+    row = table.loc[table["Vendor"] == reference]
+    if row.empty:
+        raise KeyError(f"Reference vendor {reference!r} not in competitor table")
+    row = row.iloc[0]
+    target = table.loc[table["Vendor"] == row["Closest_Frontier"]].iloc[0]
+    current = pd.to_numeric(row[dims]).fillna(0).astype(float)
+    goal = pd.to_numeric(target[dims]).fillna(0).astype(float)
+    return pd.DataFrame(
+        {
+            "Dimension": dims,
+            "Current": current.to_numpy(),
+            row["Closest_Frontier"]: goal.to_numpy(),
+            "Gap": np.maximum(goal - current, 0).to_numpy(),
+        }
+    )
+
+
+def synthetic_competitors(n_vendors=5_000, n_extra_dims=5, seed=0):
+    # The sample vendors plus random ones; each type has its own strengths
+    rng = np.random.default_rng(seed)
+    sample = pd.DataFrame(chs_core.COMPETITORS_DATA, columns=chs_core.COMPETITOR_COLUMNS)
+    n = max(n_vendors - len(sample), 0)
+    types = np.array(["Hyperscaler", "Niche", "EHR", "Startup"])
+    bias = rng.normal(0, 1, (len(types), 3 + n_extra_dims))
+    kind = rng.integers(0, len(types), n)
+    dims = chs_core.COMPETITOR_COLUMNS[2:] + [f"Dim{k + 1}_1_5" for k in range(n_extra_dims)]
+    scores = 3 + bias[kind] + rng.normal(0, 1, (n, len(dims)))
+    extra = pd.DataFrame(np.clip(np.rint(scores), 1, 5).astype(np.int8), columns=dims)
+    extra.insert(0, "Type", types[kind])
+    extra.insert(0, "Vendor", [f"Vendor {i:05d}" for i in range(n)])
+    for col in dims[3:]:
+        sample[col] = rng.integers(1, 6, len(sample)).astype(np.int8)
+    return pd.concat([sample, extra], ignore_index=True)
@@ -0,0 +1,680 @@
+# chs_storage.py
+# Centauri Health Solutions – persistent, append-optimized backlog storage
+
+import os
+import sqlite3
+import threading
+from collections import Counter, OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import chs_core
+from chs_scenarios import ScenarioStore
+from chs_search import HYPOTHESIS_TEXT_FIELDS, INTERVIEW_TEXT_FIELDS, TextIndex
+from chs_schema import apply_schema, changed_cells
+
+DEFAULT_DB_PATH = os.environ.get(
+    "CHS_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "chs_research_lab.db"),
+)
+
+# (column, SQLite type) in display order
+INTERVIEW_SCHEMA = [
+    ("Segment", "TEXT"),
+    ("Persona", "TEXT"),
+    ("Company Type", "TEXT"),
+    ("Priority_1_5", "INTEGER"),
+    ("Key_Question", "TEXT"),
+    ("Status", "TEXT"),
+]
+
+HYPOTHESIS_SCHEMA = [
+    ("Segment", "TEXT"),
+    ("Hypothesis", "TEXT"),
+    ("Metric_to_Move", "TEXT"),
+    ("Impact_1_5", "INTEGER"),
+    ("Confidence_1_5", "INTEGER"),
+    ("Effort_1_5", "INTEGER"),
+    ("ICE_Score", "REAL"),
+    ("Next_Experiment", "TEXT"),
+]
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def connect(path=DEFAULT_DB_PATH):
+    # WAL lets readers keep going while a submit is being written, and
+    # synchronous=NORMAL is durable enough for an internal research tool.
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+_MASKED_ARRAYS = (pd.arrays.IntegerArray, pd.arrays.FloatingArray, pd.arrays.BooleanArray)
+
+
+def _codes_dtype(n_categories):
+    # The code width pandas uses for this many categories (so codes are
+    # wrapped, not converted)
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+class _ColumnBuffer:
+    # One view column in an over-allocated array: plain values, categorical
+    # codes (plus categories) or nullable integers (values plus mask).
+    # Appends fill spare capacity and grow it by doubling, so each row is
+    # copied O(1) times on average; frames only ever wrap the first n rows.
+
+    def __init__(self, sample):
+        dtype = sample.dtype
+        self.categories = None
+        self.mask = None
+        if isinstance(dtype, pd.CategoricalDtype):
+            self.categories = dtype.categories
+            self.ordered = dtype.ordered
+            self.values = np.empty(0, _codes_dtype(len(self.categories)))
+        elif isinstance(sample.array, _MASKED_ARRAYS):
+            self.values = np.empty(0, dtype.numpy_dtype)
+            self.mask = np.empty(0, bool)
+            self.dtype = dtype
+        elif dtype.kind in "biufcmM":
+            self.values = np.empty(0, dtype)
+        else:
+            self.values = np.empty(0, object)
+
+    def _reserve(self, n, need):
+        if need <= len(self.values):
+            return
+        size = max(need, 2 * len(self.values), 64)
+        values = np.empty(size, self.values.dtype)
+        values[:n] = self.values[:n]
+        self.values = values
+        if self.mask is not None:
+            mask = np.empty(size, bool)
+            mask[:n] = self.mask[:n]
+            self.mask = mask
+
+    def _codes(self, values):
+        # Category codes of values (-1 for missing), adding unseen categories
+        codes = self.categories.get_indexer(values)
+        unseen = (codes < 0) & pd.notna(values)
+        if unseen.any():
+            self.categories = self.categories.append(pd.Index(pd.unique(values[unseen])))
+            dtype = _codes_dtype(len(self.categories))
+            if dtype != self.values.dtype:
+                self.values = self.values.astype(dtype)
+            codes = self.categories.get_indexer(values)
+        return codes
+
+    def append(self, n, column):
+        need = n + len(column)
+        self._reserve(n, need)
+        if self.categories is not None:
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                # Remap the column's own codes (-1 stays missing)
+                mapping = self._codes(column.cat.categories.to_numpy(dtype=object))
+                self.values[n:need] = np.append(mapping, -1)[column.array.codes]
+            else:
+                self.values[n:need] = self._codes(column.to_numpy(dtype=object))
+        elif self.mask is not None:
+            array = pd.array(column, dtype=self.dtype)
+            self.mask[n:need] = array.isna()
+            self.values[n:need] = array.to_numpy(self.values.dtype, na_value=0)
+        else:
+            try:
+                values = np.asarray(column, dtype=self.values.dtype)
+            except (TypeError, ValueError):
+                # e.g. text in a numeric column: keep everything as objects
+                self.values = self.values.astype(object)
+                values = np.asarray(column, dtype=object)
+            self.values[n:need] = values
+
+    def set(self, n, position, value):
+        # Copies the n live rows first: frames handed out earlier keep their
+        # values
+        self.values = self.values.copy()
+        if self.categories is not None:
+            self.values[position] = self._codes(np.array([value], dtype=object))[0]
+        elif self.mask is not None:
+            self.mask = self.mask.copy()
+            self.mask[position] = pd.isna(value)
+            if not pd.isna(value):
+                self.values[position] = value
+        else:
+            self.values[position] = value
+
+    def array(self, n, index):
+        if self.categories is not None:
+            dtype = pd.CategoricalDtype(self.categories, ordered=self.ordered)
+            return pd.Categorical.from_codes(self.values[:n], dtype=dtype, validate=False)
+        if self.mask is not None:
+            return self.dtype.construct_array_type()(self.values[:n], self.mask[:n])
+        if self.values.dtype == object:
+            # A Series on the view's own index (anything else would be
+            # aligned, i.e. copied)
+            return pd.Series(self.values[:n], dtype=object, index=index, copy=False)
+        return self.values[:n]
+
+
+class BacklogStore:
+    # One append-only SQLite table plus an in-memory materialized view.
+    #
+    # Appends are single-row INSERTs (O(1)); the DataFrame view is only
+    # extended with rows whose rowid is newer than the last one it has seen.
+    # The view's columns live in over-allocated buffers (_ColumnBuffer), so
+    # new rows are written into spare capacity and the view is re-wrapped
+    # around the first n rows without copying the backlog: n submits cost
+    # O(n) in total, not O(n^2).
+
+    def __init__(self, table, schema, path=DEFAULT_DB_PATH):
+        self.table = table
+        self.schema = schema
+        self.columns = [name for name, _ in schema]
+        self.path = path
+        self._conn = connect(path)
+        self._lock = threading.Lock()
+        self._view = self._empty_view()
+        self._ids = np.empty(0, np.int64)
+        self._buffers = None
+        self._last_rowid = 0
+        self._rollups = []
+
+        cols_sql = ", ".join(f"{_quote(n)} {t}" for n, t in schema)
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {_quote(table)} "
+            f"(rowid INTEGER PRIMARY KEY AUTOINCREMENT, {cols_sql})"
+        )
+        self._select_sql = (
+            f"SELECT rowid, {', '.join(_quote(c) for c in self.columns)} "
+            f"FROM {_quote(table)} WHERE rowid > ? ORDER BY rowid"
+        )
+        self._update_sql = (
+            f"UPDATE {_quote(table)} SET {{}} WHERE rowid = ?"
+        )
+        self._insert_sql = (
+            f"INSERT INTO {_quote(table)} ({', '.join(_quote(c) for c in self.columns)}) "
+            f"VALUES ({', '.join('?' for _ in self.columns)})"
+        )
+
+    def append(self, row):
+        values = tuple(row.get(c) for c in self.columns)
+        with self._lock:
+            cur = self._conn.execute(self._insert_sql, values)
+        return cur.lastrowid
+
+    def append_many(self, rows):
+        values = [tuple(r.get(c) for c in self.columns) for r in rows]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(self._insert_sql, values)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _empty_view(self):
+        return pd.DataFrame(columns=self.columns, index=pd.Index([], name="ID"))
+
+    def frame(self):
+        # Returns the materialized view (indexed by rowid), pulling in only rows
+        # appended since the last call (by this or any other connection to the
+        # same file). Attached rollups are fed just the new rows.
+        with self._lock:
+            return self._refresh()
+
+    def ranked(self, rank):
+        # The view together with an attached RankIndex's order, read under one
+        # lock; separate frame()/order() calls can see an append in between
+        # and get positions past the end of the view
+        with self._lock:
+            return self._refresh(), rank.order()
+
+    def _refresh(self):
+        records = self._conn.execute(self._select_sql, (self._last_rowid,)).fetchall()
+        if records:
+            new = pd.DataFrame.from_records(records, columns=["ID"] + self.columns)
+            new = apply_schema(new.set_index("ID"), self.table)
+            self._last_rowid = int(new.index[-1])
+            self._append_view(new)
+            for rollup in self._rollups:
+                rollup.add_frame(new)
+        return self._view
+
+    def _append_view(self, new):
+        n = len(self._view)
+        if self._buffers is None:
+            self._buffers = {c: _ColumnBuffer(new[c]) for c in self.columns}
+        if n + len(new) > len(self._ids):
+            ids = np.empty(max(n + len(new), 2 * len(self._ids), 64), np.int64)
+            ids[:n] = self._ids[:n]
+            self._ids = ids
+        self._ids[n : n + len(new)] = new.index.to_numpy(dtype=np.int64)
+        for column, buffer in self._buffers.items():
+            buffer.append(n, new[column])
+        self._wrap(n + len(new))
+
+    def _wrap(self, n):
+        index = pd.Index(self._ids[:n], name="ID", copy=False)
+        self._view = pd.DataFrame(
+            {c: b.array(n, index) for c, b in self._buffers.items()}, index=index, copy=False
+        )
+
+    def update(self, rowid, **values):
+        # In-place edit of one row (e.g. an interview moving to "Completed").
+        # Rollups get the before/after row so they can adjust their counters.
+        self.frame()
+        with self._lock:
+            if rowid not in self._view.index:
+                raise KeyError(f"No row {rowid} in {self.table}")
+            assignments = ", ".join(f"{_quote(c)} = ?" for c in values)
+            self._conn.execute(
+                self._update_sql.format(assignments), (*values.values(), rowid)
+            )
+            old_row = self._view.loc[rowid].to_dict()
+            n = len(self._view)
+            position = int(np.searchsorted(self._ids[:n], rowid))
+            for column, value in values.items():
+                self._buffers[column].set(n, position, value)
+            self._wrap(n)
+            new_row = {**old_row, **values}
+            for rollup in self._rollups:
+                rollup.update_row(old_row, new_row, rowid)
+
+    def attach_rollup(self, rollup):
+        # Rollups implement add_frame(df), update_row(old, new, rowid) and
+        # reset(); they are seeded with the current view once and then maintained incrementally.
+        view = self.frame()
+        with self._lock:
+            rollup.add_frame(view)
+            self._rollups.append(rollup)
+        return rollup
+
+    def __len__(self):
+        return len(self.frame())
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {_quote(self.table)}")
+            self._view = self._empty_view()
+            self._ids = np.empty(0, np.int64)
+            self._buffers = None
+            self._last_rowid = 0
+            for rollup in self._rollups:
+                rollup.reset()
+
+
+class InterviewRollup:
+    # Counter-based aggregates over the interview backlog. Adds and status
+    # changes adjust counters instead of re-running groupby over every row, and
+    # each summary is built from the counters in O(groups).
+
+    COMPLETED = "Completed"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.by_segment_status = Counter()
+        self.by_persona = Counter()
+        self.priority_sum = Counter()
+        self.priority_n = Counter()
+        self.rows = Counter()
+        self.completed = Counter()
+
+    def _apply(self, df, sign):
+        # Mirrors groupby semantics: rows with a missing key are skipped and only
+        # non-null priorities are counted/averaged.
+        if df.empty:
+            return
+        for key, n in df.groupby(["Segment", "Status"])["Priority_1_5"].count().items():
+            self.by_segment_status[key] += sign * n
+        for key, n in df.groupby("Persona")["Priority_1_5"].count().items():
+            self.by_persona[key] += sign * n
+        by_seg = df.groupby("Segment")
+        for key, n in by_seg.size().items():
+            self.rows[key] += sign * n
+        for key, n in by_seg["Priority_1_5"].count().items():
+            self.priority_n[key] += sign * n
+        for key, total in by_seg["Priority_1_5"].sum().items():
+            self.priority_sum[key] += sign * total
+        done = df[df["Status"] == self.COMPLETED]
+        for key, n in done.groupby("Segment").size().items():
+            self.completed[key] += sign * n
+
+    def add_frame(self, df):
+        with self._lock:
+            self._apply(df, 1)
+
+    def update_row(self, old_row, new_row, rowid=None):
+        with self._lock:
+            self._apply(pd.DataFrame([old_row]), -1)
+            self._apply(pd.DataFrame([new_row]), 1)
+
+    def segments(self):
+        with self._lock:
+            return sorted(k for k, n in self.rows.items() if n > 0)
+
+    def segment_status_summary(self):
+        with self._lock:
+            items = sorted((k, n) for k, n in self.by_segment_status.items() if n > 0)
+        return pd.DataFrame(
+            [(seg, status, n) for (seg, status), n in items],
+            columns=["Segment", "Status", "# Interviews"],
+        )
+
+    def persona_summary(self):
+        with self._lock:
+            items = sorted((k, n) for k, n in self.by_persona.items() if n > 0)
+        return pd.DataFrame(items, columns=["Persona", "# Interviews"])
+
+    def segment_summary(self):
+        with self._lock:
+            segments = sorted(k for k, n in self.rows.items() if n > 0)
+            rows = [self.rows[s] for s in segments]
+            priority = [
+                self.priority_sum[s] / self.priority_n[s] if self.priority_n[s] else float("nan")
+                for s in segments
+            ]
+            completed = [self.completed[s] for s in segments]
+        return pd.DataFrame(
+            {
+                "Segment": segments,
+                "# Interviews": rows,
+                "Mean_Priority_1_5": priority,
+                "Completion_Rate_%": [c / n * 100 for c, n in zip(completed, rows)],
+            }
+        )
+
+
+class RankIndex:
+    # View positions kept sorted by one column (descending, ties by ID, missing
+    # values last), i.e. the order of sort_values(column, ascending=False,
+    # kind="stable"). Appends and edits move single entries with a binary
+    # search instead of re-sorting, so ranked pages and top-k are slices.
+
+    def __init__(self, column):
+        self.column = column
+        self.reset()
+
+    def reset(self):
+        self._rowids = np.empty(0, dtype=np.int64)  # view order
+        self._keys = np.empty(0, dtype=float)  # sorted: -value, NaN as +inf
+        self._order = np.empty(0, dtype=np.int64)  # view positions, ranked
+
+    def _key(self, values):
+        keys = -pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=float)
+        return np.where(np.isnan(keys), np.inf, keys)
+
+    def add_frame(self, df):
+        if df.empty:
+            return
+        start = len(self._rowids)
+        self._rowids = np.concatenate([self._rowids, df.index.to_numpy(dtype=np.int64)])
+        keys = self._key(df[self.column])
+        positions = np.arange(start, start + len(df))
+        if len(df) > 64:
+            # Bulk load: one stable sort of everything
+            all_keys = np.concatenate([self._keys, keys])
+            all_pos = np.concatenate([self._order, positions])
+            order = np.lexsort((all_pos, all_keys))
+            self._keys, self._order = all_keys[order], all_pos[order]
+            return
+        for key, pos in zip(keys, positions):
+            # Newest row goes after every equal key
+            at = np.searchsorted(self._keys, key, side="right")
+            self._keys = np.insert(self._keys, at, key)
+            self._order = np.insert(self._order, at, pos)
+
+    def update_row(self, old_row, new_row, rowid=None):
+        old_key = self._key([old_row[self.column]])[0]
+        new_key = self._key([new_row[self.column]])[0]
+        if old_key == new_key:
+            return
+        pos = int(np.searchsorted(self._rowids, rowid))
+        lo = np.searchsorted(self._keys, old_key, side="left")
+        hi = np.searchsorted(self._keys, old_key, side="right")
+        at = lo + int(np.flatnonzero(self._order[lo:hi] == pos)[0])
+        keys = np.delete(self._keys, at)
+        order = np.delete(self._order, at)
+        lo = np.searchsorted(keys, new_key, side="left")
+        hi = np.searchsorted(keys, new_key, side="right")
+        at = lo + np.searchsorted(order[lo:hi], pos)
+        # Readers only ever see complete arrays
+        self._keys = np.insert(keys, at, new_key)
+        self._order = np.insert(order, at, pos)
+
+    def order(self):
+        return self._order
+
+    def top(self, view, k):
+        return view.iloc[self._order[:k]]
+
+
+def query_view(view, equals=None, ranges=None, order=None, offset=0, limit=50):
+    # One page of a backlog view: rows whose columns are in the given value
+    # lists (equals) and within inclusive (low, high) bounds (ranges), in view
+    # order or in the given positional order (e.g. RankIndex.order()).
+    # Returns (page, number of matching rows); only the page is materialized.
+    mask = np.ones(len(view), dtype=bool)
+    for column, allowed in (equals or {}).items():
+        if allowed:
+            mask &= view[column].isin(allowed).to_numpy()
+    for column, (low, high) in (ranges or {}).items():
+        values = pd.to_numeric(view[column], errors="coerce").to_numpy(dtype=float)
+        mask &= (values >= low) & (values <= high)
+    positions = np.flatnonzero(mask) if order is None else order[mask[order]]
+    return view.iloc[positions[offset : offset + limit]], len(positions)
+
+
+def recompute_interview_rollups(df):
+    # Full-scan reference for InterviewRollup, used to check the counters.
+    segment_status = (
+        df.groupby(["Segment", "Status"])["Priority_1_5"]
+        .count()
+        .reset_index()
+        .rename(columns={"Priority_1_5": "# Interviews"})
+    )
+    persona = (
+        df.groupby("Persona")["Priority_1_5"]
+        .count()
+        .reset_index()
+        .rename(columns={"Priority_1_5": "# Interviews"})
+    )
+    by_seg = df.groupby("Segment")
+    segment = pd.DataFrame(
+        {
+            "# Interviews": by_seg.size(),
+            "Mean_Priority_1_5": by_seg["Priority_1_5"].sum()
+            / by_seg["Priority_1_5"].count(),
+            "Completion_Rate_%": df["Status"].eq(InterviewRollup.COMPLETED)
+            .groupby(df["Segment"])
+            .mean()
+            * 100,
+        }
+    ).reset_index(names="Segment")
+    return segment_status, persona, segment
+
+
+def rollup_matches_recompute(rollup, df):
+    expected = recompute_interview_rollups(df)
+    actual = (
+        rollup.segment_status_summary(),
+        rollup.persona_summary(),
+        rollup.segment_summary(),
+    )
+    for exp, act in zip(expected, actual):
+        # Compare as plain values in key order (groupby keeps categorical keys
+        # in category order, the rollup sorts them as strings)
+        keys = [c for c in exp.columns if c in ("Segment", "Status", "Persona")]
+        exp = exp[exp["# Interviews"] > 0].astype({k: str for k in keys})
+        exp = exp.sort_values(keys).reset_index(drop=True)
+        act = act.astype({k: str for k in keys}).sort_values(keys).reset_index(drop=True)
+        # Nullable means come back as <NA>, the rollup's as NaN
+        values = [c for c in exp.columns if c not in keys]
+        exp[values] = exp[values].astype("float64")
+        act[values] = act[values].astype("float64")
+        try:
+            pd.testing.assert_frame_equal(
+                exp, act, check_dtype=False, check_exact=False
+            )
+        except AssertionError:
+            return False
+    return True
+
+
+def open_backlogs(path=DEFAULT_DB_PATH):
+    return (
+        BacklogStore("interviews", INTERVIEW_SCHEMA, path=path),
+        BacklogStore("hypotheses", HYPOTHESIS_SCHEMA, path=path),
+    )
+
+
+class VersionConflict(RuntimeError):
+    pass
+
+
+class SharedTable:
+    # One DataFrame shared by every session, published as immutable versions.
+    # Readers take snapshot() without copying. Writers commit edits made on
+    # the version they read; if someone else committed in between, the two
+    # sets of cell edits are merged when they touch different cells and the
+    # commit is rejected with VersionConflict when they overlap. derive(df)
+    # recomputes the `derived` columns of every committed version, and those
+    # columns are ignored when diffing.
+
+    def __init__(self, df, derive=None, derived=(), history=8):
+        self._lock = threading.Lock()
+        self._derive = derive
+        self._derived = set(derived)
+        self._history = OrderedDict({0: self._apply_derive(df)})
+        self._max_history = history
+        self.version = 0
+
+    def _apply_derive(self, df):
+        return df if self._derive is None else self._derive(df)
+
+    def snapshot(self):
+        with self._lock:
+            return self._history[self.version], self.version
+
+    def at_version(self, version):
+        # None once the version has dropped out of the history
+        with self._lock:
+            return self._history.get(version)
+
+    def commit(self, df, base_version):
+        # df: the full table as edited from base_version; returns the new version
+        with self._lock:
+            if base_version != self.version:
+                df = self._merge(df, base_version)
+            try:
+                df = self._apply_derive(df)
+            except (TypeError, ValueError) as exc:
+                # e.g. a cleared cell in a column that cannot hold missing values
+                raise VersionConflict(f"Your edits could not be applied ({exc})") from exc
+            return self._publish(df)
+
+    def replace(self, df):
+        # Whole-table replacement (e.g. a bulk import); later commits based on
+        # older versions will conflict
+        with self._lock:
+            return self._publish(self._apply_derive(df))
+
+    def _publish(self, df):
+        # df is already derived, so a failed derive never moves the version
+        self.version += 1
+        self._history[self.version] = df
+        while len(self._history) > self._max_history:
+            self._history.popitem(last=False)
+        return self.version
+
+    def _merge(self, edited, base_version):
+        base = self._history.get(base_version)
+        current = self._history[self.version]
+        if base is None or not (
+            base.index.equals(current.index)
+            and base.index.equals(edited.index)
+            and list(base.columns) == list(current.columns) == list(edited.columns)
+        ):
+            raise VersionConflict("The table was replaced since you loaded it")
+        columns = [c for c in base.columns if c not in self._derived]
+        for column in columns:
+            if len({_cell_kind(f[column].dtype) for f in (base, current, edited)}) > 1:
+                raise VersionConflict(f"The type of column {column!r} changed since you loaded it")
+        try:
+            mine = changed_cells(base[columns], edited[columns])
+            theirs = changed_cells(base[columns], current[columns])
+            if (mine & theirs).to_numpy().any():
+                raise VersionConflict("Someone else edited the same cells")
+            merged = current.copy(deep=False)
+            for column in columns:
+                if mine[column].any():
+                    values = current[column]
+                    if isinstance(values.dtype, pd.CategoricalDtype):
+                        # Edited names can be new categories; derive re-applies
+                        # the schema
+                        values = values.astype(values.cat.categories.dtype)
+                    merged[column] = values.where(~mine[column], edited[column])
+        except (TypeError, ValueError) as exc:
+            # Cells that cannot be compared or combined reject the commit
+            # rather than failing the caller
+            raise VersionConflict(f"Your edits could not be merged ({exc})") from exc
+        return merged
+
+
+def _cell_kind(dtype):
+    # What a column's cells compare as: categoricals as their values and
+    # numbers as numbers, whatever their width or nullability
+    if isinstance(dtype, pd.CategoricalDtype):
+        dtype = dtype.categories.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        return "bool"
+    if pd.api.types.is_numeric_dtype(dtype):
+        return "number"
+    if pd.api.types.is_string_dtype(dtype):
+        return "string"
+    return str(dtype)
+
+
+def _prepare_segments(df):
+    df = apply_schema(df, "segments")
+    return df.assign(Priority_Score=chs_core.compute_priority_scores(df))
+
+
+BASELINE_SCENARIO = "Baseline"
+
+
+class Workspace:
+    # Everything sessions share, held once per server process: the segment
+    # table, the saved what-if scenarios of it and the backlog stores with
+    # their rollups and text indexes. Sessions keep only widget state and the version of the
+    # segment table they are editing.
+
+    def __init__(self, segments_df, path=DEFAULT_DB_PATH):
+        self.segments = SharedTable(
+            segments_df, derive=_prepare_segments, derived=["Priority_Score"]
+        )
+        self.scenarios = ScenarioStore()
+        self.scenarios.save(BASELINE_SCENARIO, self.segments.snapshot()[0])
+        self.interviews, self.hypotheses = open_backlogs(path)
+        self.interview_rollup = self.interviews.attach_rollup(InterviewRollup())
+        self.hypothesis_rank = self.hypotheses.attach_rollup(RankIndex("ICE_Score"))
+        self.interview_search = self.interviews.attach_rollup(
+            TextIndex(INTERVIEW_TEXT_FIELDS, duplicate_field="Key_Question")
+        )
+        self.hypothesis_search = self.hypotheses.attach_rollup(
+            TextIndex(HYPOTHESIS_TEXT_FIELDS, duplicate_field="Hypothesis")
+        )
+        # Index the backlogs off the startup path; a search before this is
+        # done just waits for it
+        for index in (self.interview_search, self.hypothesis_search):
+            threading.Thread(target=index.warm, daemon=True).start()